@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument, UpdateOne
+import hashlib
+import secrets
+import time
+
+# Short-lived access tokens are checked without touching the database: the
+# JWT carries sub, role and is_approved, and revocation is an in-memory
+# check against RevocationList. The list is backed by the `revocations`
+# collection and reloaded by every worker every few seconds. Entries only
+# need to outlive the access tokens they cancel, so the collection stays
+# small and a full reload is cheap.
+#
+# Refresh tokens are opaque random strings; only their sha256 is stored in
+# `refresh_tokens`. Each use rotates the token, and presenting an already
+# rotated one revokes every token descended from the same login, except
+# within REUSE_GRACE_SECONDS of the rotation: browser tabs share one stored
+# token and may refresh it at the same moment. Successors inherit the
+# family's expires_at, so a login lasts at most its original lifetime no
+# matter how often it is refreshed.
+
+REUSE_GRACE_SECONDS = 30
+
+
+class RefreshTokenInvalid(Exception):
+    pass
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationList:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._jtis = {}   # jti -> expires_at
+        # user id -> (not_before epoch seconds, expires_at). Sub-second, like
+        # the access tokens' iat, so a token minted earlier in the same second
+        # as the revocation is still rejected.
+        self._users = {}
+        self.synced_at = None
+
+    def is_revoked(self, payload: dict) -> bool:
+        if payload.get("jti") in self._jtis:
+            return True
+        revoked = self._users.get(payload.get("sub"))
+        return revoked is not None and payload.get("iat", 0) < revoked[0]
+
+    def _expiry(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+
+    async def revoke_token(self, db, jti: str):
+        expires_at = self._expiry()
+        self._jtis[jti] = expires_at
+        await db.revocations.update_one(
+            {"kind": "jti", "value": jti}, {"$set": {"expires_at": expires_at}}, upsert=True
+        )
+
+    async def revoke_user(self, db, user_id: str):
+        """Reject every access token issued to `user_id` before now."""
+        await self.revoke_users(db, [user_id])
+
+    async def revoke_users(self, db, user_ids: list):
+        """revoke_user for many ids with one bulk_write."""
+        if not user_ids:
+            return
+        not_before, expires_at = time.time(), self._expiry()
+        for user_id in user_ids:
+            self._users[user_id] = (max(self._users.get(user_id, (0,))[0], not_before), expires_at)
+        await db.revocations.bulk_write([
+            UpdateOne(
+                {"kind": "user", "value": user_id},
+                {"$max": {"not_before": not_before}, "$set": {"expires_at": expires_at}},
+                upsert=True,
+            )
+            for user_id in user_ids
+        ], ordered=False)
+
+    async def sync(self, db):
+        """Merge entries written by other workers and drop expired ones.
+
+        Merging rather than replacing keeps a revocation made here while
+        the query was in flight.
+        """
+        now = datetime.now(timezone.utc)
+        docs = await db.revocations.find({"expires_at": {"$gt": now}}, {"_id": 0}).to_list(None)
+        for doc in docs:
+            if doc["kind"] == "jti":
+                self._jtis[doc["value"]] = doc["expires_at"]
+            else:
+                current = self._users.get(doc["value"], (0,))[0]
+                self._users[doc["value"]] = (max(current, doc["not_before"]), doc["expires_at"])
+        self._jtis = {k: v for k, v in self._jtis.items() if v > now}
+        self._users = {k: v for k, v in self._users.items() if v[1] > now}
+        self.synced_at = now
+        return len(docs)
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._jtis),
+            "revoked_users": len(self._users),
+            "synced_at": self.synced_at,
+        }
+
+
+async def issue_refresh_token(db, user_id: str, role: str, expires_at: datetime, family: str = None,
+                              credential: str = None) -> str:
+    """Store a new refresh token. Pass the predecessor's family and expires_at
+    on rotation; `credential` is an opaque fingerprint the caller can check
+    on refresh (e.g. of the password the session was opened with)."""
+    token = secrets.token_urlsafe(32)
+    await db.refresh_tokens.insert_one({
+        "token_hash": _hash(token),
+        "user_id": user_id,
+        "role": role,
+        "family": family or secrets.token_hex(8),
+        "credential": credential,
+        "created_at": datetime.now(timezone.utc),
+        "expires_at": expires_at,
+        "rotated_at": None,
+        "revoked_at": None,
+    })
+    return token
+
+
+async def rotate_refresh_token(db, token: str) -> dict:
+    """Mark `token` used and return its record; the caller issues the successor.
+
+    A token rotated less than REUSE_GRACE_SECONDS ago is accepted again, so
+    the caller issues a sibling in the same family. Any later reuse means
+    the token leaked: the whole family is revoked and RefreshTokenInvalid
+    raised.
+    """
+    now = datetime.now(timezone.utc)
+    record = await db.refresh_tokens.find_one_and_update(
+        {"token_hash": _hash(token), "rotated_at": None, "expires_at": {"$gt": now}},
+        {"$set": {"rotated_at": now}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    if record is not None:
+        return record
+    stale = await db.refresh_tokens.find_one({"token_hash": _hash(token)}, {"_id": 0})
+    if stale is None:
+        raise RefreshTokenInvalid()
+    if (
+        stale.get("revoked_at") is None
+        and stale["expires_at"] > now
+        and stale["rotated_at"] > now - timedelta(seconds=REUSE_GRACE_SECONDS)
+    ):
+        return stale
+    await _revoke(db, {"family": stale["family"]}, now)
+    raise RefreshTokenInvalid()
+
+
+async def _revoke(db, query: dict, now: datetime = None):
+    now = now or datetime.now(timezone.utc)
+    await db.refresh_tokens.update_many(
+        {**query, "revoked_at": None},
+        [{"$set": {"revoked_at": now, "rotated_at": {"$ifNull": ["$rotated_at", now]}}}],
+    )
+
+
+async def revoke_refresh_family(db, family: str):
+    await _revoke(db, {"family": family})
+
+
+async def revoke_refresh_token(db, token: str):
+    await _revoke(db, {"token_hash": _hash(token)})
+
+
+async def revoke_user_refresh_tokens(db, user_ids: list):
+    await _revoke(db, {"user_id": {"$in": user_ids}})
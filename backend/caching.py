@@ -0,0 +1,158 @@
+from collections import OrderedDict
+import asyncio
+import hashlib
+import threading
+import time
+
+from compression import compress
+from serialization import dumps
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Values are returned as stored; callers that mutate results should copy.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class VersionedSnapshot:
+    """Serialized result of an async `builder`, rebuilt only after `bump()` or
+    once `max_age` seconds have passed (so other workers' writes converge).
+
+    The body is kept as encoded JSON bytes together with a strong ETag, so
+    serving a hit costs no encoding at all. Compressed variants are made on
+    first request for each encoding and kept until the next rebuild.
+    """
+
+    def __init__(self, builder, max_age: float = 60.0):
+        self.builder = builder
+        self.max_age = max_age
+        self.version = 0
+        self.body = None
+        self.etag = None
+        self.rebuilds = 0
+        self._encoded = {}
+        self._built_version = -1
+        self._built_at = 0.0
+        self._lock = None
+
+    def bump(self):
+        self.version += 1
+
+    def _is_fresh(self) -> bool:
+        return (
+            self.body is not None
+            and self._built_version == self.version
+            and time.monotonic() - self._built_at < self.max_age
+        )
+
+    async def get(self):
+        if self._is_fresh():
+            return self.body, self.etag
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._is_fresh():
+                version = self.version
+                data = await self.builder()
+                body = dumps(data)
+                self.body = body
+                self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+                self._encoded = {}
+                self._built_version = version
+                self._built_at = time.monotonic()
+                self.rebuilds += 1
+        return self.body, self.etag
+
+    async def get_encoded(self, encoding):
+        """(body, etag) compressed with `encoding` ("br"/"gzip"), or plain for None.
+
+        Each encoding gets its own strong ETag, as the bytes differ.
+        """
+        body, etag = await self.get()
+        if encoding is None:
+            return body, etag
+        encoded = self._encoded
+        cached = encoded.get(encoding)
+        if cached is None or cached[0] is not body:
+            cached = encoded[encoding] = (body, compress(body, encoding), etag[:-1] + "-" + encoding + '"')
+        return cached[1], cached[2]
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "built_version": self._built_version,
+            "etag": self.etag,
+            "size_bytes": len(self.body) if self.body is not None else 0,
+            "encoded_size_bytes": {encoding: len(c[1]) for encoding, c in self._encoded.items()},
+            "rebuilds": self.rebuilds,
+        }
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
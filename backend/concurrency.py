@@ -0,0 +1,89 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_CONCURRENCY = 8
+
+
+async def gather_bounded(*aws, limit: int = DEFAULT_QUERY_CONCURRENCY):
+    """Run independent awaitables concurrently, at most `limit` at a time.
+
+    Results come back in argument order. If any awaitable fails, the others
+    are cancelled and the first error is raised, so a failed query doesn't
+    leave siblings running against the database.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    While a call for `key` is running, later callers await the same result
+    (or exception) instead of starting their own. The shared work runs as its
+    own task, so one caller disconnecting doesn't cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.coalesced = 0
+
+    async def run(self, key, fn):
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+
+class PeriodicTask:
+    """Run `fn` every `interval` seconds in the background; errors are logged."""
+
+    def __init__(self, name: str, fn, interval: float):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.runs = 0
+        self.last_result = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                self.last_result = await self.fn()
+                self.runs += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Periodic task {self.name} failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,163 @@
+from pymongo import monitoring
+from pymongo.read_preferences import ReadPreference, Secondary, SecondaryPreferred
+import asyncio
+import os
+import threading
+import time
+
+from metrics import mongo_pool_checkout_failures, mongo_pool_checkout_wait
+
+# Database bootstrap: client options come from the environment so pool sizing
+# can be matched to the number of workers (each uvicorn worker owns its own
+# pool, so the server sees up to workers * MONGO_MAX_POOL_SIZE connections).
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def _env_int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def client_options() -> dict:
+    """Keyword arguments for AsyncIOMotorClient, read from MONGO_* variables."""
+    options = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 100),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+        "maxConnecting": _env_int("MONGO_MAX_CONNECTING", 2),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000),
+    }
+    for option, name in (
+        ("maxIdleTimeMS", "MONGO_MAX_IDLE_TIME_MS"),
+        ("waitQueueTimeoutMS", "MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        ("connectTimeoutMS", "MONGO_CONNECT_TIMEOUT_MS"),
+        ("socketTimeoutMS", "MONGO_SOCKET_TIMEOUT_MS"),
+    ):
+        value = _env_int(name)
+        if value is not None:
+            options[option] = value
+    # e.g. "zstd,snappy,zlib"; zstd and snappy need the zstandard / python-snappy packages
+    compressors = os.environ.get("MONGO_COMPRESSORS")
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+def heavy_read_preference():
+    """Read preference for large read-only listings and exports.
+
+    Defaults to secondaryPreferred, which falls back to the primary on a
+    standalone server or when no secondary is available.
+    """
+    name = os.environ.get("MONGO_HEAVY_READ_PREFERENCE", "secondaryPreferred")
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown MONGO_HEAVY_READ_PREFERENCE: {name}")
+    max_staleness = _env_int("MONGO_MAX_STALENESS_SECONDS", -1)
+    if max_staleness != -1 and name == "secondaryPreferred":
+        return SecondaryPreferred(max_staleness=max_staleness)
+    if max_staleness != -1 and name == "secondary":
+        return Secondary(max_staleness=max_staleness)
+    return READ_PREFERENCES[name]
+
+
+async def prewarm(databases: list, connections: int):
+    """Open up to `connections` pooled sockets per database before traffic arrives.
+
+    Concurrent pings force the pool to grow instead of reusing one socket.
+    Each ping follows its database's read preference, so a secondaryPreferred
+    database warms the secondaries' pools as well as the primary's.
+    """
+    if connections <= 0:
+        return
+    await asyncio.gather(*(
+        db.command("ping", read_preference=db.read_preference)
+        for db in databases for _ in range(connections)
+    ))
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Per-server connection counts, fed by pymongo's pool events.
+
+    Events arrive on pymongo's threads; checkout wait is measured between
+    the started and checked-out events, which fire on the same thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = {}
+        self._local = threading.local()
+
+    def _server(self, address):
+        key = f"{address[0]}:{address[1]}"
+        server = self._servers.get(key)
+        if server is None:
+            server = self._servers[key] = {
+                "open": 0, "checked_out": 0, "waiting": 0,
+                "created_total": 0, "closed_total": 0, "checkout_failures": 0, "cleared_total": 0,
+            }
+        return server
+
+    def _update(self, address, **deltas):
+        with self._lock:
+            server = self._server(address)
+            for field, delta in deltas.items():
+                server[field] += delta
+
+    def pool_created(self, event):
+        with self._lock:
+            self._server(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._update(event.address, cleared_total=1)
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        self._update(event.address, open=1, created_total=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1, closed_total=1)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        self._update(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        self._update(event.address, waiting=-1, checkout_failures=1)
+        mongo_pool_checkout_failures.inc(str(event.reason))
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            mongo_pool_checkout_wait.observe(value=time.perf_counter() - started)
+            self._local.started = None
+        self._update(event.address, waiting=-1, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, checked_out=-1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {address: dict(server) for address, server in self._servers.items()}
+
+    def totals(self) -> dict:
+        totals = {"open": 0, "checked_out": 0, "waiting": 0}
+        for server in self.snapshot().values():
+            for field in totals:
+                totals[field] += server[field]
+        return totals
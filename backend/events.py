@@ -0,0 +1,264 @@
+from datetime import datetime, timezone
+from pymongo.errors import OperationFailure, PyMongoError
+import asyncio
+import itertools
+import logging
+
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Live change events for connected clients, delivered over SSE.
+#
+# Events are published into an in-process EventBus. With EVENTS_SOURCE=local
+# the write handlers publish directly, which only reaches clients connected
+# to the same worker. On a replica set ChangeStreamFeed watches the source
+# collections instead, so every worker sees every write.
+
+ADMINS = "admins"
+EVERYONE = "everyone"
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    """One connected client: a bounded queue plus who it may see."""
+
+    def __init__(self, user_id: str, is_admin: bool, max_queue: int):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def wants(self, audience: str) -> bool:
+        if audience == EVERYONE:
+            return True
+        if audience == ADMINS:
+            return self.is_admin
+        return audience == self.user_id
+
+    def offer(self, message):
+        """Queue without blocking the publisher.
+
+        A client that falls `max_queue` events behind has its backlog
+        replaced by a single resync event: it refetches instead of
+        receiving a stale stream, and memory stays bounded.
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            # None is the close sentinel and must survive the overflow
+            self.queue.put_nowait(None if message is None else ("resync", {}))
+
+
+class EventBus:
+    def __init__(self, max_subscribers: int = 500, max_queue: int = 100):
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self._subscriptions = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.rejected = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscriptions) >= self.max_subscribers
+
+    def subscribe(self, user_id: str, is_admin: bool) -> Subscription:
+        if self.full:
+            self.rejected += 1
+            raise TooManySubscribers()
+        subscription = Subscription(user_id, is_admin, self.max_queue)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: str, data: dict, audience: str = EVERYONE):
+        """Fan an event out to matching subscribers; never blocks."""
+        self.published += 1
+        message = (event_type, {**data, "id": next(self._ids), "at": datetime.now(timezone.utc)})
+        for subscription in list(self._subscriptions):
+            if subscription.wants(audience):
+                subscription.offer(message)
+
+    def close(self):
+        for subscription in list(self._subscriptions):
+            subscription.offer(None)
+
+    def stats(self) -> dict:
+        subscriptions = list(self._subscriptions)
+        return {
+            "subscribers": len(subscriptions),
+            "max_subscribers": self.max_subscribers,
+            "max_queue": self.max_queue,
+            "published": self.published,
+            "rejected": self.rejected,
+            "dropped": sum(s.dropped for s in subscriptions),
+            "deepest_queue": max((s.queue.qsize() for s in subscriptions), default=0),
+        }
+
+
+def format_sse(event_type: str, data: dict) -> bytes:
+    return b"event: " + event_type.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def sse_stream(bus: EventBus, user_id: str, is_admin: bool, heartbeat: float = 15.0):
+    """Async byte stream for a StreamingResponse; unsubscribes when it ends.
+
+    Subscribes only once iteration starts: a client that disconnects before
+    the response begins never runs the generator, so a subscription taken
+    earlier would never be released. Starlette cancels the generator when
+    the client disconnects.
+    """
+    yield b"retry: 5000\n\n"
+    try:
+        subscription = bus.subscribe(user_id, is_admin)
+    except TooManySubscribers:
+        return  # lost the race for the last slot; the client retries
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection
+                yield b": ping\n\n"
+                continue
+            if message is None:
+                return
+            yield format_sse(*message)
+    finally:
+        bus.unsubscribe(subscription)
+
+
+# Event constructors shared by the write handlers and the change stream feed
+
+def publish_payment_succeeded(bus: EventBus, payment: dict):
+    data = {
+        "user_id": payment.get("user_id"),
+        "month": payment.get("month"),
+        "year": payment.get("year"),
+        "amount": payment.get("amount"),
+    }
+    bus.publish("payment.succeeded", data, ADMINS)
+    if payment.get("user_id"):
+        bus.publish("payment.succeeded", data, payment["user_id"])
+
+
+def publish_user_registered(bus: EventBus, user: dict):
+    bus.publish("user.registered", {"user_id": user["id"], "full_name": user.get("full_name")}, ADMINS)
+
+
+def publish_user_approved(bus: EventBus, user_id: str):
+    bus.publish("user.approved", {"user_id": user_id}, ADMINS)
+    bus.publish("user.approved", {"user_id": user_id}, user_id)
+
+
+def publish_expense_added(bus: EventBus, expense: dict):
+    bus.publish("expense.added", {
+        "festival_id": expense.get("festival_id"),
+        "expense_id": expense.get("id"),
+        "amount": expense.get("amount"),
+    }, EVERYONE)
+
+
+async def supports_change_streams(db) -> bool:
+    try:
+        hello = await db.command("hello")
+    except PyMongoError:
+        return False
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+
+class ChangeStreamFeed:
+    """Publishes bus events from MongoDB change streams (replica sets only).
+
+    Resumes from the last seen token after a transient error. `running` is
+    true only while a stream is open, so writers fall back to publishing
+    locally while it is down (e.g. missing changeStream privilege). Events
+    from that window may be delivered twice after a resume; clients
+    treat them as refetch hints.
+    """
+
+    def __init__(self, db, bus: EventBus, retry_delay: float = 2.0):
+        self.db = db
+        self.bus = bus
+        self.retry_delay = retry_delay
+        self._task = None
+        self._resume_token = None
+        self._open = False
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._open
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._open = False
+
+    async def _run(self):
+        pipeline = [{"$match": {"$or": [
+            {"ns.coll": "monthly_payments", "operationType": "update",
+             "updateDescription.updatedFields.status": "success"},
+            {"ns.coll": "users", "operationType": "insert"},
+            {"ns.coll": "users", "operationType": "update",
+             "updateDescription.updatedFields.is_approved": True},
+            {"ns.coll": "expenses", "operationType": "insert"},
+        ]}}]
+        while True:
+            try:
+                try:
+                    async with self.db.watch(
+                        pipeline, full_document="updateLookup", resume_after=self._resume_token
+                    ) as stream:
+                        self._open = True
+                        async for change in stream:
+                            self._resume_token = stream.resume_token
+                            try:
+                                self._dispatch(change)
+                            except Exception:
+                                # One malformed change must not end the feed
+                                logger.exception(f"Skipping change event: {change.get('_id')}")
+                finally:
+                    # Writers publish locally again from here on, including the retry delay
+                    self._open = False
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                self.failures += 1
+                if isinstance(e, OperationFailure) and e.code == 286:
+                    # ChangeStreamHistoryLost: the oplog moved past our token
+                    self._resume_token = None
+                logger.warning(f"Change stream interrupted, retrying: {e}")
+                await asyncio.sleep(self.retry_delay)
+            except Exception:
+                self.failures += 1
+                logger.exception("Change stream feed failed, restarting")
+                await asyncio.sleep(self.retry_delay)
+
+    def _dispatch(self, change: dict):
+        collection = change["ns"]["coll"]
+        doc = change.get("fullDocument")
+        if not doc:
+            return  # deleted before the lookup ran
+        if collection == "monthly_payments":
+            publish_payment_succeeded(self.bus, doc)
+        elif collection == "users" and change["operationType"] == "insert":
+            publish_user_registered(self.bus, doc)
+        elif collection == "users":
+            publish_user_approved(self.bus, doc.get("id"))
+        elif collection == "expenses":
+            publish_expense_added(self.bus, doc)
@@ -0,0 +1,85 @@
+from datetime import datetime
+import csv
+import io
+import json
+import zlib
+
+# Exportable collections: columns in output order and the date field that
+# date_from/date_to filter on. users never exports the password hash.
+EXPORTS = {
+    "monthly_payments": {
+        "fields": [
+            "id", "user_id", "month", "year", "amount", "status", "payment_date",
+            "transaction_id", "method", "razorpay_order_id", "razorpay_payment_id",
+        ],
+        "date_field": "payment_date",
+    },
+    "users": {
+        "fields": ["id", "full_name", "email", "phone", "is_approved", "role", "created_at"],
+        "date_field": "created_at",
+    },
+    "expenses": {
+        "fields": ["id", "festival_id", "name", "amount", "date", "created_by", "created_at"],
+        "date_field": "date",
+    },
+}
+
+EXPORT_BATCH_SIZE = 1000
+# Rows are buffered into chunks of roughly this size before being sent
+CHUNK_BYTES = 64 * 1024
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _cell(value):
+    """CSV has no null: None becomes an empty cell."""
+    return "" if value is None else _value(value)
+
+
+async def _csv_chunks(cursor, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for doc in cursor:
+        writer.writerow([_cell(doc.get(f)) for f in fields])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _ndjson_chunks(cursor, fields):
+    parts = []
+    size = 0
+    async for doc in cursor:
+        line = json.dumps({f: _value(doc[f]) for f in fields if f in doc}) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(parts).encode()
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode()
+
+
+async def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(db, collection: str, query: dict, fmt: str, gzip: bool):
+    """Async byte stream of `collection` rows matching `query` in csv or ndjson."""
+    spec = EXPORTS[collection]
+    fields = spec["fields"]
+    projection = {"_id": 0, **{f: 1 for f in fields}}
+    cursor = db[collection].find(query, projection).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    chunks = _csv_chunks(cursor, fields) if fmt == "csv" else _ndjson_chunks(cursor, fields)
+    return _gzipped(chunks) if gzip else chunks
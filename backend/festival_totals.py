@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from pymongo import ReplaceOne
+
+# festival_totals holds one document per festival with the sum and count of
+# its expenses. create_expense and delete_expense $inc it; delete_festival
+# drops it together with the expenses. rebuild/check repair drift
+# (`python repair.py festival_totals rebuild`).
+
+
+def _totals_doc(festival_id: str, spent: float, expense_count: int) -> dict:
+    return {
+        "festival_id": festival_id,
+        "spent": spent,
+        "expense_count": expense_count,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+async def record_expense(db, festival_id: str, amount: float, sign: int = 1):
+    """Apply one created (sign=1) or deleted (sign=-1) expense to the counters."""
+    await db.festival_totals.update_one(
+        {"festival_id": festival_id},
+        {
+            "$inc": {"spent": sign * amount, "expense_count": sign},
+            "$set": {"updated_at": datetime.now(timezone.utc)},
+        },
+        upsert=True,
+    )
+
+
+async def drop_totals(db, festival_id: str):
+    await db.festival_totals.delete_one({"festival_id": festival_id})
+
+
+async def get_totals(db) -> dict:
+    """Return {festival_id: (spent, expense_count)} for every festival with expenses."""
+    docs = await db.festival_totals.find({}, {"_id": 0, "updated_at": 0}).to_list(None)
+    return {d["festival_id"]: (d.get("spent", 0), d.get("expense_count", 0)) for d in docs}
+
+
+def summarize(festivals: list, totals: dict) -> list:
+    """Join festivals with their counters into summary rows."""
+    rows = []
+    for festival in festivals:
+        spent, count = totals.get(festival["id"], (0, 0))
+        rows.append({
+            "id": festival["id"],
+            "name": festival["name"],
+            "start_date": festival.get("start_date"),
+            "end_date": festival.get("end_date"),
+            "total_budget": festival["total_budget"],
+            "spent": spent,
+            "remaining": festival["total_budget"] - spent,
+            "expense_count": count,
+        })
+    return rows
+
+
+async def compute_totals_from_expenses(db) -> dict:
+    rows = await db.expenses.aggregate([
+        {"$group": {"_id": "$festival_id", "spent": {"$sum": "$amount"}, "expense_count": {"$sum": 1}}},
+    ]).to_list(None)
+    return {row["_id"]: (row["spent"], row["expense_count"]) for row in rows}
+
+
+async def rebuild_totals(db) -> dict:
+    """Recompute festival_totals from raw expenses (backfill or repair)."""
+    expected = await compute_totals_from_expenses(db)
+    if expected:
+        await db.festival_totals.bulk_write([
+            ReplaceOne({"festival_id": fid}, _totals_doc(fid, spent, count), upsert=True)
+            for fid, (spent, count) in expected.items()
+        ], ordered=False)
+    removed = await db.festival_totals.delete_many({"festival_id": {"$nin": list(expected)}})
+    return {"rebuilt": len(expected), "removed": removed.deleted_count}
+
+
+async def check_totals(db) -> list:
+    """List festivals whose counters disagree with their raw expenses."""
+    expected = await compute_totals_from_expenses(db)
+    actual = await get_totals(db)
+    mismatches = []
+    for fid in sorted(set(expected) | set(actual)):
+        exp = expected.get(fid, (0, 0))
+        act = actual.get(fid, (0, 0))
+        if exp[1] != act[1] or abs(exp[0] - act[0]) > 1e-6:
+            mismatches.append({
+                "festival_id": fid,
+                "expected": {"spent": exp[0], "expense_count": exp[1]},
+                "actual": {"spent": act[0], "expense_count": act[1]},
+            })
+    return mismatches
+
@@ -0,0 +1,174 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+import logging
+
+from sync import TOMBSTONE_TTL_SECONDS
+from webhooks import INBOX_RETENTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Declared index spec, one entry per hot lookup path in server.py.
+# Keep names stable: drift detection compares by name.
+INDEX_SPECS = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("phone", ASCENDING)], name="phone_unique", unique=True),
+        IndexModel(
+            [("is_approved", ASCENDING), ("role", ASCENDING), ("_id", ASCENDING)],
+            name="approved_role_id",
+        ),
+        IndexModel([("revision", ASCENDING)], name="revision"),
+    ],
+    "monthly_payments": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("month", ASCENDING), ("year", ASCENDING), ("status", ASCENDING)],
+            name="month_year_status",
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("year", ASCENDING), ("month", ASCENDING)],
+            name="user_year_month",
+        ),
+        IndexModel(
+            [("razorpay_order_id", ASCENDING)],
+            name="razorpay_order_id_unique",
+            unique=True,
+            partialFilterExpression={"razorpay_order_id": {"$type": "string"}},
+        ),
+        IndexModel([("settled_by", ASCENDING)], name="settled_by", sparse=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("year", ASCENDING), ("month", ASCENDING)],
+            name="pending_user_year_month_unique",
+            unique=True,
+            partialFilterExpression={"status": "pending"},
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("idempotency_key", ASCENDING)],
+            name="user_idempotency_key_unique",
+            unique=True,
+            partialFilterExpression={"idempotency_key": {"$type": "string"}},
+        ),
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+    ],
+    "webhook_inbox": [
+        IndexModel([("status", ASCENDING), ("received_at", ASCENDING)], name="status_received_at"),
+        IndexModel([("processed_at", ASCENDING)], name="processed_at_ttl", expireAfterSeconds=INBOX_RETENTION_SECONDS),
+    ],
+    "savings_rollups": [
+        IndexModel([("year", ASCENDING), ("month", ASCENDING)], name="year_month_unique", unique=True),
+    ],
+    "festivals": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("start_date", ASCENDING)], name="start_date"),
+        IndexModel([("revision", ASCENDING)], name="revision"),
+    ],
+    "expenses": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("festival_id", ASCENDING), ("_id", ASCENDING)], name="festival_id_id"),
+        IndexModel([("festival_id", ASCENDING), ("date", ASCENDING)], name="festival_id_date"),
+        IndexModel([("revision", ASCENDING)], name="revision"),
+    ],
+    "festival_totals": [
+        IndexModel([("festival_id", ASCENDING)], name="festival_id_unique", unique=True),
+    ],
+    "slogans": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("is_active", ASCENDING), ("order", ASCENDING)], name="active_order"),
+        IndexModel([("revision", ASCENDING)], name="revision"),
+    ],
+    "achievements": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("date", DESCENDING)], name="date_desc"),
+        IndexModel([("revision", ASCENDING)], name="revision"),
+    ],
+    "team_members": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("order", ASCENDING)], name="order"),
+        IndexModel([("revision", ASCENDING)], name="revision"),
+    ],
+    "services": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("revision", ASCENDING)], name="revision"),
+    ],
+    "tombstones": [
+        IndexModel([("collection", ASCENDING), ("revision", ASCENDING)], name="collection_revision"),
+        IndexModel([("deleted_at", ASCENDING)], name="deleted_at_ttl", expireAfterSeconds=TOMBSTONE_TTL_SECONDS),
+    ],
+    # Both carry their own expiry time, so the TTL indexes expire at that instant
+    "refresh_tokens": [
+        IndexModel([("token_hash", ASCENDING)], name="token_hash_unique", unique=True),
+        IndexModel([("family", ASCENDING)], name="family"),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "revocations": [
+        IndexModel([("kind", ASCENDING), ("value", ASCENDING)], name="kind_value_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Options that change index behaviour; anything else (v, ns, background) is ignored for drift
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _normalize(index_doc: dict) -> dict:
+    return {
+        "key": [(field, direction) for field, direction in index_doc["key"].items()]
+        if isinstance(index_doc["key"], dict) else [tuple(k) for k in index_doc["key"]],
+        **{opt: index_doc[opt] for opt in _COMPARED_OPTIONS if opt in index_doc},
+    }
+
+
+async def ensure_indexes(db, specs: dict = INDEX_SPECS) -> dict:
+    """Create every declared index. Each index is its own createIndexes call,
+    since a failed call builds none of its indexes: one unique index blocked
+    by existing duplicates is logged and the rest still get built."""
+    created = {}
+    for collection, models in specs.items():
+        created[collection] = []
+        for model in models:
+            try:
+                created[collection] += await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                logger.error(f"Index creation failed for {collection}.{model.document['name']}: {e}")
+    return created
+
+
+async def check_index_drift(db, specs: dict = INDEX_SPECS) -> dict:
+    """Compare live indexes against the declared spec.
+
+    Returns {collection: {"missing": [...], "extra": [...], "mismatched": [...]}}
+    for collections that differ; an empty dict means no drift.
+    """
+    drift = {}
+    for collection, models in specs.items():
+        declared = {m.document["name"]: _normalize(m.document) for m in models}
+        live = await db[collection].index_information()
+        live = {name: _normalize(info) for name, info in live.items() if name != "_id_"}
+
+        missing = sorted(set(declared) - set(live))
+        extra = sorted(set(live) - set(declared))
+        mismatched = sorted(
+            name for name in set(declared) & set(live) if declared[name] != live[name]
+        )
+        if missing or extra or mismatched:
+            drift[collection] = {"missing": missing, "extra": extra, "mismatched": mismatched}
+    return drift
+
+
+async def get_index_stats(db, specs: dict = INDEX_SPECS) -> dict:
+    """Per-index usage counters from $indexStats for every managed collection."""
+    stats = {}
+    for collection in specs:
+        rows = await db[collection].aggregate([{"$indexStats": {}}]).to_list(None)
+        stats[collection] = [
+            {
+                "name": row["name"],
+                "key": row["key"],
+                "ops": row["accesses"]["ops"],
+                "since": row["accesses"]["since"],
+            }
+            for row in rows
+        ]
+    return stats
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from typing import Optional
+import logging
+
+from festival_totals import rebuild_totals
+from rollups import rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+# Fields that used to be written as ISO strings and are now native BSON dates
+DATE_FIELDS = {
+    "users": ["created_at"],
+    "festivals": ["start_date", "end_date", "created_at"],
+    "expenses": ["date", "created_at"],
+    "achievements": ["date"],
+}
+
+DATES_MIGRATION_ID = "iso_dates_to_bson"
+
+
+def _parse(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def as_datetime(value) -> Optional[datetime]:
+    """A date field as a datetime, whether or not it has been migrated yet."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return _parse(value)
+        except ValueError:
+            return None
+    return None
+
+
+async def migrate_iso_dates(db, batch_size: int = 500) -> dict:
+    """Convert ISO-string date fields to BSON dates, in batches.
+
+    Safe to run while the app serves traffic: each update matches the exact
+    string it read, so a concurrent write is never overwritten, and documents
+    already converted aren't matched again. Re-running is a no-op.
+    """
+    converted = {}
+    for collection, fields in DATE_FIELDS.items():
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        projection = {field: 1 for field in fields}
+        count = 0
+        batch = []
+        async for doc in db[collection].find(query, projection).batch_size(batch_size):
+            match = {"_id": doc["_id"]}
+            update = {}
+            for field in fields:
+                value = doc.get(field)
+                if isinstance(value, str):
+                    try:
+                        update[field] = _parse(value)
+                    except ValueError:
+                        logger.warning(f"Unparseable {collection}.{field} on {doc['_id']}: {value!r}")
+                        continue
+                    match[field] = value
+            if update:
+                batch.append(UpdateOne(match, {"$set": update}))
+            if len(batch) >= batch_size:
+                count += (await db[collection].bulk_write(batch, ordered=False)).modified_count
+                batch = []
+        if batch:
+            count += (await db[collection].bulk_write(batch, ordered=False)).modified_count
+        converted[collection] = count
+    return converted
+
+
+# Applied in order, each at most once; the id is recorded in `migrations`
+MIGRATIONS = [
+    (DATES_MIGRATION_ID, migrate_iso_dates),
+    ("festival_totals_backfill", rebuild_totals),
+    ("savings_rollups_backfill", rebuild_rollups),
+]
+
+
+# One worker at a time runs migrations: it holds this document in `migrations`
+# until it finishes, or until the lease runs out if it dies part way through
+LOCK_ID = "lock"
+LEASE_SECONDS = 900
+
+
+async def acquire_lease(db, owner: str, seconds: float = LEASE_SECONDS) -> bool:
+    """Take or renew the migration lease; False while another owner holds it."""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.migrations.update_one(
+            {"_id": LOCK_ID, "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return False  # the lock exists and is held by someone else
+    return True
+
+
+async def release_lease(db, owner: str):
+    await db.migrations.delete_one({"_id": LOCK_ID, "owner": owner})
+
+
+async def _pending(db) -> list:
+    done = {d["_id"] for d in await db.migrations.find({}, {"_id": 1}).to_list(None)}
+    return [(migration_id, migrate) for migration_id, migrate in MIGRATIONS if migration_id not in done]
+
+
+async def run_pending_migrations(db, owner: str, lease_seconds: float = LEASE_SECONDS) -> list:
+    """Run migrations not yet recorded in the `migrations` collection.
+
+    Returns the ids applied. Returns [] without waiting when another worker
+    holds the lease. The lease is renewed before each migration. If one
+    migration outlives it, a second worker may start the same migration.
+    Every migration here is idempotent, so that costs time, not correctness.
+    """
+    if not await _pending(db) or not await acquire_lease(db, owner, lease_seconds):
+        return []
+    applied = []
+    try:
+        # Re-read under the lease: the previous holder may have finished some
+        for migration_id, migrate in await _pending(db):
+            if not await acquire_lease(db, owner, lease_seconds):
+                break
+            result = await migrate(db)
+            await db.migrations.update_one(
+                {"_id": migration_id},
+                {"$set": {"completed_at": datetime.now(timezone.utc), "result": result}},
+                upsert=True,
+            )
+            logger.info(f"Migration {migration_id}: {result}")
+            applied.append(migration_id)
+    finally:
+        await release_lease(db, owner)
+    return applied
+
+
+if __name__ == "__main__":
+    import os
+    import socket
+    from repair import run_with_db
+
+    owner = f"cli:{socket.gethostname()}:{os.getpid()}"
+    print(run_with_db(lambda db: run_pending_migrations(db, owner)))
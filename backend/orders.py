@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+
+# At most one pending monthly_payments row exists per (user, year, month),
+# enforced by the pending_user_year_month_unique partial index. A pending row
+# keeps the gateway order it was created with so it can be handed back to
+# repeated create-order calls until it goes stale.
+
+
+def is_reusable(pending: dict, amount: int, max_age: timedelta) -> bool:
+    created_at = pending.get("created_at")
+    return (
+        pending.get("order") is not None
+        and pending.get("amount") == amount
+        and isinstance(created_at, datetime)
+        and datetime.now(timezone.utc) - created_at < max_age
+    )
+
+
+async def expire_pending(db, payment_id: str):
+    await db.monthly_payments.update_one(
+        {"id": payment_id, "status": "pending"},
+        {"$set": {"status": "expired"}},
+    )
+
+
+async def expire_stale_pending(db, max_age: timedelta) -> int:
+    """Mark pending rows older than `max_age` as expired; returns how many."""
+    cutoff = datetime.now(timezone.utc) - max_age
+    result = await db.monthly_payments.update_many(
+        {"status": "pending", "$or": [
+            {"created_at": {"$lt": cutoff}},
+            # Rows written before created_at was recorded
+            {"created_at": {"$exists": False}, "payment_date": {"$lt": cutoff}},
+        ]},
+        {"$set": {"status": "expired"}},
+    )
+    return result.modified_count
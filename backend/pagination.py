@@ -0,0 +1,96 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from datetime import datetime, timezone
+from typing import Optional
+import re
+
+from serialization import FastJSONResponse, lean_rows
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Keyset pagination on _id: always present, unique, indexed and increasing in
+# insertion order, so pages stay stable while new documents are written.
+
+
+def decode_cursor(after: Optional[str]) -> Optional[ObjectId]:
+    if not after:
+        return None
+    try:
+        return ObjectId(after)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: set, required: tuple = ("id",)) -> Optional[dict]:
+    """Turn `fields=a,b` into an inclusion projection limited to `allowed`."""
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return {field: 1 for field in requested | set(required)}
+
+
+def name_prefix_filter(prefix: str) -> dict:
+    return {"$regex": "^" + re.escape(prefix), "$options": "i"}
+
+
+def date_range_filter(field: str, date_from: Optional[datetime], date_to: Optional[datetime]) -> dict:
+    """Inclusive range on a date field; empty dict when neither bound is set.
+
+    Until the iso_dates_to_bson migration has run, older documents still hold
+    ISO strings, which a BSON date bound never matches; the same bounds are
+    also applied as strings, which order correctly for UTC ISO timestamps.
+    """
+    bounds, iso_bounds = {}, {}
+    if date_from is not None:
+        bounds["$gte"] = date_from
+        iso_bounds["$gte"] = _utc_iso(date_from)
+    if date_to is not None:
+        bounds["$lte"] = date_to
+        iso_bounds["$lte"] = _utc_iso(date_to)
+    if not bounds:
+        return {}
+    return {"$or": [{field: bounds}, {field: iso_bounds}]}
+
+
+def _utc_iso(value: datetime) -> str:
+    return (value.astimezone(timezone.utc) if value.tzinfo else value).isoformat()
+
+
+async def fetch_page(collection, query: dict, projection: dict, limit: int, after: Optional[str]):
+    """Return (documents, next_cursor); next_cursor is None on the last page."""
+    query = dict(query)
+    cursor_id = decode_cursor(after)
+    if cursor_id is not None:
+        query["_id"] = {"$gt": cursor_id}
+    projection = {k: v for k, v in projection.items() if k != "_id"}
+    if projection and all(v for v in projection.values()):
+        projection["_id"] = 1
+
+    docs = await collection.find(query, projection or None).sort("_id", 1).limit(limit + 1).to_list(limit + 1)
+    next_cursor = str(docs[limit - 1]["_id"]) if len(docs) > limit else None
+    docs = docs[:limit]
+    for doc in docs:
+        doc.pop("_id", None)
+    return docs, next_cursor
+
+
+def set_next_cursor(response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def page_response(docs: list, next_cursor: Optional[str], model=None) -> FastJSONResponse:
+    """Encode a page directly, bypassing the route's response_model.
+
+    Full documents are shaped by `model` without re-validation; projected
+    pages (?fields=) are already limited to allowed fields and go out as is.
+    """
+    response = FastJSONResponse(content=lean_rows(docs, model) if model is not None else docs)
+    set_next_cursor(response, next_cursor)
+    return response
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+import asyncio
+import threading
+import time
+
+
+class PasswordPoolFull(Exception):
+    pass
+
+
+class PasswordHasher:
+    """bcrypt on a bounded thread pool so hashing never runs on the event loop.
+
+    bcrypt releases the GIL while it works, so threads give real parallelism.
+    `max_queue` caps jobs waiting for a worker; beyond that callers get
+    PasswordPoolFull instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int = 4, rounds: int = 12, max_queue: int = 64):
+        self.workers = workers
+        self.rounds = rounds
+        self.max_queue = max_queue
+        self._context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._max_queued_seen = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def _job(self, fn, args, enqueued_at, state):
+        started = time.perf_counter()
+        with self._lock:
+            if state["cancelled"]:
+                return None  # the caller gave up while queued and released the slot
+            state["started"] = True
+            self._queued -= 1
+            self._active += 1
+            self._total_wait += started - enqueued_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._total_run += time.perf_counter() - started
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise PasswordPoolFull()
+            self._queued += 1
+            self._max_queued_seen = max(self._max_queued_seen, self._queued)
+        # Shared with _job under the lock: whichever side gets there first
+        # (the worker starting, or the caller being cancelled) owns the slot
+        state = {"started": False, "cancelled": False}
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, self._job, fn, args, time.perf_counter(), state
+            )
+        except asyncio.CancelledError:
+            with self._lock:
+                if not state["started"]:
+                    state["cancelled"] = True
+                    self._queued -= 1
+            raise
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self._context.verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "active": self._active,
+                "max_queue_depth_seen": self._max_queued_seen,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait / completed * 1000, 2) if completed else 0.0,
+                "avg_run_ms": round(self._total_run / completed * 1000, 2) if completed else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
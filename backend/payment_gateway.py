@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import random
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayError(Exception):
+    pass
+
+
+class GatewayUnavailable(GatewayError):
+    """Raised without touching the network while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures, lets one trial call
+    through after `reset_timeout` seconds (half-open) and closes on success."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open":
+            raise GatewayUnavailable("Payment gateway circuit is open")
+        if state == "half_open":
+            if self._trial_in_flight:
+                raise GatewayUnavailable("Payment gateway circuit is half-open")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def release(self):
+        """End a call without an outcome (e.g. cancelled), freeing the half-open trial."""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class RazorpayGateway:
+    """Async Razorpay client: pooled keep-alive connections, per-call timeouts,
+    retries with jittered exponential backoff and a circuit breaker.
+
+    `base_url` can point at a local fake gateway for tests and benchmarks.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Statuses that mean the request was rejected before any work was done
+    UNPROCESSED_STATUSES = {429, 503}
+
+    def __init__(
+        self,
+        key_id: str,
+        key_secret: str,
+        base_url: str = "https://api.razorpay.com/v1",
+        timeout: float = 10.0,
+        connect_timeout: float = 3.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        max_connections: int = 20,
+        breaker: CircuitBreaker = None,
+        on_attempt=None,
+    ):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0,
+        )
+        self.breaker = breaker or CircuitBreaker()
+        # on_attempt(operation, outcome, seconds) is called after every HTTP attempt
+        self.on_attempt = on_attempt
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(self.key_id, self.key_secret),
+                timeout=self.timeout,
+                limits=self.limits,
+            )
+        return self._client
+
+    def _record(self, operation: str, outcome: str, started: float):
+        if self.on_attempt is not None:
+            self.on_attempt(operation, outcome, time.perf_counter() - started)
+
+    async def _request(self, operation: str, method: str, path: str, json: dict = None,
+                       timeout: float = None, idempotent: bool = True) -> dict:
+        """Non-idempotent calls are retried only when the gateway cannot have
+        acted on them: the connection never opened, or an UNPROCESSED_STATUSES
+        reply. A read timeout or 5xx may follow a created order, so it is not
+        retried."""
+        self.breaker.before_call()
+        # Every exit must settle the breaker, or a half-open trial stays
+        # "in flight" and the circuit never closes again
+        settled = False
+        try:
+            client = self._get_client()
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    delay = self.backoff_base * (2 ** (attempt - 1))
+                    await asyncio.sleep(delay + random.uniform(0, delay))
+                started = time.perf_counter()
+                try:
+                    response = await client.request(
+                        method, path, json=json,
+                        timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                    )
+                except httpx.TimeoutException as e:
+                    self._record(operation, "timeout", started)
+                    last_error = GatewayError(f"{method} {path} timed out: {e!r}")
+                    if idempotent or isinstance(e, (httpx.ConnectTimeout, httpx.PoolTimeout)):
+                        continue
+                    break
+                except httpx.TransportError as e:
+                    self._record(operation, "error", started)
+                    last_error = GatewayError(f"{method} {path} failed: {e!r}")
+                    if idempotent or isinstance(e, httpx.ConnectError):
+                        continue
+                    break
+                self._record(operation, f"{response.status_code // 100}xx", started)
+                if response.status_code in self.RETRY_STATUSES:
+                    last_error = GatewayError(f"{method} {path} returned {response.status_code}")
+                    if idempotent or response.status_code in self.UNPROCESSED_STATUSES:
+                        continue
+                    break
+                if response.status_code >= 400:
+                    # Client errors are ours (bad amount, bad auth): don't retry, don't trip the breaker
+                    settled = True
+                    self.breaker.record_success()
+                    raise GatewayError(f"{method} {path} returned {response.status_code}: {response.text}")
+                settled = True
+                self.breaker.record_success()
+                return response.json()
+
+            settled = True
+            self.breaker.record_failure()
+            logger.warning(f"Payment gateway call gave up after {attempt + 1} attempt(s): {last_error}")
+            raise last_error
+        except asyncio.CancelledError:
+            if not settled:
+                self.breaker.release()
+            raise
+        except Exception:
+            if not settled:
+                self.breaker.record_failure()
+            raise
+
+    async def create_order(self, amount_paise: int, currency: str = "INR", receipt: str = None,
+                           timeout: float = None) -> dict:
+        payload = {"amount": amount_paise, "currency": currency, "payment_capture": 1}
+        if receipt:
+            payload["receipt"] = receipt
+        return await self._request(
+            "create_order", "POST", "/orders", json=payload, timeout=timeout, idempotent=False
+        )
+
+    def verify_payment_signature(self, order_id: str, payment_id: str, signature: str) -> bool:
+        expected = hmac.new(
+            self.key_secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,179 @@
+from collections import deque
+from datetime import datetime, timezone
+from pymongo import monitoring
+import asyncio
+import logging
+import threading
+import time
+
+from metrics import current_scope, route_template
+
+logger = logging.getLogger(__name__)
+
+# Where each command keeps the filter worth showing
+FILTER_KEYS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+}
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+
+
+def redact(value):
+    """Keep the shape of a filter (fields and operators), drop the values."""
+    if isinstance(value, dict):
+        return {k: redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value[:1]] if value else []
+    return "?"
+
+
+def filter_shape(command_name: str, command: dict):
+    if command_name in FILTER_KEYS:
+        return redact(command.get(FILTER_KEYS[command_name]) or {})
+    if command_name == "aggregate":
+        return [redact(stage) for stage in command.get("pipeline", [])]
+    if command_name == "update":
+        return [redact(u.get("q", {})) for u in command.get("updates", [])[:1]]
+    if command_name == "delete":
+        return [redact(d.get("q", {})) for d in command.get("deletes", [])[:1]]
+    return None
+
+
+def summarize_plan(explain: dict) -> dict:
+    """Collect stage names and index names from the winning plan."""
+    stages, indexes = [], []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.append(node["stage"])
+            if "indexName" in node:
+                indexes.append(node["indexName"])
+            for key, child in node.items():
+                if key != "rejectedPlans":
+                    walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+
+    def find_winning(node):
+        if isinstance(node, dict):
+            if "winningPlan" in node:
+                return node["winningPlan"]
+            for child in node.values():
+                found = find_winning(child)
+                if found is not None:
+                    return found
+        elif isinstance(node, list):
+            for child in node:
+                found = find_winning(child)
+                if found is not None:
+                    return found
+        return None
+
+    walk(find_winning(explain) or {})
+    return {"stages": stages, "indexes": indexes, "collscan": "COLLSCAN" in stages}
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Records Mongo commands slower than `threshold_ms` into a ring buffer.
+
+    The listener runs on pymongo's threads and only copies data; the explain
+    for a slow command is run later on the event loop, at most once per
+    (collection, command, filter shape) every `explain_ttl` seconds.
+    """
+
+    def __init__(self, threshold_ms: float = 100, capacity: int = 200, explain_ttl: float = 600):
+        self.threshold_ms = threshold_ms
+        self.explain_ttl = explain_ttl
+        self.records = deque(maxlen=capacity)
+        self._pending = {}
+        self._explained = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._queue = None
+        self._task = None
+        self.db = None
+
+    def started(self, event):
+        if event.command_name in ("getMore", "explain", "killCursors", "endSessions"):
+            return
+        scope = current_scope.get()
+        self._pending[event.request_id] = (
+            event.command_name,
+            event.command,
+            route_template(scope) if scope is not None else None,
+        )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed):
+        started = self._pending.pop(event.request_id, None)
+        if started is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+        command_name, command, route = started
+        collection = command.get(command_name)
+        record = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "command": command_name,
+            "collection": collection if isinstance(collection, str) else None,
+            "duration_ms": round(duration_ms, 2),
+            "filter_shape": filter_shape(command_name, command),
+            "route": route,
+            "failed": failed,
+            "plan": None,
+        }
+        with self._lock:
+            self.records.append(record)
+        if command_name in EXPLAINABLE and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, (record, command))
+            except (RuntimeError, asyncio.QueueFull):
+                pass
+
+    def start(self, db):
+        self.db = db
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=100)
+        self._task = asyncio.create_task(self._explain_worker())
+
+    async def stop(self):
+        self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _explain_worker(self):
+        while True:
+            record, command = await self._queue.get()
+            key = (record["collection"], record["command"], repr(record["filter_shape"]))
+            cached = self._explained.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.explain_ttl:
+                record["plan"] = cached[1]
+                continue
+            explain_cmd = {k: v for k, v in command.items() if not k.startswith("$") and k not in ("lsid", "txnNumber")}
+            try:
+                result = await self.db.command({"explain": explain_cmd, "verbosity": "queryPlanner"})
+                plan = summarize_plan(result)
+            except Exception as e:
+                plan = {"error": str(e)}
+            self._explained[key] = (time.monotonic(), plan)
+            record["plan"] = plan
+
+    def recent(self, limit: int = 50) -> list:
+        with self._lock:
+            return list(self.records)[-limit:][::-1]
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
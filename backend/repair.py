@@ -0,0 +1,59 @@
+"""Rebuild or check the counter collections kept alongside the raw data.
+
+    python repair.py savings_rollups check [--year 2024]
+    python repair.py festival_totals rebuild
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import os
+
+from festival_totals import check_totals, rebuild_totals
+from rollups import check_rollups, rebuild_rollups
+
+# collection: (rebuild, check, what one mismatch row covers, accepts --year)
+TARGETS = {
+    "savings_rollups": (rebuild_rollups, check_rollups, "bucket", True),
+    "festival_totals": (rebuild_totals, check_totals, "festival", False),
+}
+
+
+def run_with_db(fn):
+    """Run `fn(db)` against the database configured in backend/.env."""
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env', override=True)
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+        try:
+            return await fn(client[os.environ['DB_NAME']])
+        finally:
+            client.close()
+
+    return asyncio.run(main())
+
+
+async def repair(db, target: str, command: str, year=None):
+    rebuild, check, unit, scoped = TARGETS[target]
+    scope = {"year": year} if scoped else {}
+    if command == "rebuild":
+        print(await rebuild(db, **scope))
+        return
+    mismatches = await check(db, **scope)
+    for mismatch in mismatches:
+        print(mismatch)
+    print(f"{len(mismatches)} mismatched {unit}(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild or check a counter collection")
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--year", type=int, default=None, help="savings_rollups only")
+    args = parser.parse_args()
+    if args.year is not None and not TARGETS[args.target][3]:
+        parser.error(f"--year does not apply to {args.target}")
+
+    run_with_db(lambda db: repair(db, args.target, args.command, args.year))
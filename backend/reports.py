@@ -0,0 +1,89 @@
+import re
+
+from migrations import as_datetime
+
+PERIOD_PATTERN = re.compile(r"^(\d{4})-(\d{2})$")
+
+
+def parse_period(value: str) -> tuple:
+    """'YYYY-MM' -> (year, month); raises ValueError on anything else."""
+    match = PERIOD_PATTERN.match(value or "")
+    if not match:
+        raise ValueError(f"Invalid period {value!r}, expected YYYY-MM")
+    year, month = int(match.group(1)), int(match.group(2))
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid month in {value!r}")
+    return year, month
+
+
+def period_index(year: int, month: int) -> int:
+    return year * 12 + (month - 1)
+
+
+def period_range(start: tuple, end: tuple) -> list:
+    return [(i // 12, i % 12 + 1) for i in range(period_index(*start), period_index(*end) + 1)]
+
+
+def payment_matrix_pipeline(start: tuple, end: tuple) -> list:
+    """Approved members joined to their successful payments in [start, end].
+
+    The $lookup matches on user_id plus a year range, which the
+    (user_id, year, month) index serves; the exact month bounds and the
+    per-month $group run on that narrowed set.
+    """
+    start_index, end_index = period_index(*start), period_index(*end)
+    month_index = {"$add": [{"$multiply": ["$year", 12]}, {"$subtract": ["$month", 1]}]}
+    return [
+        {"$match": {"is_approved": True, "role": "user"}},
+        {"$sort": {"full_name": 1, "_id": 1}},
+        {"$project": {"_id": 0, "id": 1, "full_name": 1, "created_at": 1}},
+        {"$lookup": {
+            "from": "monthly_payments",
+            "localField": "id",
+            "foreignField": "user_id",
+            "pipeline": [
+                {"$match": {"status": "success", "year": {"$gte": start[0], "$lte": end[0]}}},
+                {"$match": {"$expr": {"$and": [
+                    {"$gte": [month_index, start_index]},
+                    {"$lte": [month_index, end_index]},
+                ]}}},
+                {"$group": {
+                    "_id": {"year": "$year", "month": "$month"},
+                    "amount": {"$sum": "$amount"},
+                }},
+            ],
+            "as": "paid",
+        }},
+    ]
+
+
+def matrix_row(member: dict, periods: list, monthly_amount: float) -> dict:
+    """Shape one member into a paid/unpaid grid with arrears.
+
+    Months before the member joined are reported as None and never count as
+    arrears.
+    """
+    paid = {(p["_id"]["year"], p["_id"]["month"]): p["amount"] for p in member.get("paid", [])}
+    joined = as_datetime(member.get("created_at"))
+    joined_index = period_index(joined.year, joined.month) if joined is not None else None
+
+    months = {}
+    arrears = 0
+    for year, month in periods:
+        key = f"{year:04d}-{month:02d}"
+        if (year, month) in paid:
+            months[key] = True
+        elif joined_index is not None and period_index(year, month) < joined_index:
+            months[key] = None
+        else:
+            months[key] = False
+            arrears += 1
+
+    return {
+        "user_id": member["id"],
+        "full_name": member.get("full_name"),
+        "months": months,
+        "paid_months": len(paid),
+        "arrears_months": arrears,
+        "arrears_amount": arrears * monthly_amount,
+    }
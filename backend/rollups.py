@@ -0,0 +1,130 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from pymongo import ReplaceOne, UpdateOne
+from typing import Optional
+
+# savings_rollups holds one document per (year, month) with the count and sum
+# of successful monthly_payments, plus a month=0 document per year holding the
+# yearly totals. verify_payment and the webhook worker $inc both when a
+# payment flips to success. rebuild/check repair drift
+# (`python repair.py savings_rollups check`).
+
+YEAR_TOTAL_MONTH = 0
+
+
+def _rollup_doc(year: int, month: int, paid_count: int, total_amount: float) -> dict:
+    return {
+        "year": year,
+        "month": month,
+        "paid_count": paid_count,
+        "total_amount": total_amount,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+async def record_successful_payment(db, year: int, month: int, amount: float):
+    now = datetime.now(timezone.utc)
+    for rollup_month in (month, YEAR_TOTAL_MONTH):
+        await db.savings_rollups.update_one(
+            {"year": year, "month": rollup_month},
+            {"$inc": {"paid_count": 1, "total_amount": amount}, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+
+
+async def record_successful_payments(db, payments: list):
+    """Batch form of record_successful_payment for payments flipped together."""
+    totals = defaultdict(lambda: [0, 0.0])
+    for p in payments:
+        for rollup_month in (p["month"], YEAR_TOTAL_MONTH):
+            bucket = totals[(p["year"], rollup_month)]
+            bucket[0] += 1
+            bucket[1] += p["amount"]
+    if not totals:
+        return
+    now = datetime.now(timezone.utc)
+    await db.savings_rollups.bulk_write([
+        UpdateOne(
+            {"year": year, "month": month},
+            {"$inc": {"paid_count": count, "total_amount": amount}, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+        for (year, month), (count, amount) in totals.items()
+    ], ordered=False)
+
+
+async def get_rollups(db, year: int, month: int) -> dict:
+    """Return {"month": {...}, "year": {...}} read in a single query."""
+    docs = await db.savings_rollups.find(
+        {"year": year, "month": {"$in": [month, YEAR_TOTAL_MONTH]}}, {"_id": 0}
+    ).to_list(2)
+    by_month = {d["month"]: d for d in docs}
+    empty = {"paid_count": 0, "total_amount": 0}
+    return {
+        "month": by_month.get(month, empty),
+        "year": by_month.get(YEAR_TOTAL_MONTH, empty),
+    }
+
+
+async def compute_rollups_from_payments(db, year: Optional[int] = None) -> dict:
+    """Aggregate raw monthly_payments into {(year, month): (count, total)}."""
+    match = {"status": "success"}
+    if year is not None:
+        match["year"] = year
+    rows = await db.monthly_payments.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": {"year": "$year", "month": "$month"},
+            "paid_count": {"$sum": 1},
+            "total_amount": {"$sum": "$amount"},
+        }},
+    ]).to_list(None)
+
+    expected = {}
+    for row in rows:
+        y, m = row["_id"]["year"], row["_id"]["month"]
+        expected[(y, m)] = (row["paid_count"], row["total_amount"])
+        count, total = expected.get((y, YEAR_TOTAL_MONTH), (0, 0))
+        expected[(y, YEAR_TOTAL_MONTH)] = (count + row["paid_count"], total + row["total_amount"])
+    return expected
+
+
+async def rebuild_rollups(db, year: Optional[int] = None) -> dict:
+    """Recompute rollups from raw payments (backfill or repair)."""
+    expected = await compute_rollups_from_payments(db, year)
+    scope = {"year": year} if year is not None else {}
+
+    if expected:
+        await db.savings_rollups.bulk_write([
+            ReplaceOne({"year": y, "month": m}, _rollup_doc(y, m, count, total), upsert=True)
+            for (y, m), (count, total) in expected.items()
+        ], ordered=False)
+    stale = await db.savings_rollups.find(scope, {"_id": 1, "year": 1, "month": 1}).to_list(None)
+    stale_ids = [d["_id"] for d in stale if (d["year"], d["month"]) not in expected]
+    if stale_ids:
+        await db.savings_rollups.delete_many({"_id": {"$in": stale_ids}})
+    return {"rebuilt": len(expected), "removed": len(stale_ids)}
+
+
+async def check_rollups(db, year: Optional[int] = None) -> list:
+    """List (year, month) buckets where the rollup disagrees with raw payments."""
+    expected = await compute_rollups_from_payments(db, year)
+    scope = {"year": year} if year is not None else {}
+    actual = {
+        (d["year"], d["month"]): (d.get("paid_count", 0), d.get("total_amount", 0))
+        for d in await db.savings_rollups.find(scope, {"_id": 0}).to_list(None)
+    }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        exp = expected.get(key, (0, 0))
+        act = actual.get(key, (0, 0))
+        if exp[0] != act[0] or abs(exp[1] - act[1]) > 1e-6:
+            mismatches.append({
+                "year": key[0],
+                "month": key[1],
+                "expected": {"paid_count": exp[0], "total_amount": exp[1]},
+                "actual": {"paid_count": act[0], "total_amount": act[1]},
+            })
+    return mismatches
+
@@ -0,0 +1,59 @@
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic_core import PydanticUndefined
+import orjson
+
+# orjson encodes datetimes, UUIDs and dataclasses natively; OPT_UTC_Z writes
+# aware UTC datetimes with a trailing "Z", the same as pydantic's JSON mode.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value) -> bytes:
+    return orjson.dumps(value, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson; the app's default response class."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+_lean_fields = {}
+
+
+def _fields_for(model):
+    fields = _lean_fields.get(model)
+    if fields is None:
+        fields = _lean_fields[model] = tuple(
+            (name, field.default)
+            for name, field in model.model_fields.items()
+        )
+    return fields
+
+
+def lean_rows(docs: list, model) -> list:
+    """Shape trusted documents like `model` without validating them.
+
+    For documents the app wrote itself through `model`: keeps only the
+    model's fields (so extras such as password never leak) and fills plain
+    defaults for fields older documents lack. Values are passed through
+    as stored, so this is not a substitute for validating untrusted input.
+    """
+    fields = _fields_for(model)
+    rows = []
+    for doc in docs:
+        row = {}
+        for name, default in fields:
+            if name in doc:
+                row[name] = doc[name]
+            elif default is not PydanticUndefined:
+                row[name] = default
+        rows.append(row)
+    return rows
@@ -1,48 +1,172 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
-import razorpay
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
+import socket
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 import calendar
+import hashlib
+import json
+from indexes import ensure_indexes, check_index_drift, get_index_stats
+from password_hashing import PasswordHasher, PasswordPoolFull
+from caching import TTLCache, VersionedSnapshot, etag_matches
+from pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER,
+    date_range_filter, fetch_page, name_prefix_filter, page_response, parse_fields
+)
+from concurrency import gather_bounded, SingleFlight, PeriodicTask
+from orders import is_reusable, expire_pending, expire_stale_pending
+from migrations import run_pending_migrations
+from exports import EXPORTS, export_stream
+from reports import parse_period, period_range, payment_matrix_pipeline, matrix_row
+from rollups import (
+    record_successful_payment, record_successful_payments, get_rollups, rebuild_rollups, check_rollups
+)
+from festival_totals import (
+    record_expense, drop_totals, get_totals, summarize as summarize_festivals, rebuild_totals, check_totals
+)
+from user_import import (
+    MAX_REPORTED_ERRORS, ImportFormatError, csv_row_batches, existing_identities, insert_users
+)
+from auth_tokens import (
+    RevocationList, RefreshTokenInvalid, issue_refresh_token, rotate_refresh_token,
+    revoke_refresh_family, revoke_refresh_token, revoke_user_refresh_tokens
+)
+from sync import SYNC_COLLECTIONS, InvalidSyncToken, changes_since, record_deletes, stamp
+from events import (
+    EventBus, ChangeStreamFeed, sse_stream, supports_change_streams,
+    publish_payment_succeeded, publish_user_registered, publish_user_approved, publish_expense_added
+)
+from webhooks import WebhookProcessor, store_event, verify_webhook_signature
+from metrics import (
+    registry, MetricsMiddleware, MongoCommandMetrics, gateway_request_duration
+)
+from query_log import SlowQueryLog
+from serialization import FastJSONResponse, dumps, lean_rows
+from compression import CompressionMiddleware, negotiate_encoding
+from database import PoolStats, client_options, heavy_read_preference, prewarm
+from structured_logging import configure_logging, dropped_records, AccessLogMiddleware
+from payment_gateway import RazorpayGateway, CircuitBreaker, GatewayUnavailable
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env', override=True)
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware: dates are stored as native BSON dates and come back as aware UTC datetimes
+slow_query_log = SlowQueryLog(
+    threshold_ms=float(os.environ.get("SLOW_QUERY_MS", 100)),
+    capacity=int(os.environ.get("SLOW_QUERY_BUFFER", 200))
+)
+mongo_pool_stats = PoolStats()
+client = AsyncIOMotorClient(
+    mongo_url,
+    tz_aware=True,
+    event_listeners=[MongoCommandMetrics(), slow_query_log, mongo_pool_stats],
+    **client_options()
+)
 db = client[os.environ['DB_NAME']]
+# Large read-only listings and exports tolerate replication lag; sending them
+# to secondaries keeps the primary's pool for writes and read-your-write paths
+read_db = client.get_database(os.environ['DB_NAME'], read_preference=heavy_read_preference())
 
 # Razorpay Client
-rzp_client = razorpay.Client(auth=(
-    os.environ.get("RAZORPAY_KEY_ID", "rzp_test_placeholder"),
-    os.environ.get("RAZORPAY_KEY_SECRET", "placeholder_secret")
-))
+payment_gateway = RazorpayGateway(
+    key_id=os.environ.get("RAZORPAY_KEY_ID", "rzp_test_placeholder"),
+    key_secret=os.environ.get("RAZORPAY_KEY_SECRET", "placeholder_secret"),
+    base_url=os.environ.get("RAZORPAY_BASE_URL", "https://api.razorpay.com/v1"),
+    timeout=float(os.environ.get("RAZORPAY_TIMEOUT_SECONDS", 10)),
+    max_retries=int(os.environ.get("RAZORPAY_MAX_RETRIES", 2)),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get("RAZORPAY_BREAKER_THRESHOLD", 5)),
+        reset_timeout=float(os.environ.get("RAZORPAY_BREAKER_RESET_SECONDS", 30))
+    ),
+    on_attempt=lambda operation, outcome, seconds: gateway_request_duration.observe(
+        operation, outcome, value=seconds
+    )
+)
+
+# Live events for /api/events (SSE). Write handlers publish through emit()
+# unless the change stream feed is running, which then sees every worker's writes
+event_bus = EventBus(
+    max_subscribers=int(os.environ.get("SSE_MAX_SUBSCRIBERS", 500)),
+    max_queue=int(os.environ.get("SSE_MAX_QUEUE", 100))
+)
+change_feed = ChangeStreamFeed(db, event_bus)
+EVENTS_SOURCE = os.environ.get("EVENTS_SOURCE", "auto")  # auto | local | change_stream
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", 15))
+
+def emit(publish, *args):
+    if not change_feed.running:
+        publish(event_bus, *args)
+
+async def on_payments_settled(payments: list):
+    await record_successful_payments(db, payments)
+    for payment in payments:
+        emit(publish_payment_succeeded, payment)
+
+RAZORPAY_WEBHOOK_SECRET = os.environ.get("RAZORPAY_WEBHOOK_SECRET")
+webhook_processor = WebhookProcessor(
+    db,
+    on_success=on_payments_settled,
+    batch_size=int(os.environ.get("WEBHOOK_BATCH_SIZE", 100)),
+    poll_interval=float(os.environ.get("WEBHOOK_POLL_SECONDS", 2))
+)
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Security
 security = HTTPBearer()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+optional_security = HTTPBearer(auto_error=False)
+password_hasher = PasswordHasher(
+    workers=int(os.environ.get("PASSWORD_HASH_WORKERS", 4)),
+    rounds=int(os.environ.get("BCRYPT_ROUNDS", 12)),
+    max_queue=int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", 64))
+)
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", 30))
 ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "shrujan@2004")
+# Admin sessions get a short absolute lifetime and are bound to the password
+# they were opened with: changing ADMIN_PASSWORD ends them at the next refresh
+ADMIN_SESSION_HOURS = int(os.environ.get("ADMIN_SESSION_HOURS", 12))
+ADMIN_CREDENTIAL = hashlib.sha256(f"{SECRET_KEY}:{ADMIN_PASSWORD}".encode()).hexdigest()
+MONTHLY_SAVINGS_AMOUNT = float(os.environ.get("MONTHLY_SAVINGS_AMOUNT", 100))
+MAX_MATRIX_MONTHS = 36
+
+# Authenticated user documents, keyed by user id. Per-process: writes in this
+# process invalidate immediately, other workers converge within the TTL.
+user_cache = TTLCache(
+    max_size=int(os.environ.get("USER_CACHE_MAX_SIZE", 1024)),
+    ttl=float(os.environ.get("USER_CACHE_TTL_SECONDS", 30))
+)
+
+# Access tokens carry role and is_approved, so resolve_user answers most
+# requests from the JWT alone. Revocations (logout, delete, approval) go to
+# Mongo and every worker reloads them on this interval; an entry only has to
+# outlive the access tokens it cancels.
+revocations = RevocationList(ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 60)
+revocation_sync = PeriodicTask(
+    "sync-revocations",
+    lambda: revocations.sync(db),
+    interval=float(os.environ.get("REVOCATION_SYNC_SECONDS", 5))
+)
 
 # Models
 class UserCreate(BaseModel):
@@ -72,6 +196,11 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     user: User
+    refresh_token: Optional[str] = None
+    expires_in: int = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class MonthlyPayment(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -87,6 +216,11 @@ class MonthlyPayment(BaseModel):
     razorpay_order_id: Optional[str] = None
     razorpay_payment_id: Optional[str] = None
     razorpay_signature: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+# Payment documents also carry the gateway order, idempotency key and
+# settlement batch; responses only ever get the model's own fields
+PAYMENT_PROJECTION = {"_id": 0, **{field: 1 for field in MonthlyPayment.model_fields}}
 
 class Festival(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -147,39 +281,88 @@ class AchievementCreate(BaseModel):
     image_url: Optional[str] = None
 
 # Helper functions
-def hash_password(password: str) -> str:
+async def hash_password(password: str) -> str:
     if len(password.encode('utf-8')) > 72:
         raise HTTPException(status_code=400, detail="Password is too long (max 72 bytes)")
-    return pwd_context.hash(password)
+    try:
+        return await password_hasher.hash(password)
+    except PasswordPoolFull:
+        raise HTTPException(status_code=503, detail="Server busy, please try again")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordPoolFull:
+        raise HTTPException(status_code=503, detail="Server busy, please try again")
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Millisecond iat, floored, so revocation can compare within a second
+    to_encode.update({"exp": expire, "iat": int(now.timestamp() * 1000) / 1000, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
+async def issue_tokens(user: dict) -> dict:
+    """Access + refresh token pair for a user document (or the admin)."""
+    access_token = create_access_token(
+        data={"sub": user["id"], "role": user["role"], "appr": bool(user.get("is_approved"))}
+    )
+    is_admin = user["role"] == "admin"
+    lifetime = timedelta(hours=ADMIN_SESSION_HOURS) if is_admin else timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    refresh_token = await issue_refresh_token(
+        db, user["id"], user["role"], datetime.now(timezone.utc) + lifetime,
+        credential=ADMIN_CREDENTIAL if is_admin else None
+    )
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await resolve_user(request, credentials.credentials)
+
+def decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        role: str = payload.get("role")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    if payload.get("sub") is None or revocations.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return payload
+
+async def resolve_user(request: Request, token: str) -> dict:
+    payload = decode_access_token(token)
+    user_id: str = payload["sub"]
+    role: str = payload.get("role")
     
+    # Picked up by the access log
+    request.state.user_id = user_id
     if role == "admin":
         return {"id": "admin", "role": "admin", "full_name": "Admin"}
-    
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    if "appr" in payload:
+        # No DB read: handlers only need these three fields (get_me loads the rest)
+        return {"id": user_id, "role": role, "is_approved": payload["appr"]}
+    return await load_user(user_id)
+
+async def load_user(user_id: str) -> dict:
+    user = user_cache.get(user_id)
     if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.set(user_id, user)
+    return dict(user)
+
+async def get_stream_user(
+    request: Request,
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    # EventSource can't send headers, so streams also accept ?token=
+    if credentials is not None:
+        token = credentials.credentials
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await resolve_user(request, token)
 
 async def get_current_approved_user(current_user: dict = Depends(get_current_user)):
     if current_user.get("role") == "admin":
@@ -206,7 +389,7 @@ async def register(user_data: UserCreate):
     if existing_phone:
         raise HTTPException(status_code=400, detail="Phone number already registered")
     
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     user = User(
         full_name=user_data.full_name,
         email=user_data.email,
@@ -215,11 +398,12 @@ async def register(user_data: UserCreate):
         role="user"
     )
     
-    user_dict = user.model_dump()
+    user_dict = {**user.model_dump(), **await stamp(db)}
     user_dict["password"] = hashed_password
-    user_dict["created_at"] = user_dict["created_at"].isoformat()
     
     await db.users.insert_one(user_dict)
+    user_cache.invalidate(user.id)
+    emit(publish_user_registered, user_dict)
     return user
 
 @api_router.post("/auth/login", response_model=Token)
@@ -228,30 +412,20 @@ async def login(login_data: UserLogin):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not verify_password(login_data.password, user["password"]):
+    if not await verify_password(login_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    access_token = create_access_token(
-        data={"sub": user["id"], "role": user["role"]}
-    )
-    
-    # Convert ISO string back to datetime
-    if isinstance(user["created_at"], str):
-        user["created_at"] = datetime.fromisoformat(user["created_at"])
+    tokens = await issue_tokens(user)
     
     user_obj = User(**{k: v for k, v in user.items() if k != "password"})
     
-    return Token(access_token=access_token, token_type="bearer", user=user_obj)
+    return Token(**tokens, user=user_obj)
 
 @api_router.post("/auth/admin-login", response_model=Token)
 async def admin_login(login_data: AdminLogin):
     if login_data.password != ADMIN_PASSWORD:
         raise HTTPException(status_code=401, detail="Invalid admin password")
     
-    access_token = create_access_token(
-        data={"sub": "admin", "role": "admin"}
-    )
-    
     admin_user = User(
         id="admin",
         full_name="Admin",
@@ -260,65 +434,275 @@ async def admin_login(login_data: AdminLogin):
         is_approved=True,
         role="admin"
     )
+    tokens = await issue_tokens(admin_user.model_dump())
+    
+    return Token(**tokens, user=admin_user)
+
+@api_router.post("/auth/refresh", response_model=Token)
+async def refresh_access_token(data: RefreshRequest):
+    try:
+        record = await rotate_refresh_token(db, data.refresh_token)
+    except RefreshTokenInvalid:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
     
-    return Token(access_token=access_token, token_type="bearer", user=admin_user)
+    # Re-read the user so role and approval in the new access token are current
+    if record["role"] == "admin":
+        if record.get("credential") != ADMIN_CREDENTIAL:
+            await revoke_refresh_family(db, record["family"])
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+        user = {"id": "admin", "full_name": "Admin", "email": "admin@balaga.com", "phone": "",
+                "is_approved": True, "role": "admin"}
+    else:
+        user_cache.invalidate(record["user_id"])
+        user = await db.users.find_one({"id": record["user_id"]}, {"_id": 0, "password": 0})
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+    
+    access_token = create_access_token(
+        data={"sub": user["id"], "role": user["role"], "appr": bool(user.get("is_approved"))}
+    )
+    # The successor keeps the family's expiry: refreshing never extends a login
+    refresh_token = await issue_refresh_token(
+        db, user["id"], user["role"], record["expires_at"],
+        family=record["family"], credential=record.get("credential")
+    )
+    return Token(access_token=access_token, refresh_token=refresh_token, token_type="bearer", user=User(**user))
+
+@api_router.post("/auth/logout")
+async def logout(
+    data: Optional[RefreshRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    # Usually called after the access token has expired; the refresh token
+    # alone is enough to end the session
+    if data is not None:
+        await revoke_refresh_token(db, data.refresh_token)
+    if credentials is not None:
+        try:
+            payload = decode_access_token(credentials.credentials)
+        except HTTPException:
+            payload = {}  # expired or already revoked: nothing left to deny
+        if payload.get("jti"):
+            await revocations.revoke_token(db, payload["jti"])
+    return {"message": "Logged out"}
 
 @api_router.get("/auth/me", response_model=User)
 async def get_me(current_user: dict = Depends(get_current_user)):
-    if isinstance(current_user["created_at"], str):
-        current_user["created_at"] = datetime.fromisoformat(current_user["created_at"])
-    return User(**current_user)
+    if current_user["role"] == "admin":
+        return User(**current_user, email="admin@balaga.com", phone="", is_approved=True)
+    return User(**await load_user(current_user["id"]))
+
+# Fields clients may request through ?fields=; never includes password
+USER_FIELDS = {"id", "full_name", "email", "phone", "is_approved", "role", "created_at"}
+FESTIVAL_FIELDS = set(Festival.model_fields)
+EXPENSE_FIELDS = set(Expense.model_fields)
 
 # User management routes (Admin only)
 @api_router.get("/users", response_model=List[User])
-async def get_users(current_user: dict = Depends(get_admin_user)):
-    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(1000)
-    for user in users:
-        if isinstance(user["created_at"], str):
-            user["created_at"] = datetime.fromisoformat(user["created_at"])
-    return users
+async def get_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    approved: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_admin_user)
+):
+    query = {}
+    if approved is not None:
+        query["is_approved"] = approved
+    if name_prefix:
+        query["full_name"] = name_prefix_filter(name_prefix)
+    projection = parse_fields(fields, USER_FIELDS) or {"password": 0}
+
+    users, next_cursor = await fetch_page(db.users, query, projection, limit, after)
+    return page_response(users, next_cursor, None if fields else User)
 
 @api_router.put("/users/{user_id}/approve")
 async def approve_user(user_id: str, current_user: dict = Depends(get_admin_user)):
     result = await db.users.update_one(
         {"id": user_id},
-        {"$set": {"is_approved": True}}
+        {"$set": {"is_approved": True, **await stamp(db)}}
     )
+    user_cache.invalidate(user_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    # Outstanding tokens still say appr=false; a 401 makes the client refresh
+    await revocations.revoke_user(db, user_id)
+    emit(publish_user_approved, user_id)
     return {"message": "User approved successfully"}
 
+class UserIds(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+@api_router.post("/users/batch-approve")
+async def batch_approve_users(data: UserIds, current_user: dict = Depends(get_admin_user)):
+    ids = list(set(data.user_ids))
+    pending = await db.users.distinct("id", {"id": {"$in": ids}, "is_approved": {"$ne": True}})
+    result = await db.users.update_many(
+        {"id": {"$in": pending}, "is_approved": {"$ne": True}}, {"$set": {"is_approved": True, **await stamp(db)}}
+    )
+    for user_id in ids:
+        user_cache.invalidate(user_id)
+    await revocations.revoke_users(db, pending)
+    for user_id in pending:
+        emit(publish_user_approved, user_id)
+    return {"matched": result.matched_count, "approved": result.modified_count}
+
+@api_router.post("/users/batch-delete")
+async def batch_delete_users(data: UserIds, current_user: dict = Depends(get_admin_user)):
+    ids = list(set(data.user_ids))
+    result = await db.users.delete_many({"id": {"$in": ids}})
+    for user_id in ids:
+        user_cache.invalidate(user_id)
+    await revocations.revoke_users(db, ids)
+    await revoke_user_refresh_tokens(db, ids)
+    await record_deletes(db, "members", ids)
+    return {"deleted": result.deleted_count}
+
+@api_router.post("/users/import")
+async def import_users(
+    request: Request,
+    approve: bool = False,
+    current_user: dict = Depends(get_admin_user)
+):
+    # CSV body with full_name,email,phone,password columns, processed in batches
+    # as it streams in; bad rows are reported by line and don't stop the file
+    imported = 0
+    errors = []
+    error_count = 0
+    seen_emails, seen_phones = set(), set()
+
+    def reject(line, error):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "error": error})
+
+    try:
+        async for batch in csv_row_batches(request.stream()):
+            candidates = []
+            for line, row in batch:
+                try:
+                    data = UserCreate(**row)
+                except ValidationError as e:
+                    reject(line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                    continue
+                if len(data.password.encode("utf-8")) > 72:
+                    reject(line, "Password is too long (max 72 bytes)")
+                elif data.email in seen_emails or data.phone in seen_phones:
+                    reject(line, "Duplicate email or phone in file")
+                else:
+                    seen_emails.add(data.email)
+                    seen_phones.add(data.phone)
+                    candidates.append((line, data))
+            if not candidates:
+                continue
+
+            taken_emails, taken_phones = await existing_identities(
+                db, [d.email for _, d in candidates], [d.phone for _, d in candidates]
+            )
+            fresh = []
+            for line, data in candidates:
+                if data.email in taken_emails:
+                    reject(line, "Email already registered")
+                elif data.phone in taken_phones:
+                    reject(line, "Phone number already registered")
+                else:
+                    fresh.append((line, data))
+
+            # Bounded to the pool's workers so the import rarely fills its queue.
+            # A row that still finds it full (login burst) is reported, not
+            # raised: raising would cancel the sibling hashes and lose the
+            # report for the rows already inserted.
+            async def hash_or_busy(password):
+                try:
+                    return await password_hasher.hash(password)
+                except PasswordPoolFull:
+                    return None
+
+            hashes = await gather_bounded(
+                *(hash_or_busy(d.password) for _, d in fresh), limit=password_hasher.workers
+            )
+            rows = []
+            revision = await stamp(db)
+            for (line, data), hashed in zip(fresh, hashes):
+                if hashed is None:
+                    reject(line, "Server busy, retry this row")
+                    continue
+                user = User(full_name=data.full_name, email=data.email, phone=data.phone,
+                            is_approved=approve, role="user")
+                rows.append((line, {**user.model_dump(), **revision, "password": hashed}))
+            inserted, insert_errors = await insert_users(db, rows)
+            imported += len(inserted)
+            for doc in inserted:
+                if approve:
+                    emit(publish_user_approved, doc["id"])
+                else:
+                    emit(publish_user_registered, doc)
+            for err in insert_errors:
+                reject(err["line"], err["error"])
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"imported": imported, "error_count": error_count, "errors": errors}
+
 @api_router.delete("/users/{user_id}")
 async def delete_user(user_id: str, current_user: dict = Depends(get_admin_user)):
     result = await db.users.delete_one({"id": user_id})
+    user_cache.invalidate(user_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    await revocations.revoke_user(db, user_id)
+    await revoke_user_refresh_tokens(db, [user_id])
+    await record_deletes(db, "members", [user_id])
     return {"message": "User deleted successfully"}
 
 # Members routes
+async def paid_user_ids_for(month: int, year: int, user_ids: Optional[list] = None) -> set:
+    query = {"month": month, "year": year, "status": "success"}
+    if user_ids is not None:
+        query["user_id"] = {"$in": user_ids}
+    return set(await db.monthly_payments.distinct("user_id", query))
+
+def approved_members_query(name_prefix: Optional[str], paid: Optional[bool], paid_ids: set) -> dict:
+    query = {"is_approved": True, "role": "user"}
+    if name_prefix:
+        query["full_name"] = name_prefix_filter(name_prefix)
+    if paid is not None:
+        query["id"] = {"$in" if paid else "$nin": list(paid_ids)}
+    return query
+
 @api_router.get("/members")
-async def get_members(current_user: dict = Depends(get_current_approved_user)):
+async def get_members(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    paid: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_approved_user)
+):
     now = datetime.now(timezone.utc)
     current_month = now.month
     current_year = now.year
 
-    members = await db.users.find(
-        {"is_approved": True, "role": "user"},
-        {"_id": 0, "password": 0}
-    ).to_list(1000)
-
-    # Get all payments for current month to optimize
-    payments = await db.monthly_payments.find(
-        {"month": current_month, "year": current_year, "status": "success"},
-        {"user_id": 1, "_id": 0}
-    ).to_list(1000)
-    paid_user_ids = {p["user_id"] for p in payments}
+    projection = parse_fields(fields, USER_FIELDS) or {"password": 0}
+    if paid is None:
+        # Look up payments only for the ids on this page: a second round trip,
+        # but its result grows with the page size rather than the membership
+        members, next_cursor = await fetch_page(
+            read_db.users, approved_members_query(name_prefix, None, set()), projection, limit, after
+        )
+        paid_user_ids = await paid_user_ids_for(current_month, current_year, [m["id"] for m in members])
+    else:
+        # With a paid/unpaid filter the month's payers decide which members match
+        paid_user_ids = await paid_user_ids_for(current_month, current_year)
+        members, next_cursor = await fetch_page(
+            read_db.users, approved_members_query(name_prefix, paid, paid_user_ids), projection, limit, after
+        )
 
     for member in members:
-        if isinstance(member["created_at"], str):
-            member["created_at"] = datetime.fromisoformat(member["created_at"])
         member["has_paid_current_month"] = member["id"] in paid_user_ids
-    return members
+    return page_response(members, next_cursor)
 
 # Monthly savings routes
 @api_router.get("/savings/current")
@@ -335,7 +719,7 @@ async def get_current_month_savings(current_user: dict = Depends(get_current_app
             "year": current_year,
             "status": "success"
         },
-        {"_id": 0}
+        PAYMENT_PROJECTION
     )
     
     month_name = calendar.month_name[current_month]
@@ -350,29 +734,86 @@ async def get_current_month_savings(current_user: dict = Depends(get_current_app
 class OrderCreate(BaseModel):
     amount: int
 
+PENDING_ORDER_TTL = timedelta(minutes=int(os.environ.get("PENDING_ORDER_TTL_MINUTES", 30)))
+order_coalescer = SingleFlight()
+
+async def create_or_reuse_order(user_id: str, month: int, year: int, amount: int, idempotency_key: Optional[str]):
+    pending = await db.monthly_payments.find_one(
+        {"user_id": user_id, "month": month, "year": year, "status": "pending"},
+        {"_id": 0}
+    )
+    if pending:
+        if is_reusable(pending, amount, PENDING_ORDER_TTL):
+            return pending["order"]
+        await expire_pending(db, pending["id"])
+
+    payment = MonthlyPayment(user_id=user_id, month=month, year=year, amount=amount, status="pending")
+    order = await payment_gateway.create_order(amount * 100, receipt=payment.id)
+    payment.razorpay_order_id = order["id"]
+    payment_dict = payment.model_dump()
+    payment_dict["order"] = order
+    if idempotency_key:
+        payment_dict["idempotency_key"] = idempotency_key
+    try:
+        await db.monthly_payments.insert_one(payment_dict)
+    except DuplicateKeyError:
+        # Another worker created the pending row first; hand out its order instead
+        existing = await db.monthly_payments.find_one(
+            {"user_id": user_id, "month": month, "year": year, "status": "pending"},
+            {"_id": 0, "order": 1}
+        )
+        if existing and existing.get("order"):
+            return existing["order"]
+        raise
+    return order
+
 @api_router.post("/savings/create-order")
-async def create_razorpay_order(data: OrderCreate, current_user: dict = Depends(get_current_approved_user)):
+async def create_razorpay_order(
+    data: OrderCreate,
+    request: Request,
+    current_user: dict = Depends(get_current_approved_user)
+):
+    idempotency_key = request.headers.get("idempotency-key")
     try:
-        order = rzp_client.order.create({
-            'amount': data.amount * 100,
-            'currency': 'INR',
-            'payment_capture': 1
-        })
+        if idempotency_key:
+            previous = await db.monthly_payments.find_one(
+                {"user_id": current_user["id"], "idempotency_key": idempotency_key},
+                {"_id": 0, "order": 1}
+            )
+            if previous and previous.get("order"):
+                return previous["order"]
+
         now = datetime.now(timezone.utc)
-        payment = MonthlyPayment(
-            user_id=current_user["id"],
-            month=now.month,
-            year=now.year,
-            amount=data.amount,
-            status="pending",
-            razorpay_order_id=order['id']
+        return await order_coalescer.run(
+            (current_user["id"], now.month, now.year, data.amount),
+            lambda: create_or_reuse_order(current_user["id"], now.month, now.year, data.amount, idempotency_key)
         )
-        await db.monthly_payments.insert_one(payment.model_dump())
-        return order
+    except GatewayUnavailable:
+        raise HTTPException(status_code=503, detail="Payment gateway temporarily unavailable")
     except Exception as e:
         logger.error(f"Error creating order: {str(e)}")
         raise HTTPException(status_code=500, detail="Payment gateway error")
 
+async def expire_stale_orders():
+    return await expire_stale_pending(db, PENDING_ORDER_TTL)
+
+pending_order_janitor = PeriodicTask(
+    "expire-stale-orders",
+    expire_stale_orders,
+    interval=float(os.environ.get("PENDING_ORDER_SWEEP_SECONDS", 300))
+)
+
+# Backfills run in the background so startup never waits on them. Workers
+# share a lease, so only one runs them; the others retry on this interval and
+# take over if the holder dies. RUN_MIGRATIONS=false leaves them to
+# `python migrations.py` run as a deploy step.
+RUN_MIGRATIONS = os.environ.get("RUN_MIGRATIONS", "true").lower() == "true"
+migration_runner = PeriodicTask(
+    "migrations",
+    lambda: run_pending_migrations(db, f"{socket.gethostname()}:{os.getpid()}"),
+    interval=float(os.environ.get("MIGRATION_RETRY_SECONDS", 300))
+)
+
 class PaymentVerify(BaseModel):
     razorpay_order_id: str
     razorpay_payment_id: str
@@ -380,135 +821,189 @@ class PaymentVerify(BaseModel):
 
 @api_router.post("/savings/verify-payment")
 async def verify_payment(data: PaymentVerify, current_user: dict = Depends(get_current_approved_user)):
-    try:
-        rzp_client.utility.verify_payment_signature(data.model_dump())
+    if not payment_gateway.verify_payment_signature(
+        data.razorpay_order_id, data.razorpay_payment_id, data.razorpay_signature
+    ):
+        # Failure only applies to the caller's own rows still pending; a success
+        # row is already counted in the rollups
         await db.monthly_payments.update_one(
-            {"razorpay_order_id": data.razorpay_order_id},
-            {
-                "$set": {
-                    "status": "success",
-                    "razorpay_payment_id": data.razorpay_payment_id,
-                    "razorpay_signature": data.razorpay_signature,
-                    "transaction_id": data.razorpay_payment_id,
-                    "payment_date": datetime.now(timezone.utc)
-                }
-            }
-        )
-        return {"status": "success"}
-    except Exception as e:
-        await db.monthly_payments.update_one(
-            {"razorpay_order_id": data.razorpay_order_id},
+            {"razorpay_order_id": data.razorpay_order_id, "user_id": current_user["id"], "status": "pending"},
             {"$set": {"status": "failed"}}
         )
         raise HTTPException(status_code=400, detail="Payment verification failed")
 
+    # Only the call that actually flips the row to success updates the rollups,
+    # so retried verifications don't double count.
+    previous = await db.monthly_payments.find_one_and_update(
+        {"razorpay_order_id": data.razorpay_order_id, "status": {"$ne": "success"}},
+        {
+            "$set": {
+                "status": "success",
+                "razorpay_payment_id": data.razorpay_payment_id,
+                "razorpay_signature": data.razorpay_signature,
+                "transaction_id": data.razorpay_payment_id,
+                "payment_date": datetime.now(timezone.utc)
+            }
+        },
+        projection={"_id": 0, "year": 1, "month": 1, "amount": 1, "user_id": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is not None:
+        await record_successful_payment(db, previous["year"], previous["month"], previous["amount"])
+        emit(publish_payment_succeeded, previous)
+    return {"status": "success"}
+
+# Razorpay webhooks: verify, store in the inbox and acknowledge; the
+# WebhookProcessor applies the state changes in the background
+@api_router.post("/webhooks/razorpay")
+async def razorpay_webhook(request: Request):
+    if not RAZORPAY_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="Webhook secret not configured")
+    body = await request.body()
+    if not verify_webhook_signature(RAZORPAY_WEBHOOK_SECRET, body, request.headers.get("x-razorpay-signature")):
+        raise HTTPException(status_code=400, detail="Invalid webhook signature")
+    try:
+        event = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+
+    event_id = request.headers.get("x-razorpay-event-id") or hashlib.sha256(body).hexdigest()
+    if await store_event(db, event_id, event):
+        webhook_processor.notify()
+    return {"status": "ok"}
+
 @api_router.get("/savings/analytics")
 async def get_savings_analytics(current_user: dict = Depends(get_admin_user)):
     now = datetime.now(timezone.utc)
     current_month = now.month
     current_year = now.year
     
-    # Get total approved members
-    total_members = await db.users.count_documents({"is_approved": True, "role": "user"})
-    
-    # Get payments for current month (success only)
-    payments = await db.monthly_payments.count_documents(
-        {"month": current_month, "year": current_year, "status": "success"}
+    # Approved member count, and month/year totals from savings_rollups
+    # (maintained by verify_payment), fetched concurrently
+    total_members, rollups = await gather_bounded(
+        db.users.count_documents({"is_approved": True, "role": "user"}),
+        get_rollups(db, current_year, current_month)
     )
-    
-    # Get total collected this month (success only)
-    pipeline = [
-        {"$match": {"month": current_month, "year": current_year, "status": "success"}},
-        {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
-    ]
-    result = await db.monthly_payments.aggregate(pipeline).to_list(1)
-    total_collected = result[0]["total"] if result else 0
-    
-    # Get total collected this year (success only)
-    pipeline_year = [
-        {"$match": {"year": current_year, "status": "success"}},
-        {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
-    ]
-    result_year = await db.monthly_payments.aggregate(pipeline_year).to_list(1)
-    total_year = result_year[0]["total"] if result_year else 0
+    payments = rollups["month"]["paid_count"]
     
     return {
         "total_members": total_members,
         "paid_count": payments,
         "unpaid_count": total_members - payments,
-        "total_collected_this_month": total_collected,
-        "total_collected_this_year": total_year,
+        "total_collected_this_month": rollups["month"]["total_amount"],
+        "total_collected_this_year": rollups["year"]["total_amount"],
         "month_name": calendar.month_name[current_month]
     }
 
 @api_router.get("/savings/members-status")
-async def get_members_payment_status(current_user: dict = Depends(get_admin_user)):
+async def get_members_payment_status(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    paid: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    current_user: dict = Depends(get_admin_user)
+):
     now = datetime.now(timezone.utc)
     current_month = now.month
     current_year = now.year
     
-    # Get all approved members
-    members = await db.users.find(
-        {"is_approved": True, "role": "user"},
-        {"_id": 0, "password": 0}
-    ).to_list(1000)
+    paid_user_ids = await paid_user_ids_for(current_month, current_year) if paid is not None else set()
+    members, next_cursor = await fetch_page(
+        db.users, approved_members_query(name_prefix, paid, paid_user_ids), {"password": 0}, limit, after
+    )
     
-    # Get payments for current month
+    # Get this month's payments for the members on this page only
     payments = await db.monthly_payments.find(
-        {"month": current_month, "year": current_year},
-        {"_id": 0}
-    ).to_list(1000)
+        {"month": current_month, "year": current_year, "user_id": {"$in": [m["id"] for m in members]}},
+        PAYMENT_PROJECTION
+    ).to_list(None)
     
-    payment_map = {p["user_id"]: p for p in payments}
+    # A successful payment wins over pending/failed attempts for the same month
+    payment_map = {}
+    for p in payments:
+        if p["user_id"] not in payment_map or p.get("status") == "success":
+            payment_map[p["user_id"]] = p
     
     result = []
     for member in members:
         payment = payment_map.get(member["id"])
         result.append({
             "user": member,
-            "has_paid": payment is not None,
+            "has_paid": payment is not None and payment.get("status") == "success",
             "payment": payment
         })
     
-    return result
+    return page_response(result, next_cursor)
+
+@api_router.get("/savings/matrix")
+async def get_savings_matrix(
+    from_period: str = Query(..., alias="from"),
+    to_period: str = Query(..., alias="to"),
+    current_user: dict = Depends(get_admin_user)
+):
+    try:
+        start, end = parse_period(from_period), parse_period(to_period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    periods = period_range(start, end)
+    if not periods:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if len(periods) > MAX_MATRIX_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_MATRIX_MONTHS} months")
+
+    cursor = db.users.aggregate(payment_matrix_pipeline(start, end), batchSize=200)
+
+    # Rows are written out as the aggregation cursor yields them
+    async def rows():
+        yield b"["
+        first = True
+        async for member in cursor:
+            row = matrix_row(member, periods, MONTHLY_SAVINGS_AMOUNT)
+            yield (b"" if first else b",") + dumps(row)
+            first = False
+        yield b"]"
+
+    return StreamingResponse(rows(), media_type="application/json")
 
 # Festival routes
 @api_router.post("/festivals", response_model=Festival)
 async def create_festival(festival_data: FestivalCreate, current_user: dict = Depends(get_admin_user)):
     festival = Festival(**festival_data.model_dump())
-    festival_dict = festival.model_dump()
-    festival_dict["start_date"] = festival_dict["start_date"].isoformat()
-    festival_dict["end_date"] = festival_dict["end_date"].isoformat()
-    festival_dict["created_at"] = festival_dict["created_at"].isoformat()
-    
+    festival_dict = {**festival.model_dump(), **await stamp(db)}
     await db.festivals.insert_one(festival_dict)
     return festival
 
 @api_router.get("/festivals", response_model=List[Festival])
-async def get_festivals(current_user: dict = Depends(get_current_approved_user)):
-    festivals = await db.festivals.find({}, {"_id": 0}).to_list(1000)
-    for festival in festivals:
-        if isinstance(festival["start_date"], str):
-            festival["start_date"] = datetime.fromisoformat(festival["start_date"])
-        if isinstance(festival["end_date"], str):
-            festival["end_date"] = datetime.fromisoformat(festival["end_date"])
-        if isinstance(festival["created_at"], str):
-            festival["created_at"] = datetime.fromisoformat(festival["created_at"])
-    return festivals
+async def get_festivals(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_approved_user)
+):
+    query = {"name": name_prefix_filter(name_prefix)} if name_prefix else {}
+    query.update(date_range_filter("start_date", start_from, start_to))
+    projection = parse_fields(fields, FESTIVAL_FIELDS) or {}
+    festivals, next_cursor = await fetch_page(read_db.festivals, query, projection, limit, after)
+    return page_response(festivals, next_cursor, None if fields else Festival)
+
+@api_router.get("/festivals/summary")
+async def get_festivals_summary(current_user: dict = Depends(get_current_approved_user)):
+    # Served from festival_totals instead of summing every festival's expenses
+    projection = {"_id": 0, "id": 1, "name": 1, "start_date": 1, "end_date": 1, "total_budget": 1}
+    festivals, totals = await gather_bounded(
+        db.festivals.find({}, projection).sort("start_date", -1).to_list(None),
+        get_totals(db)
+    )
+    return summarize_festivals(festivals, totals)
 
 @api_router.get("/festivals/{festival_id}", response_model=Festival)
 async def get_festival(festival_id: str, current_user: dict = Depends(get_current_approved_user)):
     festival = await db.festivals.find_one({"id": festival_id}, {"_id": 0})
     if not festival:
         raise HTTPException(status_code=404, detail="Festival not found")
-    
-    if isinstance(festival["start_date"], str):
-        festival["start_date"] = datetime.fromisoformat(festival["start_date"])
-    if isinstance(festival["end_date"], str):
-        festival["end_date"] = datetime.fromisoformat(festival["end_date"])
-    if isinstance(festival["created_at"], str):
-        festival["created_at"] = datetime.fromisoformat(festival["created_at"])
-    
     return Festival(**festival)
 
 
@@ -519,35 +1014,48 @@ async def delete_festival(festival_id: str, current_user: dict = Depends(get_adm
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Festival not found")
     # Also delete associated expenses
+    expense_ids = await db.expenses.distinct("id", {"festival_id": festival_id})
     await db.expenses.delete_many({"festival_id": festival_id})
+    await drop_totals(db, festival_id)
+    await record_deletes(db, "festivals", [festival_id])
+    await record_deletes(db, "expenses", expense_ids)
     return {"message": "Festival deleted successfully"}
 
 # Expense routes
 @api_router.post("/expenses", response_model=Expense)
 async def create_expense(expense_data: ExpenseCreate, current_user: dict = Depends(get_admin_user)):
     expense = Expense(**expense_data.model_dump(), created_by=current_user["id"])
-    expense_dict = expense.model_dump()
-    expense_dict["date"] = expense_dict["date"].isoformat()
-    expense_dict["created_at"] = expense_dict["created_at"].isoformat()
-    
+    expense_dict = {**expense.model_dump(), **await stamp(db)}
     await db.expenses.insert_one(expense_dict)
+    await record_expense(db, expense.festival_id, expense.amount)
+    emit(publish_expense_added, expense_dict)
     return expense
 
 @api_router.get("/festivals/{festival_id}/expenses", response_model=List[Expense])
-async def get_festival_expenses(festival_id: str, current_user: dict = Depends(get_current_approved_user)):
-    expenses = await db.expenses.find({"festival_id": festival_id}, {"_id": 0}).to_list(1000)
-    for expense in expenses:
-        if isinstance(expense["date"], str):
-            expense["date"] = datetime.fromisoformat(expense["date"])
-        if isinstance(expense["created_at"], str):
-            expense["created_at"] = datetime.fromisoformat(expense["created_at"])
-    return expenses
+async def get_festival_expenses(
+    festival_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_approved_user)
+):
+    query = {"festival_id": festival_id, **date_range_filter("date", date_from, date_to)}
+    projection = parse_fields(fields, EXPENSE_FIELDS) or {}
+    expenses, next_cursor = await fetch_page(read_db.expenses, query, projection, limit, after)
+    return page_response(expenses, next_cursor, None if fields else Expense)
 
 @api_router.delete("/expenses/{expense_id}")
 async def delete_expense(expense_id: str, current_user: dict = Depends(get_admin_user)):
-    result = await db.expenses.delete_one({"id": expense_id})
-    if result.deleted_count == 0:
+    # find_one_and_delete returns the amount to take off the festival's totals
+    expense = await db.expenses.find_one_and_delete(
+        {"id": expense_id}, {"_id": 0, "festival_id": 1, "amount": 1}
+    )
+    if expense is None:
         raise HTTPException(status_code=404, detail="Expense not found")
+    await record_expense(db, expense["festival_id"], expense["amount"], sign=-1)
+    await record_deletes(db, "expenses", [expense_id])
     return {"message": "Expense deleted successfully"}
 
 # Home content routes
@@ -599,49 +1107,51 @@ class SiteConfig(BaseModel):
 @api_router.post("/slogans", response_model=Slogan)
 async def create_slogan(slogan_data: SloganCreate, current_user: dict = Depends(get_admin_user)):
     slogan = Slogan(**slogan_data.model_dump())
-    slogan_dict = slogan.model_dump()
+    slogan_dict = {**slogan.model_dump(), **await stamp(db)}
     await db.slogans.insert_one(slogan_dict)
+    landing_snapshot.bump()
     return slogan
 
 @api_router.get("/slogans", response_model=List[Slogan])
 async def get_slogans():
     slogans = await db.slogans.find({"is_active": True}, {"_id": 0}).sort("order", 1).to_list(1000)
-    return slogans
+    return FastJSONResponse(lean_rows(slogans, Slogan))
 
 @api_router.delete("/slogans/{slogan_id}")
 async def delete_slogan(slogan_id: str, current_user: dict = Depends(get_admin_user)):
     result = await db.slogans.delete_one({"id": slogan_id})
+    landing_snapshot.bump()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Slogan not found")
+    await record_deletes(db, "slogans", [slogan_id])
     return {"message": "Slogan deleted successfully"}
 
 # Achievements
 @api_router.post("/achievements", response_model=Achievement)
 async def create_achievement(achievement_data: AchievementCreate, current_user: dict = Depends(get_admin_user)):
     achievement = Achievement(**achievement_data.model_dump())
-    achievement_dict = achievement.model_dump()
-    achievement_dict["date"] = achievement_dict["date"].isoformat()
+    achievement_dict = {**achievement.model_dump(), **await stamp(db)}
     await db.achievements.insert_one(achievement_dict)
+    landing_snapshot.bump()
     return achievement
 
 @api_router.get("/achievements", response_model=List[Achievement])
-async def get_achievements():
-    achievements = await db.achievements.find({}, {"_id": 0}).sort("date", -1).to_list(1000)
-    for achievement in achievements:
-        if isinstance(achievement["date"], str):
-            achievement["date"] = datetime.fromisoformat(achievement["date"])
-    return achievements
+async def get_achievements(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+    query = date_range_filter("date", date_from, date_to)
+    achievements = await read_db.achievements.find(query, {"_id": 0}).sort("date", -1).to_list(1000)
+    return FastJSONResponse(lean_rows(achievements, Achievement))
 
 @api_router.delete("/achievements/{achievement_id}")
 async def delete_achievement(achievement_id: str, current_user: dict = Depends(get_admin_user)):
     result = await db.achievements.delete_one({"id": achievement_id})
+    landing_snapshot.bump()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Achievement not found")
+    await record_deletes(db, "achievements", [achievement_id])
     return {"message": "Achievement deleted successfully"}
 
 # Site Configuration Routes
-@api_router.get("/landing/config", response_model=SiteConfig)
-async def get_site_config():
+async def load_site_config() -> SiteConfig:
     config = await db.site_config.find_one({"id": "config"}, {"_id": 0})
     if not config:
         config = SiteConfig().model_dump()
@@ -652,6 +1162,10 @@ async def get_site_config():
         
     return SiteConfig(**config)
 
+@api_router.get("/landing/config", response_model=SiteConfig)
+async def get_site_config():
+    return await load_site_config()
+
 @api_router.put("/landing/config", response_model=SiteConfig)
 async def update_site_config(config_data: SiteConfig, current_user: dict = Depends(get_admin_user)):
     config_dict = config_data.model_dump()
@@ -661,74 +1175,316 @@ async def update_site_config(config_data: SiteConfig, current_user: dict = Depen
         {"$set": config_dict},
         upsert=True
     )
+    landing_snapshot.bump()
     return config_data
 
 # Team Member Routes
 @api_router.get("/landing/team", response_model=List[TeamMember])
 async def get_team_members():
     members = await db.team_members.find({}, {"_id": 0}).sort("order", 1).to_list(1000)
-    return members
+    return FastJSONResponse(lean_rows(members, TeamMember))
 
 @api_router.post("/landing/team", response_model=TeamMember)
 async def create_team_member(member_data: TeamMemberCreate, current_user: dict = Depends(get_admin_user)):
     member = TeamMember(**member_data.model_dump())
-    await db.team_members.insert_one(member.model_dump())
+    await db.team_members.insert_one({**member.model_dump(), **await stamp(db)})
+    landing_snapshot.bump()
     return member
 
 @api_router.delete("/landing/team/{member_id}")
 async def delete_team_member(member_id: str, current_user: dict = Depends(get_admin_user)):
     result = await db.team_members.delete_one({"id": member_id})
+    landing_snapshot.bump()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Team member not found")
+    await record_deletes(db, "team", [member_id])
     return {"message": "Team member deleted"}
 
 # Service Routes
 @api_router.get("/landing/services", response_model=List[Service])
 async def get_services():
     services = await db.services.find({}, {"_id": 0}).to_list(1000)
-    return services
+    return FastJSONResponse(lean_rows(services, Service))
 
 @api_router.post("/landing/services", response_model=Service)
 async def create_service(service_data: ServiceCreate, current_user: dict = Depends(get_admin_user)):
     service = Service(**service_data.model_dump())
-    await db.services.insert_one(service.model_dump())
+    await db.services.insert_one({**service.model_dump(), **await stamp(db)})
+    landing_snapshot.bump()
     return service
 
 @api_router.delete("/landing/services/{service_id}")
 async def delete_service(service_id: str, current_user: dict = Depends(get_admin_user)):
     result = await db.services.delete_one({"id": service_id})
+    landing_snapshot.bump()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Service not found")
+    await record_deletes(db, "services", [service_id])
     return {"message": "Service deleted"}
 
+@api_router.get("/events")
+async def stream_events(current_user: dict = Depends(get_stream_user)):
+    is_admin = current_user.get("role") == "admin"
+    if not is_admin and not current_user.get("is_approved"):
+        raise HTTPException(status_code=403, detail="Your account is pending approval")
+    if event_bus.full:
+        raise HTTPException(status_code=503, detail="Too many live connections", headers={"Retry-After": "30"})
+    return StreamingResponse(
+        sse_stream(event_bus, current_user["id"], is_admin, SSE_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Delta sync: clients keep a local store and ask only for what changed
+@api_router.get("/sync")
+async def sync_changes(
+    since: Optional[str] = None,
+    collections: Optional[str] = None,
+    current_user: dict = Depends(get_current_approved_user)
+):
+    names = [c.strip() for c in collections.split(",") if c.strip()] if collections else list(SYNC_COLLECTIONS)
+    unknown = [name for name in names if name not in SYNC_COLLECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(unknown)}")
+    try:
+        return await changes_since(db, since, names)
+    except InvalidSyncToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Export routes (Admin only)
+@api_router.get("/export/{collection}")
+async def export_collection(
+    collection: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    festival_id: Optional[str] = None,
+    current_user: dict = Depends(get_admin_user)
+):
+    if collection not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {collection}")
+    query = date_range_filter(EXPORTS[collection]["date_field"], date_from, date_to)
+    if festival_id:
+        if collection != "expenses":
+            raise HTTPException(status_code=400, detail="festival_id only applies to expenses")
+        query["festival_id"] = festival_id
+
+    filename = f"{collection}.{format}" + (".gz" if gzip else "")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        media_type = "application/gzip"
+    return StreamingResponse(
+        export_stream(read_db, collection, query, format, gzip),
+        media_type=media_type,
+        headers=headers
+    )
+
+# Index management routes
+@api_router.get("/admin/indexes")
+async def get_indexes_report(current_user: dict = Depends(get_admin_user)):
+    return {
+        "drift": await check_index_drift(db),
+        "usage": await get_index_stats(db)
+    }
+
+@api_router.get("/admin/db-pool")
+async def get_db_pool_stats(current_user: dict = Depends(get_admin_user)):
+    options = client.options.pool_options
+    return {
+        "max_pool_size": options.max_pool_size,
+        "min_pool_size": options.min_pool_size,
+        "heavy_read_preference": read_db.read_preference.mongos_mode,
+        "totals": mongo_pool_stats.totals(),
+        "servers": mongo_pool_stats.snapshot()
+    }
+
+@api_router.get("/admin/password-pool")
+async def get_password_pool_stats(current_user: dict = Depends(get_admin_user)):
+    return password_hasher.stats()
+
+@api_router.post("/admin/rollups/rebuild")
+async def rebuild_savings_rollups(year: Optional[int] = None, current_user: dict = Depends(get_admin_user)):
+    return await rebuild_rollups(db, year)
+
+@api_router.get("/admin/rollups/check")
+async def check_savings_rollups(year: Optional[int] = None, current_user: dict = Depends(get_admin_user)):
+    mismatches = await check_rollups(db, year)
+    return {"consistent": not mismatches, "mismatches": mismatches}
+
+@api_router.post("/admin/festival-totals/rebuild")
+async def rebuild_festival_totals(current_user: dict = Depends(get_admin_user)):
+    return await rebuild_totals(db)
+
+@api_router.get("/admin/festival-totals/check")
+async def check_festival_totals(current_user: dict = Depends(get_admin_user)):
+    mismatches = await check_totals(db)
+    return {"consistent": not mismatches, "mismatches": mismatches}
+
+@api_router.get("/admin/events")
+async def get_event_stats(current_user: dict = Depends(get_admin_user)):
+    return {
+        "source": "change_stream" if change_feed.running else "local",
+        "change_stream_failures": change_feed.failures,
+        **event_bus.stats()
+    }
+
+@api_router.get("/admin/webhooks")
+async def get_webhook_stats(current_user: dict = Depends(get_admin_user)):
+    return await webhook_processor.stats()
+
+@api_router.post("/admin/webhooks/replay")
+async def replay_webhooks(
+    since: Optional[datetime] = None,
+    event_id: Optional[List[str]] = Query(None),
+    current_user: dict = Depends(get_admin_user)
+):
+    return {"requeued": await webhook_processor.replay(since, event_id)}
+
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: dict = Depends(get_admin_user)
+):
+    return {"threshold_ms": slow_query_log.threshold_ms, "queries": slow_query_log.recent(limit)}
+
+@api_router.delete("/admin/slow-queries")
+async def clear_slow_queries(current_user: dict = Depends(get_admin_user)):
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+@api_router.get("/admin/user-cache")
+async def get_user_cache_stats(current_user: dict = Depends(get_admin_user)):
+    return user_cache.stats()
+
+@api_router.get("/admin/revocations")
+async def get_revocation_stats(current_user: dict = Depends(get_admin_user)):
+    return {**revocations.stats(), "sync_runs": revocation_sync.runs}
+
+@api_router.get("/admin/payment-gateway")
+async def get_payment_gateway_stats(current_user: dict = Depends(get_admin_user)):
+    return payment_gateway.stats()
+
+@api_router.get("/admin/landing-snapshot")
+async def get_landing_snapshot_stats(current_user: dict = Depends(get_admin_user)):
+    return landing_snapshot.stats()
+
+# Landing page bundle: everything LandingPage.js needs in one cached response
+async def build_landing_bundle():
+    config, team, services, slogans, achievements = await gather_bounded(
+        load_site_config(),
+        db.team_members.find({}, {"_id": 0}).sort("order", 1).to_list(1000),
+        db.services.find({}, {"_id": 0}).to_list(1000),
+        db.slogans.find({"is_active": True}, {"_id": 0}).sort("order", 1).to_list(1000),
+        db.achievements.find({}, {"_id": 0}).sort("date", -1).to_list(1000)
+    )
+    return {
+        "config": config.model_dump(mode="json"),
+        "team": [TeamMember(**m).model_dump(mode="json") for m in team],
+        "services": [Service(**s).model_dump(mode="json") for s in services],
+        "slogans": [Slogan(**s).model_dump(mode="json") for s in slogans],
+        "achievements": [Achievement(**a).model_dump(mode="json") for a in achievements]
+    }
+
+landing_snapshot = VersionedSnapshot(
+    build_landing_bundle,
+    max_age=float(os.environ.get("LANDING_SNAPSHOT_MAX_AGE_SECONDS", 60))
+)
+LANDING_CACHE_CONTROL = os.environ.get(
+    "LANDING_CACHE_CONTROL", "public, max-age=60, stale-while-revalidate=300"
+)
+
+@api_router.get("/landing/bundle")
+async def get_landing_bundle(request: Request):
+    # Served precompressed; CompressionMiddleware passes Content-Encoding responses through
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    body, etag = await landing_snapshot.get_encoded(encoding)
+    headers = {"ETag": etag, "Cache-Control": LANDING_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # Include the router in the main app
 app.include_router(api_router)
 
+registry.callback_gauge(
+    "password_hash_queue_depth", "bcrypt jobs waiting for a worker",
+    lambda: password_hasher.stats()["queue_depth"]
+)
+registry.callback_gauge(
+    "password_hash_active", "bcrypt jobs currently running",
+    lambda: password_hasher.stats()["active"]
+)
+registry.callback_gauge(
+    "razorpay_circuit_open", "1 while the payment gateway circuit breaker is open",
+    lambda: int(payment_gateway.breaker.state == "open")
+)
+registry.callback_gauge(
+    "mongo_pool_connections_open", "Open pooled MongoDB connections across servers",
+    lambda: mongo_pool_stats.totals()["open"]
+)
+registry.callback_gauge(
+    "mongo_pool_connections_checked_out", "MongoDB connections currently in use",
+    lambda: mongo_pool_stats.totals()["checked_out"]
+)
+registry.callback_gauge(
+    "mongo_pool_checkout_waiting", "Operations waiting for a MongoDB connection",
+    lambda: mongo_pool_stats.totals()["waiting"]
+)
+registry.callback_counter(
+    "log_records_dropped_total", "Log records discarded because the logging queue was full",
+    dropped_records
+)
+registry.callback_counter(
+    "landing_snapshot_rebuilds_total", "Times the landing bundle was rebuilt",
+    lambda: landing_snapshot.rebuilds
+)
+registry.callback_gauge(
+    "landing_snapshot_bytes", "Size of the uncompressed landing bundle",
+    lambda: landing_snapshot.stats()["size_bytes"]
+)
+registry.callback_counter(
+    "razorpay_orders_coalesced_total", "create-order calls that joined an order already in flight",
+    lambda: order_coalescer.coalesced
+)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4")
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+# Negotiated br/gzip for anything over the threshold; mostly phones on cellular
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get("COMPRESSION_MIN_BYTES", 1024))
+)
+app.add_middleware(MetricsMiddleware)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Configure logging: JSON lines written by a background thread, fed by a queue
+log_listener = configure_logging(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    log_file=os.environ.get("LOG_FILE")
 )
 logger = logging.getLogger(__name__)
 
-@app.middleware("http")
-async def log_requests(request, call_next):
-    logger.info(f"Request: {request.method} {request.url}")
-    try:
-        response = await call_next(request)
-        logger.info(f"Response status: {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f"Request failed: {str(e)}")
-        raise e
+app.add_middleware(
+    AccessLogMiddleware,
+    sample_rate=float(os.environ.get("ACCESS_LOG_SAMPLE_RATE", 1.0)),
+    slow_ms=float(os.environ.get("ACCESS_LOG_SLOW_MS", 1000))
+)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -738,13 +1494,66 @@ async def global_exception_handler(request, exc):
         content={"detail": "Internal server error"}
     )
 
+@app.on_event("startup")
+async def startup_db_pool():
+    # So the first burst doesn't pay for connection setup; read_db warms the secondaries
+    pool = client.options.pool_options
+    default = min(max(pool.min_pool_size, 10), pool.max_pool_size or 10)
+    await prewarm([db, read_db], int(os.environ.get("MONGO_PREWARM_CONNECTIONS", default)))
+
+@app.on_event("startup")
+async def startup_slow_query_log():
+    slow_query_log.start(db)
+
+@app.on_event("startup")
+async def startup_indexes():
+    # Stale duplicate pending rows would block the pending-order unique index
+    await expire_stale_orders()
+    await ensure_indexes(db)
+    drift = await check_index_drift(db)
+    if drift:
+        logger.warning(f"Index drift detected: {drift}")
+
+@app.on_event("startup")
+async def startup_migrations():
+    if RUN_MIGRATIONS:
+        migration_runner.start()
+
+@app.on_event("startup")
+async def startup_webhook_processor():
+    webhook_processor.start()
+
+@app.on_event("startup")
+async def startup_pending_order_janitor():
+    pending_order_janitor.start()
+
+@app.on_event("startup")
+async def startup_revocation_sync():
+    revocation_sync.start()
+
+@app.on_event("startup")
+async def startup_event_feed():
+    if EVENTS_SOURCE == "change_stream" or (EVENTS_SOURCE == "auto" and await supports_change_streams(db)):
+        change_feed.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await webhook_processor.stop()
+    await pending_order_janitor.stop()
+    await migration_runner.stop()
+    await revocation_sync.stop()
+    await change_feed.stop()
+    event_bus.close()
+    await slow_query_log.stop()
+    log_listener.stop()
     client.close()
+    password_hasher.shutdown()
+    await payment_gateway.close()
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
     # In production, reload should be False
     is_dev = os.environ.get("DEV_MODE", "true").lower() == "true"
-    uvicorn.run("server:app", host="0.0.0.0", port=port, reload=is_dev)
\ No newline at end of file
+    # Requests are logged by AccessLogMiddleware; uvicorn's own access log would duplicate them
+    uvicorn.run("server:app", host="0.0.0.0", port=port, reload=is_dev, access_log=False)
\ No newline at end of file
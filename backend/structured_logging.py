@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import json
+import logging
+import queue
+import random
+import sys
+import time
+
+from metrics import route_template
+
+access_logger = logging.getLogger("access")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={"fields": {...}}` is merged in."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=logging.INFO, log_file: str = None, queue_size: int = 10000) -> QueueListener:
+    """Route all logging through a bounded queue drained by a background thread.
+
+    Handlers on the event loop only enqueue; formatting and disk/stream I/O
+    happen on the listener thread. When the queue is full records are
+    dropped rather than blocking a request.
+    """
+    target = logging.FileHandler(log_file) if log_file else logging.StreamHandler(sys.stderr)
+    target.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = _DroppingQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, target, respect_handler_level=False)
+    listener.start()
+    return listener
+
+
+def dropped_records() -> int:
+    """Log records discarded because the queue was full, since startup."""
+    return _DroppingQueueHandler.dropped
+
+
+class _DroppingQueueHandler(QueueHandler):
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+    def prepare(self, record):
+        # Keep the record lazy: formatting happens on the listener thread
+        return record
+
+
+class AccessLogMiddleware:
+    """ASGI middleware writing one structured line per request.
+
+    Successful fast requests are sampled at `sample_rate`; responses >= 400,
+    exceptions and requests slower than `slow_ms` are always logged.
+    """
+
+    def __init__(self, app, sample_rate: float = 1.0, slow_ms: float = 1000):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            status = status_holder[0]
+            if (
+                error is not None
+                or status >= 400
+                or duration_ms >= self.slow_ms
+                or self.sample_rate >= 1.0
+                or random.random() < self.sample_rate
+            ):
+                fields = {
+                    "method": scope["method"],
+                    "route": route_template(scope),
+                    "status": status,
+                    "duration_ms": round(duration_ms, 2),
+                    "user_id": scope.get("state", {}).get("user_id"),
+                }
+                if error is not None:
+                    fields["error"] = repr(error)
+                access_logger.log(
+                    logging.ERROR if error is not None or status >= 500 else logging.INFO,
+                    "request", extra={"fields": fields},
+                )
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+from pymongo import ReturnDocument
+from typing import Optional
+import time
+
+from concurrency import gather_bounded
+
+# Delta sync. Every write to a synced collection takes the next value of a
+# global revision counter and stores it on the document (or, for deletes, on
+# a tombstone). /sync?since=<token> returns what changed after the token.
+#
+# Revisions are allocated before the write lands, so a slow write can commit
+# after a sync has already read past its revision. Each sync therefore
+# re-reads the last OVERLAP_REVISIONS revisions before the token; clients
+# apply changes by id, so seeing a document twice is harmless.
+
+OVERLAP_REVISIONS = 50
+TOMBSTONE_TTL_SECONDS = 90 * 24 * 3600
+MAX_CHANGES_PER_COLLECTION = 2000
+
+# Sync name -> (collection, query limiting what clients may see, projection)
+SYNC_COLLECTIONS = {
+    "festivals": ("festivals", {}, {"_id": 0}),
+    "expenses": ("expenses", {}, {"_id": 0}),
+    "achievements": ("achievements", {}, {"_id": 0}),
+    "slogans": ("slogans", {}, {"_id": 0}),
+    "team": ("team_members", {}, {"_id": 0}),
+    "services": ("services", {}, {"_id": 0}),
+    "members": ("users", {"is_approved": True, "role": "user"}, {"_id": 0, "password": 0}),
+}
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+async def next_revision(db) -> int:
+    counter = await db.counters.find_one_and_update(
+        {"_id": "revision"}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    return counter["value"]
+
+
+async def stamp(db) -> dict:
+    """Fields to $set (or merge into an insert) on every synced write."""
+    return {"revision": await next_revision(db), "updated_at": datetime.now(timezone.utc)}
+
+
+async def record_deletes(db, collection: str, ids: list):
+    """Write tombstones for deleted ids, all under one revision."""
+    if not ids:
+        return
+    revision = await next_revision(db)
+    now = datetime.now(timezone.utc)
+    await db.tombstones.insert_many([
+        {"collection": collection, "id": doc_id, "revision": revision, "deleted_at": now}
+        for doc_id in ids
+    ], ordered=False)
+
+
+async def current_revision(db) -> int:
+    counter = await db.counters.find_one({"_id": "revision"})
+    return counter["value"] if counter else 0
+
+
+def encode_token(revision: int) -> str:
+    return f"{revision}-{int(time.time())}"
+
+
+def decode_token(token: str):
+    try:
+        revision, issued = token.split("-")
+        return int(revision), int(issued)
+    except (ValueError, AttributeError):
+        raise InvalidSyncToken("Invalid sync token")
+
+
+async def changes_since(db, since: Optional[str], names: list) -> dict:
+    """Changed and deleted documents per sync collection after `since`.
+
+    `reset` tells the client to drop its store and reload through the list
+    endpoints: there was no token, tombstones it needs may have expired, or
+    too much changed to send as a delta. The reset token is taken before
+    the client reloads, so nothing written during the reload is missed.
+    """
+    head = await current_revision(db)
+    token = encode_token(head)
+    if since is None:
+        return {"token": token, "reset": True, "changes": {}}
+    revision, issued = decode_token(since)
+    if time.time() - issued > TOMBSTONE_TTL_SECONDS or revision > head:
+        return {"token": token, "reset": True, "changes": {}}
+
+    floor = max(revision - OVERLAP_REVISIONS, 0)
+    limit = MAX_CHANGES_PER_COLLECTION + 1
+    queries = []
+    for name in names:
+        collection, scope, projection = SYNC_COLLECTIONS[name]
+        queries.append(db[collection].find(
+            {**scope, "revision": {"$gt": floor}}, projection
+        ).sort("revision", 1).limit(limit).to_list(None))
+        queries.append(db.tombstones.find(
+            {"collection": name, "revision": {"$gt": floor}}, {"_id": 0, "id": 1}
+        ).limit(limit).to_list(None))
+    results = await gather_bounded(*queries)
+
+    changes = {}
+    for i, name in enumerate(names):
+        upserted, deleted = results[2 * i], results[2 * i + 1]
+        if len(upserted) >= limit or len(deleted) >= limit:
+            return {"token": token, "reset": True, "changes": {}}
+        if upserted or deleted:
+            changes[name] = {"upserted": upserted, "deleted": [d["id"] for d in deleted]}
+    return {"token": token, "reset": False, "changes": changes}
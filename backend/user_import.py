@@ -0,0 +1,87 @@
+from pymongo.errors import BulkWriteError
+import codecs
+import csv
+
+# Streaming CSV member import. The request body is decoded incrementally and
+# cut into batches of rows; server.import_users validates, de-duplicates and
+# hashes each batch, then inserts it with one insert_many.
+
+IMPORT_COLUMNS = ("full_name", "email", "phone", "password")
+MAX_REPORTED_ERRORS = 200
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+async def csv_row_batches(chunks, batch_size: int = 200):
+    """Yield lists of (line_number, row_dict) from an async iterator of bytes.
+
+    The first line is the header and must contain IMPORT_COLUMNS. Rows are
+    split on newlines as they arrive, so quoted fields must not span lines.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    header = None
+    line_number = 0
+    batch = []
+
+    def parse(lines):
+        nonlocal header, line_number
+        for values in csv.reader(lines):
+            line_number += 1
+            if header is None:
+                header = [v.strip().lower() for v in values]
+                missing = [c for c in IMPORT_COLUMNS if c not in header]
+                if missing:
+                    raise ImportFormatError(f"Missing columns: {', '.join(missing)}")
+                continue
+            if not any(v.strip() for v in values):
+                continue
+            batch.append((line_number, {k: v.strip() for k, v in zip(header, values) if k in IMPORT_COLUMNS}))
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        complete, _, pending = pending.rpartition("\n")
+        if complete:
+            parse(complete.split("\n"))
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        parse([pending])
+    if header is None:
+        raise ImportFormatError("Empty file")
+    if batch:
+        yield batch
+
+
+async def existing_identities(db, emails: list, phones: list):
+    """Emails and phones already registered, found with one $in query."""
+    docs = await db.users.find(
+        {"$or": [{"email": {"$in": emails}}, {"phone": {"$in": phones}}]},
+        {"_id": 0, "email": 1, "phone": 1},
+    ).to_list(None)
+    return {d["email"] for d in docs}, {d["phone"] for d in docs}
+
+
+async def insert_users(db, rows: list):
+    """insert_many(ordered=False) for [(line_number, doc)].
+
+    Returns (inserted_docs, errors). Rows that lose a uniqueness race with a
+    concurrent registration come back as errors; the rest are still inserted.
+    """
+    if not rows:
+        return [], []
+    try:
+        await db.users.insert_many([doc for _, doc in rows], ordered=False)
+        return [doc for _, doc in rows], []
+    except BulkWriteError as e:
+        failed = {err["index"]: err for err in e.details.get("writeErrors", [])}
+        errors = [
+            {"line": rows[i][0], "error": "Email or phone already registered" if err.get("code") == 11000
+             else err.get("errmsg", "Insert failed")}
+            for i, err in failed.items()
+        ]
+        return [doc for i, (_, doc) in enumerate(rows) if i not in failed], errors
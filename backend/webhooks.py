@@ -0,0 +1,176 @@
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+import asyncio
+import hashlib
+import hmac
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SUCCESS_EVENTS = {"payment.captured", "order.paid"}
+FAILURE_EVENTS = {"payment.failed"}
+# Handled events are kept this long for replay (and duplicate detection),
+# then removed by the TTL index on processed_at. Pending events never expire.
+INBOX_RETENTION_SECONDS = 30 * 24 * 3600
+
+
+def verify_webhook_signature(secret: str, body: bytes, signature: str) -> bool:
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+async def store_event(db, event_id: str, event: dict) -> bool:
+    """Insert into the inbox; returns False if the event id was already seen."""
+    try:
+        await db.webhook_inbox.insert_one({
+            "_id": event_id,
+            "event": event.get("event"),
+            "payload": event.get("payload", {}),
+            "status": "pending",
+            "received_at": datetime.now(timezone.utc),
+        })
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def _payment_entity(doc: dict) -> dict:
+    return doc.get("payload", {}).get("payment", {}).get("entity", {})
+
+
+def plan_transitions(events: list, batch_id: str) -> list:
+    """Map inbox events to conditional monthly_payments updates.
+
+    Success only applies to rows not already successful and tags them with
+    the batch id so the rows this batch flipped can be found afterwards.
+    Failure only applies to rows still pending, so it never undoes a success.
+    """
+    now = datetime.now(timezone.utc)
+    operations = []
+    for doc in events:
+        entity = _payment_entity(doc)
+        order_id = entity.get("order_id")
+        if not order_id:
+            continue
+        if doc["event"] in SUCCESS_EVENTS:
+            operations.append(UpdateOne(
+                {"razorpay_order_id": order_id, "status": {"$ne": "success"}},
+                {"$set": {
+                    "status": "success",
+                    "razorpay_payment_id": entity.get("id"),
+                    "transaction_id": entity.get("id"),
+                    "method": entity.get("method") or "UPI",
+                    "payment_date": now,
+                    "settled_by": batch_id,
+                }},
+            ))
+        elif doc["event"] in FAILURE_EVENTS:
+            operations.append(UpdateOne(
+                {"razorpay_order_id": order_id, "status": "pending"},
+                {"$set": {"status": "failed", "razorpay_payment_id": entity.get("id")}},
+            ))
+    return operations
+
+
+class WebhookProcessor:
+    """Background worker draining webhook_inbox in batches.
+
+    Each batch is applied with a single bulk_write. Rollups are bumped only
+    for the rows this batch actually flipped to success, so replays and races
+    with verify_payment never double count.
+    """
+
+    def __init__(self, db, on_success=None, batch_size: int = 100, poll_interval: float = 2.0):
+        self.db = db
+        self.on_success = on_success
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.processed = 0
+        self.batches = 0
+        self.errors = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def notify(self):
+        self._wakeup.set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                while await self.process_batch():
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Webhook batch failed: {e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_batch(self) -> int:
+        events = await self.db.webhook_inbox.find(
+            {"status": "pending"}
+        ).sort("received_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not events:
+            return 0
+
+        batch_id = uuid.uuid4().hex
+        operations = plan_transitions(events, batch_id)
+        if operations:
+            await self.db.monthly_payments.bulk_write(operations, ordered=False)
+            flipped = await self.db.monthly_payments.find(
+                {"settled_by": batch_id}, {"_id": 0, "year": 1, "month": 1, "amount": 1, "user_id": 1}
+            ).to_list(None)
+            if flipped and self.on_success is not None:
+                await self.on_success(flipped)
+
+        handled = SUCCESS_EVENTS | FAILURE_EVENTS
+        now = datetime.now(timezone.utc)
+        await self.db.webhook_inbox.bulk_write([
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"status": "processed" if doc["event"] in handled else "ignored", "processed_at": now}},
+            )
+            for doc in events
+        ], ordered=False)
+        self.processed += len(events)
+        self.batches += 1
+        return len(events)
+
+    async def replay(self, since: datetime = None, event_ids: list = None) -> int:
+        """Put already handled events back in the queue; reprocessing is idempotent."""
+        query = {"status": {"$in": ["processed", "ignored"]}}
+        if since is not None:
+            query["received_at"] = {"$gte": since}
+        if event_ids:
+            query["_id"] = {"$in": event_ids}
+        result = await self.db.webhook_inbox.update_many(
+            query, {"$set": {"status": "pending"}, "$unset": {"processed_at": ""}}
+        )
+        self.notify()
+        return result.modified_count
+
+    async def stats(self) -> dict:
+        return {
+            "pending": await self.db.webhook_inbox.count_documents({"status": "pending"}),
+            "processed": self.processed,
+            "batches": self.batches,
+            "errors": self.errors,
+            "running": self._task is not None and not self._task.done(),
+        }
+
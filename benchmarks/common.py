@@ -0,0 +1,30 @@
+import statistics
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(samples):
+    return {
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "mean_ms": round(statistics.mean(samples), 2) if samples else 0.0,
+    }
+
+
+def summarize(label, samples):
+    s = latency_summary(samples)
+    print(
+        f"{label:<22} n={s['n']:<5} "
+        f"p50={s['p50_ms']:7.1f}ms "
+        f"p95={s['p95_ms']:7.1f}ms "
+        f"p99={s['p99_ms']:7.1f}ms "
+        f"mean={s['mean_ms']:7.1f}ms"
+    )
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Sequential vs concurrent query fan-out under injected Mongo latency.
+
+Starts a TCP proxy in front of a local mongod that delays every chunk by
+--latency-ms, then times the queries behind /savings/analytics and the
+landing bundle issued one after another and through gather_bounded.
+
+    python benchmarks/concurrency_bench.py --mongo-port 27017 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from concurrency import gather_bounded  # noqa: E402
+
+
+async def start_latency_proxy(listen_port, target_host, target_port, latency_s):
+    async def pipe(reader, writer):
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                await asyncio.sleep(latency_s)
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(target_host, target_port)
+        await asyncio.gather(
+            pipe(client_reader, upstream_writer),
+            pipe(upstream_reader, client_writer),
+        )
+
+    return await asyncio.start_server(handle, "127.0.0.1", listen_port)
+
+
+def analytics_queries(db):
+    return [
+        db.users.count_documents({"is_approved": True, "role": "user"}),
+        db.savings_rollups.find({"year": 2026, "month": {"$in": [1, 0]}}, {"_id": 0}).to_list(2),
+    ]
+
+
+def landing_queries(db):
+    return [
+        db.site_config.find_one({"id": "config"}, {"_id": 0}),
+        db.team_members.find({}, {"_id": 0}).sort("order", 1).to_list(1000),
+        db.services.find({}, {"_id": 0}).to_list(1000),
+        db.slogans.find({"is_active": True}, {"_id": 0}).sort("order", 1).to_list(1000),
+        db.achievements.find({}, {"_id": 0}).sort("date", -1).to_list(1000),
+    ]
+
+
+async def time_it(runs, fn):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def main(args):
+    proxy = await start_latency_proxy(args.proxy_port, args.mongo_host, args.mongo_port, args.latency_ms / 1000)
+    client = AsyncIOMotorClient(
+        f"mongodb://127.0.0.1:{args.proxy_port}/?directConnection=true", maxPoolSize=16
+    )
+    db = client[args.db_name]
+    try:
+        # Warm the pool so connection setup isn't measured
+        await gather_bounded(*(db.command("ping") for _ in range(8)))
+
+        for label, factory in (("analytics", analytics_queries), ("landing bundle", landing_queries)):
+            async def sequential():
+                for aw in factory(db):
+                    await aw
+
+            async def concurrent():
+                await gather_bounded(*factory(db))
+
+            seq = await time_it(args.runs, sequential)
+            con = await time_it(args.runs, concurrent)
+            print(f"{label:<16} sequential={seq:7.1f}ms  concurrent={con:7.1f}ms  speedup={seq / con:4.1f}x")
+    finally:
+        client.close()
+        proxy.close()
+        await proxy.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-host", default="127.0.0.1")
+    parser.add_argument("--mongo-port", type=int, default=27017)
+    parser.add_argument("--proxy-port", type=int, default=27099)
+    parser.add_argument("--db-name", default="balaga_bench")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--runs", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
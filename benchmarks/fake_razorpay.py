@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Razorpay orders API.
+
+Point the backend at it with RAZORPAY_BASE_URL=http://localhost:9100/v1.
+Latency and failure rate are adjustable so timeouts, retries and the circuit
+breaker can be exercised:
+
+    python benchmarks/fake_razorpay.py --port 9100 --latency-ms 150 --failure-rate 0.1
+
+`sign_payment` produces the signature the frontend checkout would receive, so
+scripts can drive /savings/verify-payment end to end.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import random
+import time
+import uuid
+
+from aiohttp import web
+
+
+def sign_payment(key_secret: str, order_id: str, payment_id: str) -> str:
+    return hmac.new(key_secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256).hexdigest()
+
+
+def build_app(latency_ms: float = 0.0, failure_rate: float = 0.0) -> web.Application:
+    orders = {}
+    app = web.Application()
+    app["stats"] = {"requests": 0, "failures": 0}
+
+    async def maybe_fail():
+        app["stats"]["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if failure_rate and random.random() < failure_rate:
+            app["stats"]["failures"] += 1
+            raise web.HTTPServiceUnavailable(text='{"error": "injected failure"}', content_type="application/json")
+
+    async def create_order(request):
+        await maybe_fail()
+        body = await request.json()
+        if not isinstance(body.get("amount"), int) or body["amount"] <= 0:
+            return web.json_response({"error": {"description": "amount is invalid"}}, status=400)
+        order = {
+            "id": f"order_{uuid.uuid4().hex[:14]}",
+            "entity": "order",
+            "amount": body["amount"],
+            "currency": body.get("currency", "INR"),
+            "receipt": body.get("receipt"),
+            "status": "created",
+            "created_at": int(time.time()),
+        }
+        orders[order["id"]] = order
+        return web.json_response(order)
+
+    async def fetch_order(request):
+        await maybe_fail()
+        order = orders.get(request.match_info["order_id"])
+        if order is None:
+            return web.json_response({"error": {"description": "order not found"}}, status=404)
+        return web.json_response(order)
+
+    async def stats(request):
+        return web.json_response({**app["stats"], "orders": len(orders)})
+
+    app.router.add_post("/v1/orders", create_order)
+    app.router.add_get("/v1/orders/{order_id}", fetch_order)
+    app.router.add_get("/_stats", stats)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    web.run_app(build_app(args.latency_ms, args.failure_rate), port=args.port)
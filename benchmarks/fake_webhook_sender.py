@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Send signed Razorpay-style webhook events to the backend.
+
+Replays payment.captured / payment.failed events for the given order ids,
+optionally delivering each event more than once to exercise inbox dedup:
+
+    python benchmarks/fake_webhook_sender.py --secret whsec --order order_abc --duplicates 2
+    python benchmarks/fake_webhook_sender.py --secret whsec --from-db --limit 500
+
+--from-db picks pending monthly_payments rows straight from Mongo (MONGO_URL /
+DB_NAME from backend/.env) so a batch of stuck payments can be settled.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+
+def build_event(event_type, order_id, amount_paise):
+    payment_id = f"pay_{uuid.uuid4().hex[:14]}"
+    return {
+        "entity": "event",
+        "event": event_type,
+        "created_at": int(time.time()),
+        "payload": {
+            "payment": {
+                "entity": {
+                    "id": payment_id,
+                    "entity": "payment",
+                    "order_id": order_id,
+                    "amount": amount_paise,
+                    "currency": "INR",
+                    "status": "captured" if event_type == "payment.captured" else "failed",
+                    "method": "upi",
+                }
+            }
+        },
+    }
+
+
+async def send(client, url, secret, event, event_id):
+    body = json.dumps(event).encode()
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    response = await client.post(url, content=body, headers={
+        "Content-Type": "application/json",
+        "X-Razorpay-Signature": signature,
+        "X-Razorpay-Event-Id": event_id,
+    })
+    return response.status_code
+
+
+async def pending_orders_from_db(limit):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).resolve().parent.parent / "backend" / ".env", override=True)
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    try:
+        rows = await client[os.environ["DB_NAME"]].monthly_payments.find(
+            {"status": "pending", "razorpay_order_id": {"$type": "string"}},
+            {"_id": 0, "razorpay_order_id": 1, "amount": 1},
+        ).limit(limit).to_list(limit)
+    finally:
+        client.close()
+    return [(r["razorpay_order_id"], int(r.get("amount", 100) * 100)) for r in rows]
+
+
+async def main(args):
+    orders = [(order_id, args.amount * 100) for order_id in args.order]
+    if args.from_db:
+        orders += await pending_orders_from_db(args.limit)
+    if not orders:
+        raise SystemExit("No orders to send events for")
+
+    url = f"{args.base_url}/webhooks/razorpay"
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async with httpx.AsyncClient(timeout=30) as client:
+        async def deliver(order_id, amount_paise):
+            event = build_event(args.event, order_id, amount_paise)
+            event_id = f"evt_{uuid.uuid4().hex[:14]}"
+            statuses = []
+            for _ in range(args.duplicates):
+                async with semaphore:
+                    statuses.append(await send(client, url, args.secret, event, event_id))
+            return statuses
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(deliver(o, a) for o, a in orders))
+        elapsed = time.perf_counter() - started
+
+    sent = sum(len(r) for r in results)
+    failed = sum(1 for r in results for status in r if status != 200)
+    print(f"sent {sent} deliveries for {len(orders)} orders in {elapsed:.2f}s, non-200: {failed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000/api")
+    parser.add_argument("--secret", required=True)
+    parser.add_argument("--event", default="payment.captured", choices=["payment.captured", "payment.failed"])
+    parser.add_argument("--order", action="append", default=[])
+    parser.add_argument("--amount", type=int, default=100, help="rupees, for --order events")
+    parser.add_argument("--from-db", action="store_true")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--duplicates", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
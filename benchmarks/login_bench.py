@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Login-burst benchmark.
+
+Measures latency of an unrelated endpoint (/slogans) while the server is busy
+with bcrypt logins. With hashing on the worker pool the p99 of the probe
+should stay close to its idle baseline.
+
+    python benchmarks/login_bench.py --base-url http://localhost:8000/api --logins 200
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from common import summarize
+
+
+async def probe(client, stop, samples, interval):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/slogans")
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def seed_user(client, password):
+    email = f"bench_{uuid.uuid4().hex[:10]}@example.com"
+    response = await client.post("/auth/register", json={
+        "full_name": "Bench User",
+        "email": email,
+        "phone": uuid.uuid4().hex[:10],
+        "password": password
+    })
+    response.raise_for_status()
+    return email
+
+
+async def login_burst(client, email, password, count, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/auth/login", json={"email": email, "password": password})
+            latencies.append((time.perf_counter() - started) * 1000)
+            return response.status_code
+
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(one() for _ in range(count)))
+    elapsed = time.perf_counter() - started
+    return latencies, statuses, elapsed
+
+
+async def main(args):
+    password = "Bench@123"
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        email = await seed_user(client, password)
+
+        idle = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, idle, args.probe_interval))
+        await asyncio.sleep(args.idle_seconds)
+        stop.set()
+        await task
+
+        busy = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, busy, args.probe_interval))
+        logins, statuses, elapsed = await login_burst(client, email, password, args.logins, args.concurrency)
+        stop.set()
+        await task
+
+    print(f"logins: {args.logins} in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s), "
+          f"non-200: {sum(1 for s in statuses if s != 200)}")
+    summarize("login", logins)
+    summarize("/slogans idle", idle)
+    summarize("/slogans during burst", busy)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000/api")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    asyncio.run(main(parser.parse_args()))
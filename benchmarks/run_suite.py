@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""End-to-end load benchmark for the backend.
+
+Brings up everything locally: a throwaway mongod (or --mongo-url), the fake
+Razorpay gateway and the API under uvicorn. It then seeds data and drives
+concurrent traffic at each endpoint group, reporting throughput and
+p50/p95/p99.
+
+    python benchmarks/run_suite.py                      # compare with baselines.json
+    python benchmarks/run_suite.py --save-baseline      # record new baselines
+    python benchmarks/run_suite.py --groups members,login --requests 500
+
+Exits non-zero when a group's p95 or throughput regresses by more than
+--tolerance against the stored baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from aiohttp import web
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from common import latency_summary
+from fake_razorpay import build_app as build_fake_gateway
+from seed import BENCH_PASSWORD, seed
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+ADMIN_PASSWORD = "bench-admin"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_until_up(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def start_mongod(mongod_bin, port):
+    dbpath = tempfile.mkdtemp(prefix="bench-mongod-")
+    process = subprocess.Popen(
+        [mongod_bin, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return process, dbpath
+
+
+async def start_fake_gateway(port):
+    runner = web.AppRunner(build_fake_gateway())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def start_api(port, mongo_url, db_name, gateway_url, workers):
+    env = {
+        **os.environ,
+        "MONGO_URL": mongo_url,
+        "DB_NAME": db_name,
+        "ADMIN_PASSWORD": ADMIN_PASSWORD,
+        "JWT_SECRET_KEY": "bench-secret",
+        "RAZORPAY_BASE_URL": gateway_url,
+        "RAZORPAY_KEY_ID": "rzp_test_bench",
+        "RAZORPAY_KEY_SECRET": "bench_secret",
+        "ACCESS_LOG_SAMPLE_RATE": "0.01",
+        "DEV_MODE": "false",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--no-access-log"],
+        cwd=ROOT / "backend", env=env,
+    )
+
+
+async def drive(client, make_request, total, concurrency):
+    """Issue `total` requests with `concurrency` in flight; return summary."""
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {**latency_summary(latencies), "rps": round(total / elapsed, 1), "errors": errors}
+
+
+def build_groups(admin_headers, member_headers, members):
+    return {
+        "members": lambda c, i: c.get("/members", headers=member_headers),
+        "members_status": lambda c, i: c.get("/savings/members-status", headers=admin_headers),
+        "analytics": lambda c, i: c.get("/savings/analytics", headers=admin_headers),
+        "festivals": lambda c, i: c.get("/festivals", headers=member_headers),
+        "landing": lambda c, i: c.get("/landing/bundle"),
+        "login": lambda c, i: c.post("/auth/login", json={
+            "email": f"member{i % members}@bench.example.com", "password": BENCH_PASSWORD
+        }),
+        "create_order": lambda c, i: c.post("/savings/create-order", json={"amount": 100}, headers=member_headers),
+    }
+
+
+def compare(results, baselines, tolerance):
+    regressions = []
+    for group, result in results.items():
+        base = baselines.get(group)
+        if not base:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{group}: p95 {result['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{group}: {result['rps']} req/s vs baseline {base['rps']} req/s")
+    return regressions
+
+
+async def main(args):
+    cleanup = []
+    mongo_url = args.mongo_url
+    try:
+        if not mongo_url:
+            mongod_bin = args.mongod_bin or shutil.which("mongod")
+            if not mongod_bin:
+                raise SystemExit("No --mongo-url given and no mongod binary found")
+            mongo_port = free_port()
+            process, dbpath = start_mongod(mongod_bin, mongo_port)
+            cleanup.append(lambda: (process.terminate(), process.wait(), shutil.rmtree(dbpath, True)))
+            mongo_url = f"mongodb://127.0.0.1:{mongo_port}/?directConnection=true"
+
+        client = AsyncIOMotorClient(mongo_url, tz_aware=True, serverSelectionTimeoutMS=20000)
+        cleanup.append(client.close)
+        await client.drop_database(args.db_name)
+        counts = await seed(client[args.db_name], args.members, args.years, args.festivals,
+                            args.expenses_per_festival)
+        print(f"seeded: {counts}")
+
+        gateway_port = free_port()
+        runner = await start_fake_gateway(gateway_port)
+
+        api_port = free_port()
+        api = start_api(api_port, mongo_url, args.db_name, f"http://127.0.0.1:{gateway_port}/v1", args.workers)
+        cleanup.append(lambda: (api.terminate(), api.wait()))
+        base_url = f"http://127.0.0.1:{api_port}/api"
+        await wait_until_up(f"{base_url}/slogans")
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as http:
+            admin = (await http.post("/auth/admin-login", json={"password": ADMIN_PASSWORD})).json()
+            member = (await http.post("/auth/login", json={
+                "email": counts["sample_email"], "password": BENCH_PASSWORD
+            })).json()
+            groups = build_groups(
+                {"Authorization": f"Bearer {admin['access_token']}"},
+                {"Authorization": f"Bearer {member['access_token']}"},
+                counts["users"],
+            )
+            selected = args.groups.split(",") if args.groups else list(groups)
+
+            results = {}
+            for name in selected:
+                # Short warm-up so caches and pools are in steady state
+                await drive(http, groups[name], min(50, args.requests), args.concurrency)
+                results[name] = await drive(http, groups[name], args.requests, args.concurrency)
+                r = results[name]
+                print(f"{name:<16} {r['rps']:8.1f} req/s  p50={r['p50_ms']:7.1f}ms  "
+                      f"p95={r['p95_ms']:7.1f}ms  p99={r['p99_ms']:7.1f}ms  errors={r['errors']}")
+        await runner.cleanup()
+    finally:
+        for fn in reversed(cleanup):
+            fn()
+
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    if args.save_baseline:
+        baselines.update(results)
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baselines written to {BASELINES}")
+        return 0
+    regressions = compare(results, baselines, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=None, help="use an existing server instead of a throwaway mongod")
+    parser.add_argument("--mongod-bin", default=None)
+    parser.add_argument("--db-name", default="balaga_bench")
+    parser.add_argument("--members", type=int, default=3000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--festivals", type=int, default=300)
+    parser.add_argument("--expenses-per-festival", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--groups", default=None, help="comma-separated subset of endpoint groups")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--save-baseline", action="store_true")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Seed a database with realistic volumes for benchmarking.
+
+    python benchmarks/seed.py --mongo-url mongodb://localhost:27017 --db-name balaga_bench \\
+        --members 3000 --years 5 --festivals 300
+
+Every seeded member shares the password BENCH_PASSWORD so login can be driven
+against any of them. The database is dropped first.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from passlib.context import CryptContext
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from indexes import ensure_indexes  # noqa: E402
+from rollups import rebuild_rollups  # noqa: E402
+
+BENCH_PASSWORD = "Bench@123"
+BATCH = 5000
+FIRST_NAMES = ["Anil", "Bhavya", "Chetan", "Deepa", "Ganesh", "Harish", "Kavya", "Manoj", "Nayana", "Pooja",
+               "Prakash", "Ramesh", "Shruti", "Sunil", "Vinay"]
+LAST_NAMES = ["Acharya", "Bhat", "Gowda", "Hegde", "Kamath", "Naik", "Pai", "Rao", "Shetty", "Shenoy"]
+
+
+async def insert_batched(collection, docs):
+    for start in range(0, len(docs), BATCH):
+        await collection.insert_many(docs[start:start + BATCH], ordered=False)
+
+
+async def seed(db, members: int, years: int, festivals: int, expenses_per_festival: int,
+               pay_rate: float = 0.8, rounds: int = 12) -> dict:
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    password_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(BENCH_PASSWORD)
+
+    users = []
+    for i in range(members):
+        joined = now - timedelta(days=rng.randint(0, years * 365))
+        users.append({
+            "id": str(uuid.uuid4()),
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+            "email": f"member{i}@bench.example.com",
+            "phone": f"9{i:09d}",
+            "password": password_hash,
+            "is_approved": rng.random() > 0.05,
+            "role": "user",
+            "created_at": joined,
+        })
+    await insert_batched(db.users, users)
+
+    payments = []
+    for user in users:
+        joined = user["created_at"]
+        month, year = joined.month, joined.year
+        while (year, month) <= (now.year, now.month):
+            if rng.random() < pay_rate:
+                paid_at = datetime(year, month, rng.randint(1, 28), tzinfo=timezone.utc)
+                payments.append({
+                    "id": str(uuid.uuid4()),
+                    "user_id": user["id"],
+                    "month": month,
+                    "year": year,
+                    "amount": 100.0,
+                    "status": "success",
+                    "payment_date": paid_at,
+                    "created_at": paid_at,
+                    "transaction_id": f"pay_{uuid.uuid4().hex[:14]}",
+                    "method": "UPI",
+                    "razorpay_order_id": f"order_{uuid.uuid4().hex[:14]}",
+                })
+            month += 1
+            if month > 12:
+                month, year = 1, year + 1
+    await insert_batched(db.monthly_payments, payments)
+
+    festival_docs, expense_docs = [], []
+    for i in range(festivals):
+        start = now - timedelta(days=rng.randint(0, years * 365))
+        festival = {
+            "id": str(uuid.uuid4()),
+            "name": f"Festival {i}",
+            "description": "Seeded for benchmarking",
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randint(1, 10)),
+            "total_budget": float(rng.randint(10, 500) * 1000),
+            "created_at": start - timedelta(days=30),
+        }
+        festival_docs.append(festival)
+        for j in range(expenses_per_festival):
+            expense_docs.append({
+                "id": str(uuid.uuid4()),
+                "festival_id": festival["id"],
+                "name": f"Expense {j}",
+                "amount": float(rng.randint(100, 20000)),
+                "date": start + timedelta(days=rng.randint(0, 10)),
+                "created_by": "admin",
+                "created_at": start,
+            })
+    await insert_batched(db.festivals, festival_docs)
+    await insert_batched(db.expenses, expense_docs)
+
+    await db.slogans.insert_many([
+        {"id": str(uuid.uuid4()), "text": f"Slogan {i}", "is_active": True, "order": i} for i in range(5)
+    ])
+    await db.achievements.insert_many([
+        {"id": str(uuid.uuid4()), "title": f"Achievement {i}", "description": "Seeded",
+         "date": now - timedelta(days=30 * i), "image_url": None} for i in range(20)
+    ])
+    await db.team_members.insert_many([
+        {"id": str(uuid.uuid4()), "name": f"Team {i}", "role": "Volunteer", "image_url": None, "order": i}
+        for i in range(12)
+    ])
+    await db.services.insert_many([
+        {"id": str(uuid.uuid4()), "title": f"Service {i}", "description": "Seeded", "icon_name": "Heart"}
+        for i in range(6)
+    ])
+
+    await ensure_indexes(db)
+    await rebuild_rollups(db)
+    return {
+        "users": len(users),
+        "payments": len(payments),
+        "festivals": len(festival_docs),
+        "expenses": len(expense_docs),
+        "sample_email": users[0]["email"],
+    }
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url, tz_aware=True)
+    try:
+        await client.drop_database(args.db_name)
+        counts = await seed(client[args.db_name], args.members, args.years, args.festivals,
+                            args.expenses_per_festival)
+        print(counts)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="balaga_bench")
+    parser.add_argument("--members", type=int, default=3000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--festivals", type=int, default=300)
+    parser.add_argument("--expenses-per-festival", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Serialisation cost per 1k rows for list endpoints.
+
+Compares the previous path (validate against the response_model, dump to
+JSON-mode Python, stdlib json) with the lean path (shape by model fields,
+orjson). No database or server needed.
+
+    python benchmarks/serialization_bench.py --rows 1000 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+# server.py reads these at import; nothing connects until a query runs
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "serialization_bench")
+from serialization import dumps, lean_rows  # noqa: E402
+from server import Achievement, Expense, Festival, User  # noqa: E402
+
+from common import latency_summary  # noqa: E402
+
+
+def make_docs(model, rows):
+    now = datetime.now(timezone.utc).replace(microsecond=123000)
+    samples = {
+        User: lambda i: {"id": str(uuid.uuid4()), "full_name": f"Member {i}", "email": f"m{i}@example.com",
+                         "phone": f"9{i:09d}", "is_approved": True, "role": "user", "created_at": now,
+                         "password": "$2b$12$" + "x" * 53},
+        Festival: lambda i: {"id": str(uuid.uuid4()), "name": f"Festival {i}", "description": "Annual event " * 5,
+                             "start_date": now, "end_date": now + timedelta(days=3),
+                             "total_budget": 125000.0, "created_at": now},
+        Expense: lambda i: {"id": str(uuid.uuid4()), "festival_id": str(uuid.uuid4()), "name": f"Expense {i}",
+                            "amount": 1500.5, "date": now, "created_by": "admin", "created_at": now},
+        Achievement: lambda i: {"id": str(uuid.uuid4()), "title": f"Achievement {i}",
+                                "description": "Community milestone", "date": now, "image_url": None},
+    }
+    return [samples[model](i) for i in range(rows)]
+
+
+def validated_stdlib(adapter, docs):
+    # What FastAPI does for a response_model: validate, serialise, json.dumps
+    value = adapter.dump_python(adapter.validate_python(docs), mode="json")
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def validated_orjson(adapter, docs):
+    return dumps(adapter.dump_python(adapter.validate_python(docs), mode="json"))
+
+
+def lean_orjson(model, docs):
+    return dumps(lean_rows(docs, model))
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return latency_summary(samples)
+
+
+def main(args):
+    per_k = 1000 / args.rows
+    for model in (User, Festival, Expense, Achievement):
+        docs = make_docs(model, args.rows)
+        adapter = TypeAdapter(List[model])
+        assert json.loads(validated_stdlib(adapter, docs)) == json.loads(lean_orjson(model, docs))
+        print(f"{model.__name__} ({args.rows} rows, ms per 1k rows)")
+        for label, fn in (
+            ("validate + json", lambda: validated_stdlib(adapter, docs)),
+            ("validate + orjson", lambda: validated_orjson(adapter, docs)),
+            ("lean + orjson", lambda: lean_orjson(model, docs)),
+        ):
+            s = measure(fn, args.repeat)
+            print(f"  {label:<18} p50={s['p50_ms'] * per_k:7.2f}  p95={s['p95_ms'] * per_k:7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,49 @@
+import { useEffect, useRef } from 'react';
+import { getToken, refreshAccessToken } from '../utils/auth';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+
+// Subscribes to /api/events (SSE) while mounted. `handlers` maps event names
+// to callbacks; "resync" fires when the server dropped events for this
+// connection and the page should refetch. EventSource reconnects on its own.
+export const useLiveEvents = (handlers) => {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    if (!getToken() || typeof EventSource === 'undefined') return undefined;
+
+    let source = null;
+    let listeners = [];
+    let closed = false;
+
+    const connect = () => {
+      source = new EventSource(
+        `${BACKEND_URL}/api/events?token=${encodeURIComponent(getToken())}`
+      );
+      listeners = Object.keys(handlersRef.current).map((name) => {
+        const listener = (event) => {
+          const handler = handlersRef.current[name];
+          if (handler) handler(event.data ? JSON.parse(event.data) : {});
+        };
+        source.addEventListener(name, listener);
+        return [name, listener];
+      });
+      // A rejected reconnect (expired access token) closes the EventSource
+      // for good; refresh the token and open a new one.
+      source.onerror = () => {
+        if (source.readyState !== EventSource.CLOSED || closed) return;
+        refreshAccessToken().then(() => {
+          if (!closed) connect();
+        }).catch(() => {});
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      listeners.forEach(([name, listener]) => source.removeEventListener(name, listener));
+      source.close();
+    };
+  }, []);
+};
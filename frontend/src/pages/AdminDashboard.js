@@ -3,6 +3,7 @@ import { motion } from 'framer-motion';
 import { Users, CheckCircle, XCircle, Trash2, DollarSign, TrendingUp } from 'lucide-react';
 import { MobileNav } from '../components/MobileNav';
 import { apiClient } from '../utils/auth';
+import { useLiveEvents } from '../hooks/use-live-events';
 import { toast } from 'sonner';
 import { Button } from '../components/ui/button';
 
@@ -14,6 +15,17 @@ export const AdminDashboard = () => {
     fetchAnalytics();
   }, []);
 
+  // Pushed by the server instead of re-polling analytics
+  useLiveEvents({
+    'payment.succeeded': () => fetchAnalytics(),
+    'user.registered': (event) => {
+      toast.info(`New registration: ${event.full_name}`);
+      fetchAnalytics();
+    },
+    'user.approved': () => fetchAnalytics(),
+    resync: () => fetchAnalytics(),
+  });
+
   const fetchAnalytics = async () => {
     try {
       const response = await apiClient.get('/savings/analytics');
@@ -1,8 +1,8 @@
 import { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
-import { CheckCircle, XCircle, Trash2, Users, Mail, Phone } from 'lucide-react';
+import { CheckCircle, XCircle, Trash2, Users, Mail, Phone, Upload } from 'lucide-react';
 import { MobileNav } from '../components/MobileNav';
-import { apiClient } from '../utils/auth';
+import { apiClient, getAllPages } from '../utils/auth';
 import { toast } from 'sonner';
 import { Button } from '../components/ui/button';
 import { Avatar, AvatarFallback } from '../components/ui/avatar';
@@ -28,8 +28,7 @@ export const AdminUsers = () => {
 
   const fetchUsers = async () => {
     try {
-      const response = await apiClient.get('/users');
-      setUsers(response.data);
+      setUsers(await getAllPages('/users'));
     } catch (error) {
       toast.error('Failed to load users');
     } finally {
@@ -47,6 +46,38 @@ export const AdminUsers = () => {
     }
   };
 
+  const handleApproveAll = async () => {
+    try {
+      const response = await apiClient.post('/users/batch-approve', {
+        user_ids: pendingUsers.map((u) => u.id),
+      });
+      toast.success(`${response.data.approved} users approved`);
+      fetchUsers();
+    } catch (error) {
+      toast.error('Failed to approve users');
+    }
+  };
+
+  const handleImport = async (event) => {
+    const file = event.target.files?.[0];
+    event.target.value = '';
+    if (!file) return;
+    try {
+      const response = await apiClient.post('/users/import', file, {
+        headers: { 'Content-Type': 'text/csv' },
+      });
+      const { imported, error_count } = response.data;
+      if (error_count > 0) {
+        toast.warning(`Imported ${imported} members, ${error_count} rows skipped`);
+      } else {
+        toast.success(`Imported ${imported} members`);
+      }
+      fetchUsers();
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Failed to import members');
+    }
+  };
+
   const handleDelete = async () => {
     if (!deleteUserId) return;
     try {
@@ -84,15 +115,38 @@ export const AdminUsers = () => {
       <div className="bg-gradient-to-br from-primary to-accent p-6 md:p-8">
         <h1 className="text-3xl md:text-4xl font-heading text-white mb-2">User Management</h1>
         <p className="text-white/90">Approve and manage community members</p>
+        <label className="mt-4 inline-flex items-center gap-2 bg-white/20 hover:bg-white/30 text-white px-4 py-2 rounded-full cursor-pointer text-sm font-medium">
+          <Upload size={16} />
+          Import CSV
+          <input
+            type="file"
+            accept=".csv,text/csv"
+            className="hidden"
+            onChange={handleImport}
+            data-testid="import-users-input"
+          />
+        </label>
       </div>
 
       <div className="max-w-7xl mx-auto px-6 py-8">
         {pendingUsers.length > 0 && (
           <div className="mb-8">
-            <h2 className="text-xl font-heading text-neutral-800 mb-4 flex items-center gap-2">
-              <Users size={24} className="text-status-warning" />
-              Pending Approvals ({pendingUsers.length})
-            </h2>
+            <div className="flex items-center justify-between mb-4">
+              <h2 className="text-xl font-heading text-neutral-800 flex items-center gap-2">
+                <Users size={24} className="text-status-warning" />
+                Pending Approvals ({pendingUsers.length})
+              </h2>
+              {pendingUsers.length > 1 && (
+                <Button
+                  onClick={handleApproveAll}
+                  className="bg-status-success hover:bg-status-success/90 text-white rounded-full font-medium h-10"
+                  data-testid="approve-all-users"
+                >
+                  <CheckCircle size={16} className="mr-1" />
+                  Approve all
+                </Button>
+              )}
+            </div>
             <div className="grid grid-cols-1 md:grid-cols-2 gap-4" data-testid="pending-users-list">
               {pendingUsers.map((user, index) => (
                 <motion.div
@@ -2,13 +2,14 @@ import { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
 import { PartyPopper, Plus, Calendar, IndianRupee, TrendingDown } from 'lucide-react';
 import { MobileNav } from '../components/MobileNav';
-import { apiClient, getUser } from '../utils/auth';
+import { apiClient, getAllPages, getUser } from '../utils/auth';
 import { toast } from 'sonner';
 
 export const Festivals = () => {
   const [festivals, setFestivals] = useState([]);
   const [selectedFestival, setSelectedFestival] = useState(null);
   const [expenses, setExpenses] = useState([]);
+  const [summary, setSummary] = useState({});
   const [loading, setLoading] = useState(true);
   const user = getUser();
   const isAdmin = user?.role === 'admin';
@@ -25,10 +26,14 @@ export const Festivals = () => {
 
   const fetchFestivals = async () => {
     try {
-      const response = await apiClient.get('/festivals');
-      setFestivals(response.data);
-      if (response.data.length > 0) {
-        setSelectedFestival(response.data[0]);
+      const [festivals, summaryResponse] = await Promise.all([
+        getAllPages('/festivals'),
+        apiClient.get('/festivals/summary'),
+      ]);
+      setFestivals(festivals);
+      setSummary(Object.fromEntries(summaryResponse.data.map((row) => [row.id, row])));
+      if (festivals.length > 0) {
+        setSelectedFestival(festivals[0]);
       }
     } catch (error) {
       toast.error('Failed to load festivals');
@@ -39,14 +44,17 @@ export const Festivals = () => {
 
   const fetchExpenses = async (festivalId) => {
     try {
-      const response = await apiClient.get(`/festivals/${festivalId}/expenses`);
-      setExpenses(response.data);
+      setExpenses(await getAllPages(`/festivals/${festivalId}/expenses`));
     } catch (error) {
       toast.error('Failed to load expenses');
     }
   };
 
-  const totalExpenses = expenses.reduce((sum, exp) => sum + exp.amount, 0);
+  // Server-side totals cover every expense, not just the loaded page
+  const festivalSummary = selectedFestival ? summary[selectedFestival.id] : null;
+  const totalExpenses = festivalSummary
+    ? festivalSummary.spent
+    : expenses.reduce((sum, exp) => sum + exp.amount, 0);
   const remainingBudget = selectedFestival
     ? selectedFestival.total_budget - totalExpenses
     : 0;
@@ -30,18 +30,12 @@ export const LandingPage = () => {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const [configRes, teamRes, servicesRes, achievementsRes, slogansRes] = await Promise.all([
-                    apiClient.get('/landing/config'),
-                    apiClient.get('/landing/team'),
-                    apiClient.get('/landing/services'),
-                    apiClient.get('/achievements'),
-                    apiClient.get('/slogans')
-                ]);
-                setConfig(configRes.data);
-                setTeam(teamRes.data);
-                setServices(servicesRes.data);
-                setAchievements(achievementsRes.data.slice(0, 3)); // Top 3
-                setSlogans(slogansRes.data);
+                const { data } = await apiClient.get('/landing/bundle');
+                setConfig(data.config);
+                setTeam(data.team);
+                setServices(data.services);
+                setAchievements(data.achievements.slice(0, 3)); // Top 3
+                setSlogans(data.slogans);
             } catch (err) {
                 console.error('Failed to fetch landing page data', err);
             } finally {
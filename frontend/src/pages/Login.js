@@ -3,7 +3,7 @@ import { useNavigate, Link } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { Eye, EyeOff, Lock } from 'lucide-react';
 import axios from 'axios';
-import { setToken, setUser } from '../utils/auth';
+import { setToken, setRefreshToken, setUser } from '../utils/auth';
 import { toast } from 'sonner';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -32,9 +32,10 @@ export const Login = () => {
         : { email: formData.email, password: formData.password };
 
       const response = await axios.post(`${API}${endpoint}`, payload);
-      const { access_token, user } = response.data;
+      const { access_token, refresh_token, user } = response.data;
 
       setToken(access_token);
+      setRefreshToken(refresh_token);
       setUser(user);
       toast.success('Login successful!');
 
@@ -2,7 +2,7 @@ import { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
 import { Search, Phone, Mail, CheckCircle } from 'lucide-react';
 import { MobileNav } from '../components/MobileNav';
-import { apiClient } from '../utils/auth';
+import { getAllPages } from '../utils/auth';
 import { toast } from 'sonner';
 import { Input } from '../components/ui/input';
 import { Avatar, AvatarFallback } from '../components/ui/avatar';
@@ -33,9 +33,9 @@ export const Members = () => {
 
   const fetchMembers = async () => {
     try {
-      const response = await apiClient.get('/members');
-      setMembers(response.data);
-      setFilteredMembers(response.data);
+      const rows = await getAllPages('/members');
+      setMembers(rows);
+      setFilteredMembers(rows);
     } catch (error) {
       toast.error('Failed to load members');
     } finally {
@@ -3,6 +3,7 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { Wallet, CheckCircle, Calendar, TrendingUp, CreditCard, Smartphone, ShieldCheck, X } from 'lucide-react';
 import { MobileNav } from '../components/MobileNav';
 import { apiClient, getUser } from '../utils/auth';
+import { useLiveEvents } from '../hooks/use-live-events';
 import { toast } from 'sonner';
 import { Button } from '../components/ui/button';
 import {
@@ -25,6 +26,12 @@ export const Savings = () => {
     fetchSavingsData();
   }, []);
 
+  // A webhook-settled payment shows up without a reload
+  useLiveEvents({
+    'payment.succeeded': () => fetchSavingsData(),
+    resync: () => fetchSavingsData(),
+  });
+
   const fetchSavingsData = async () => {
     try {
       const [savingsRes, configRes] = await Promise.all([
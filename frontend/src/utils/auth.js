@@ -15,6 +15,18 @@ export const removeToken = () => {
   localStorage.removeItem('token');
 };
 
+export const setRefreshToken = (token) => {
+  localStorage.setItem('refreshToken', token);
+};
+
+export const getRefreshToken = () => {
+  return localStorage.getItem('refreshToken');
+};
+
+export const removeRefreshToken = () => {
+  localStorage.removeItem('refreshToken');
+};
+
 export const setUser = (user) => {
   localStorage.setItem('user', JSON.stringify(user));
 };
@@ -28,12 +40,48 @@ export const removeUser = () => {
   localStorage.removeItem('user');
 };
 
-export const logout = () => {
+const clearSession = () => {
   removeToken();
+  removeRefreshToken();
   removeUser();
   window.location.href = '/login';
 };
 
+export const logout = () => {
+  const token = getToken();
+  const refreshToken = getRefreshToken();
+  if (token || refreshToken) {
+    // Best effort: revokes both tokens server-side
+    axios.post(
+      `${API}/auth/logout`,
+      refreshToken ? { refresh_token: refreshToken } : undefined,
+      { headers: token ? { Authorization: `Bearer ${token}` } : {} }
+    ).catch(() => {});
+  }
+  clearSession();
+};
+
+// Access tokens are short-lived; concurrent 401s share one refresh call
+let refreshing = null;
+
+export const refreshAccessToken = () => {
+  const refreshToken = getRefreshToken();
+  if (!refreshToken) return Promise.reject(new Error('No refresh token'));
+  if (!refreshing) {
+    refreshing = axios.post(`${API}/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        setToken(response.data.access_token);
+        setRefreshToken(response.data.refresh_token);
+        setUser(response.data.user);
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
 export const getAuthHeaders = () => {
   const token = getToken();
   return token ? { Authorization: `Bearer ${token}` } : {};
@@ -53,10 +101,37 @@ apiClient.interceptors.request.use((config) => {
 
 apiClient.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
-      logout();
+  async (error) => {
+    const original = error.config;
+    if (error.response?.status === 401 && original && !original._retried) {
+      original._retried = true;
+      try {
+        // Another tab may already have refreshed the shared tokens
+        const current = getToken();
+        const token = current && original.headers.Authorization !== `Bearer ${current}`
+          ? current
+          : await refreshAccessToken();
+        original.headers.Authorization = `Bearer ${token}`;
+        return apiClient(original);
+      } catch (refreshError) {
+        clearSession();
+      }
+    } else if (error.response?.status === 401) {
+      clearSession();
     }
     return Promise.reject(error);
   }
-);
\ No newline at end of file
+);
+
+// List endpoints are cursor-paginated (X-Next-Cursor); follow the cursor
+// to load the whole list in pages of up to 1000 rows.
+export const getAllPages = async (path, params = {}) => {
+  const rows = [];
+  let after;
+  do {
+    const response = await apiClient.get(path, { params: { ...params, limit: 1000, after } });
+    rows.push(...response.data);
+    after = response.headers['x-next-cursor'];
+  } while (after);
+  return rows;
+};
@@ -0,0 +1,233 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import auth_tokens
+from auth_tokens import (
+    RefreshTokenInvalid, RevocationList, issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+)
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        value = doc.get(field)
+        if isinstance(cond, dict):
+            for op, arg in cond.items():
+                if op == "$gt" and not (value is not None and value > arg):
+                    return False
+                if op == "$in" and value not in arg:
+                    return False
+        elif value != cond:  # None also matches a missing field, as in Mongo
+            return False
+    return True
+
+
+def _apply(doc, update):
+    if isinstance(update, list):  # aggregation pipeline: only $set with $ifNull is used
+        for stage in update:
+            for field, expr in stage["$set"].items():
+                if isinstance(expr, dict) and "$ifNull" in expr:
+                    ref, default = expr["$ifNull"]
+                    current = doc.get(ref[1:])
+                    doc[field] = current if current is not None else default
+                else:
+                    doc[field] = expr
+        return
+    doc.update(update.get("$set", {}))
+    for field, value in update.get("$max", {}).items():
+        doc[field] = max(doc.get(field, value), value)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if _matches(d, query)), None)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        for doc in self.docs:
+            if _matches(doc, query):
+                _apply(doc, update)
+                return dict(doc)
+        return None
+
+    async def update_one(self, query, update, upsert=False):
+        for doc in self.docs:
+            if _matches(doc, query):
+                _apply(doc, update)
+                return
+        if upsert:
+            doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            _apply(doc, update)
+            self.docs.append(doc)
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                _apply(doc, update)
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+    def find(self, query, projection=None):
+        docs = [dict(d) for d in self.docs if _matches(d, query)]
+
+        class Cursor:
+            async def to_list(self, length):
+                return docs
+        return Cursor()
+
+
+class FakeDb:
+    def __init__(self):
+        self.refresh_tokens = FakeCollection()
+        self.revocations = FakeCollection()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def _in(**delta):
+    return datetime.now(timezone.utc) + timedelta(**delta)
+
+
+def test_unrevoked_token_passes():
+    revocations = RevocationList(ttl_seconds=60)
+    assert not revocations.is_revoked({"sub": "u1", "jti": "a", "iat": int(time.time())})
+
+
+def test_revoke_token_denies_only_that_jti():
+    db = FakeDb()
+    revocations = RevocationList(ttl_seconds=60)
+    run(revocations.revoke_token(db, "a"))
+    now = int(time.time())
+    assert revocations.is_revoked({"sub": "u1", "jti": "a", "iat": now})
+    assert not revocations.is_revoked({"sub": "u1", "jti": "b", "iat": now})
+
+
+def test_revoke_user_denies_tokens_issued_before_revocation():
+    db = FakeDb()
+    revocations = RevocationList(ttl_seconds=60)
+    run(revocations.revoke_users(db, ["u1", "u2"]))
+    now = int(time.time())
+    assert revocations.is_revoked({"sub": "u1", "jti": "a", "iat": now - 10})
+    assert revocations.is_revoked({"sub": "u2", "jti": "b", "iat": now - 10})
+    assert not revocations.is_revoked({"sub": "u1", "jti": "c", "iat": now + 1})
+    assert not revocations.is_revoked({"sub": "u3", "jti": "d", "iat": now - 10})
+    assert len(db.revocations.docs) == 2
+
+
+def test_revoke_user_denies_token_issued_earlier_in_the_same_second():
+    db = FakeDb()
+    revocations = RevocationList(ttl_seconds=60)
+    issued = int(time.time() * 1000) / 1000  # as create_access_token stamps iat
+    run(revocations.revoke_user(db, "u1"))
+    assert revocations.is_revoked({"sub": "u1", "jti": "a", "iat": issued})
+    assert revocations.is_revoked({"sub": "u1", "jti": "b", "iat": int(issued)})
+
+
+def test_sync_picks_up_other_workers_revocations():
+    db = FakeDb()
+    other_worker = RevocationList(ttl_seconds=60)
+    this_worker = RevocationList(ttl_seconds=60)
+    run(other_worker.revoke_token(db, "a"))
+    run(other_worker.revoke_user(db, "u1"))
+    payload = {"sub": "u1", "jti": "b", "iat": int(time.time()) - 10}
+    assert not this_worker.is_revoked(payload)
+
+    run(this_worker.sync(db))
+    assert this_worker.is_revoked({"sub": "u2", "jti": "a", "iat": 0})
+    assert this_worker.is_revoked(payload)
+
+
+def test_sync_keeps_local_revocations_and_drops_expired_ones():
+    db = FakeDb()
+    revocations = RevocationList(ttl_seconds=60)
+    # Revoked here after the sync query read the collection
+    revocations._jtis["local"] = datetime.now(timezone.utc) + timedelta(seconds=60)
+    revocations._jtis["expired"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+    run(revocations.sync(db))
+    assert revocations.is_revoked({"sub": "u1", "jti": "local"})
+    assert not revocations.is_revoked({"sub": "u1", "jti": "expired"})
+
+
+def test_rotation_returns_record_once():
+    db = FakeDb()
+    token = run(issue_refresh_token(db, "u1", "user", _in(days=1)))
+    record = run(rotate_refresh_token(db, token))
+    assert record["user_id"] == "u1"
+    assert record["rotated_at"] is not None
+
+
+def test_unknown_refresh_token_is_rejected():
+    with pytest.raises(RefreshTokenInvalid):
+        run(rotate_refresh_token(FakeDb(), "nope"))
+
+
+def test_reuse_within_grace_window_is_accepted():
+    db = FakeDb()
+    token = run(issue_refresh_token(db, "u1", "user", _in(days=1)))
+    first = run(rotate_refresh_token(db, token))
+    # A second tab presenting the same stored token at the same moment
+    second = run(rotate_refresh_token(db, token))
+    assert second["family"] == first["family"]
+
+
+def test_reuse_after_grace_window_revokes_family(monkeypatch):
+    db = FakeDb()
+    token = run(issue_refresh_token(db, "u1", "user", _in(days=1)))
+    run(rotate_refresh_token(db, token))
+    family = db.refresh_tokens.docs[0]["family"]
+    successor = run(issue_refresh_token(db, "u1", "user", _in(days=1), family=family))
+
+    monkeypatch.setattr(auth_tokens, "REUSE_GRACE_SECONDS", -1)
+    with pytest.raises(RefreshTokenInvalid):
+        run(rotate_refresh_token(db, token))
+    monkeypatch.setattr(auth_tokens, "REUSE_GRACE_SECONDS", 30)
+    with pytest.raises(RefreshTokenInvalid):
+        run(rotate_refresh_token(db, successor))
+
+
+def test_revoked_token_is_not_accepted_within_grace_window():
+    db = FakeDb()
+    token = run(issue_refresh_token(db, "u1", "user", _in(days=1)))
+    run(revoke_refresh_token(db, token))
+    with pytest.raises(RefreshTokenInvalid):
+        run(rotate_refresh_token(db, token))
+
+
+def test_expired_refresh_token_is_rejected():
+    db = FakeDb()
+    token = run(issue_refresh_token(db, "u1", "user", _in(seconds=-1)))
+    with pytest.raises(RefreshTokenInvalid):
+        run(rotate_refresh_token(db, token))
+
+
+def test_rotation_returns_family_expiry_and_credential():
+    db = FakeDb()
+    expires_at = _in(hours=12)
+    token = run(issue_refresh_token(db, "admin", "admin", expires_at, credential="fp"))
+    record = run(rotate_refresh_token(db, token))
+    assert record["expires_at"] == expires_at
+    assert record["credential"] == "fp"
+    successor = run(issue_refresh_token(
+        db, "admin", "admin", record["expires_at"], family=record["family"], credential=record["credential"]
+    ))
+    assert run(rotate_refresh_token(db, successor))["expires_at"] == expires_at
+
+
+def test_revoke_refresh_family():
+    db = FakeDb()
+    token = run(issue_refresh_token(db, "u1", "user", _in(days=1)))
+    family = db.refresh_tokens.docs[0]["family"]
+    run(auth_tokens.revoke_refresh_family(db, family))
+    with pytest.raises(RefreshTokenInvalid):
+        run(rotate_refresh_token(db, token))
@@ -0,0 +1,23 @@
+from caching import etag_matches
+
+
+def test_exact_match():
+    assert etag_matches('"v1"', '"v1"')
+
+
+def test_weak_validator_matches():
+    assert etag_matches('W/"v1"', '"v1"')
+
+
+def test_any_of_a_list_matches():
+    assert etag_matches('"v0", W/"v1" , "v2"', '"v1"')
+
+
+def test_wildcard_matches():
+    assert etag_matches(" * ", '"v1"')
+
+
+def test_mismatch_and_missing_headers():
+    assert not etag_matches('"v2"', '"v1"')
+    assert not etag_matches(None, '"v1"')
+    assert not etag_matches('"v1"', None)
@@ -0,0 +1,42 @@
+import pytest
+
+import compression
+from compression import negotiate_encoding
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+def test_prefers_br_when_available(with_brotli):
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+
+
+def test_falls_back_to_gzip_without_brotli(without_brotli):
+    assert negotiate_encoding("gzip, br") == "gzip"
+
+
+def test_q_zero_excludes_an_encoding(with_brotli):
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0") is None
+
+
+def test_wildcard(with_brotli):
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("*;q=0, gzip") == "gzip"
+
+
+def test_no_acceptable_encoding(with_brotli):
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("identity, deflate") is None
+
+
+def test_unparseable_quality_counts_as_zero(with_brotli):
+    assert negotiate_encoding("br;q=abc, gzip") == "gzip"
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from concurrency import PeriodicTask, SingleFlight, gather_bounded
+
+
+def test_gather_bounded_keeps_argument_order_and_limit():
+    running = 0
+    peak = 0
+
+    async def work(value, delay):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(delay)
+        running -= 1
+        return value
+
+    async def main():
+        return await gather_bounded(work("a", 0.03), work("b", 0.01), work("c", 0.02), work("d", 0), limit=2)
+
+    assert asyncio.run(main()) == ["a", "b", "c", "d"]
+    assert peak == 2
+
+
+def test_gather_bounded_cancels_siblings_on_failure():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await gather_bounded(slow(), failing())
+
+    asyncio.run(main())
+    assert cancelled == [True]
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.run("k", load) for _ in range(3)))
+        after = await flight.run("k", load)  # the first flight has landed
+        return results, after, flight
+
+    results, after, flight = asyncio.run(main())
+    assert results == [1, 1, 1]
+    assert after == 2
+    assert flight.coalesced == 2
+    assert not flight._inflight
+
+
+def test_single_flight_shares_errors_and_survives_caller_cancel():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            raise ValueError("boom")
+
+        first = asyncio.ensure_future(flight.run("k", load))
+        second = asyncio.ensure_future(flight.run("k", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(ValueError):
+            await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
+
+
+def test_periodic_task_keeps_running_after_errors():
+    results = iter([ValueError("boom"), 1, 2, 3, 4, 5])
+
+    async def step():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def main():
+        task = PeriodicTask("test", step, interval=0.001)
+        task.start()
+        task.start()  # already running: no second loop
+        while task.runs < 2:
+            await asyncio.sleep(0.001)
+        await task.stop()
+        return task
+
+    task = asyncio.run(main())
+    assert task.runs >= 2
+    assert task.last_result == task.runs  # the failed first run isn't counted
+    assert task._task is None
@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from events import ADMINS, EVERYONE, ChangeStreamFeed, EventBus, TooManySubscribers, sse_stream
+
+
+def _drain(subscription):
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+
+def test_publish_reaches_only_its_audience():
+    async def main():
+        bus = EventBus()
+        admin = bus.subscribe("admin", True)
+        alice = bus.subscribe("alice", False)
+        bob = bus.subscribe("bob", False)
+        bus.publish("a", {}, ADMINS)
+        bus.publish("b", {}, "alice")
+        bus.publish("c", {}, EVERYONE)
+        return [[name for name, _ in _drain(s)] for s in (admin, alice, bob)]
+
+    assert asyncio.run(main()) == [["a", "c"], ["b", "c"], ["c"]]
+
+
+def test_overflow_replaces_backlog_with_resync():
+    async def main():
+        bus = EventBus(max_queue=2)
+        subscription = bus.subscribe("u1", False)
+        for i in range(3):
+            bus.publish("tick", {"i": i})
+        return subscription, _drain(subscription), bus.stats()
+
+    subscription, messages, stats = asyncio.run(main())
+    assert messages == [("resync", {})]
+    assert subscription.dropped == 2
+    assert stats["dropped"] == 2
+
+
+def test_close_sentinel_survives_a_full_queue():
+    async def main():
+        bus = EventBus(max_queue=1)
+        subscription = bus.subscribe("u1", False)
+        bus.publish("tick", {})
+        bus.close()
+        return _drain(subscription)
+
+    assert asyncio.run(main()) == [None]
+
+
+def test_subscriber_cap():
+    async def main():
+        bus = EventBus(max_subscribers=1)
+        first = bus.subscribe("u1", False)
+        assert bus.full
+        with pytest.raises(TooManySubscribers):
+            bus.subscribe("u2", False)
+        bus.unsubscribe(first)
+        assert not bus.full
+        return bus.stats()["rejected"]
+
+    assert asyncio.run(main()) == 1
+
+
+def test_sse_stream_subscribes_lazily_and_unsubscribes_on_close():
+    async def main():
+        bus = EventBus()
+        stream = sse_stream(bus, "u1", False, heartbeat=0.01)
+        assert await stream.__anext__() == b"retry: 5000\n\n"
+        assert bus.stats()["subscribers"] == 0
+        assert await stream.__anext__() == b": ping\n\n"
+        assert bus.stats()["subscribers"] == 1
+        bus.publish("hello", {"x": 1})
+        chunk = await stream.__anext__()
+        await stream.aclose()
+        return chunk, bus.stats()["subscribers"]
+
+    chunk, subscribers = asyncio.run(main())
+    assert chunk.startswith(b'event: hello\ndata: {"x":1,')
+    assert subscribers == 0
+
+
+def test_sse_stream_ends_on_close():
+    async def main():
+        bus = EventBus()
+        stream = sse_stream(bus, "u1", False, heartbeat=10)
+        await stream.__anext__()
+        waiting = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+        bus.close()
+        with pytest.raises(StopAsyncIteration):
+            await waiting
+
+    asyncio.run(main())
+
+
+class FakeStream:
+    def __init__(self, changes, fail_with=None):
+        self.changes = changes
+        self.fail_with = fail_with
+        self.resume_token = None
+
+    async def __aenter__(self):
+        if self.fail_with is not None:
+            raise self.fail_with
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for i, change in enumerate(self.changes):
+            self.resume_token = {"_data": i}
+            yield change
+        await asyncio.Event().wait()  # stay open like a real stream
+
+
+class FakeDb:
+    def __init__(self, *streams):
+        self.streams = list(streams)
+        self.resume_tokens = []
+
+    def watch(self, pipeline, full_document=None, resume_after=None):
+        self.resume_tokens.append(resume_after)
+        return self.streams.pop(0) if len(self.streams) > 1 else self.streams[0]
+
+
+def _insert(coll, doc):
+    return {"_id": {"_data": coll}, "ns": {"coll": coll}, "operationType": "insert", "fullDocument": doc}
+
+
+async def _run_feed(feed, until):
+    feed.start()
+    for _ in range(200):
+        if until():
+            break
+        await asyncio.sleep(0.005)
+    running = feed.running
+    await feed.stop()
+    return running
+
+
+def test_feed_skips_a_bad_change_and_keeps_publishing():
+    async def main():
+        bus = EventBus()
+        subscription = bus.subscribe("admin", True)
+        changes = [
+            {"_id": {"_data": "bad"}, "operationType": "insert", "fullDocument": {"id": "x"}},  # no ns
+            _insert("users", {"id": "u1", "full_name": "Asha"}),
+        ]
+        feed = ChangeStreamFeed(FakeDb(FakeStream(changes)), bus, retry_delay=0.01)
+        running = await _run_feed(feed, lambda: not subscription.queue.empty())
+        return running, _drain(subscription), feed
+
+    running, messages, feed = asyncio.run(main())
+    assert running
+    assert [name for name, _ in messages] == ["user.registered"]
+    assert not feed.running
+
+
+def test_feed_reports_not_running_while_watch_fails():
+    async def main():
+        bus = EventBus()
+        denied = OperationFailure("not authorized", code=13)
+        db = FakeDb(FakeStream([], fail_with=denied))
+        feed = ChangeStreamFeed(db, bus, retry_delay=0.01)
+        running = await _run_feed(feed, lambda: feed.failures >= 2)
+        return running, feed.failures
+
+    running, failures = asyncio.run(main())
+    assert not running
+    assert failures >= 2
+
+
+def test_feed_restarts_after_an_unexpected_error_and_resumes():
+    async def main():
+        bus = EventBus()
+        subscription = bus.subscribe("admin", True)
+        broken = FakeStream([], fail_with=RuntimeError("boom"))
+        healthy = FakeStream([_insert("users", {"id": "u1"})])
+        db = FakeDb(broken, healthy)
+        feed = ChangeStreamFeed(db, bus, retry_delay=0.01)
+        running = await _run_feed(feed, lambda: not subscription.queue.empty())
+        return running, feed.failures, _drain(subscription)
+
+    running, failures, messages = asyncio.run(main())
+    assert running
+    assert failures == 1
+    assert [name for name, _ in messages] == ["user.registered"]
@@ -0,0 +1,102 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+
+import exports
+from exports import export_stream
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeDb:
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = []
+
+    def __getitem__(self, name):
+        db = self
+
+        class Collection:
+            def find(self, query, projection):
+                db.calls.append((name, query, projection))
+                return FakeCursor(db.docs)
+        return Collection()
+
+
+def _collect(stream):
+    async def main():
+        return [chunk async for chunk in stream]
+    return asyncio.run(main())
+
+
+def _expense(i, **extra):
+    return {
+        "id": f"e{i}", "festival_id": "f1", "name": f"Item, \"{i}\"", "amount": 10.5,
+        "date": datetime(2024, 5, 1, tzinfo=timezone.utc), "created_by": None, **extra,
+    }
+
+
+def test_csv_has_header_escapes_values_and_blanks_none():
+    chunks = _collect(export_stream(FakeDb([_expense(1)]), "expenses", {}, "csv", False))
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == exports.EXPORTS["expenses"]["fields"]
+    assert rows[1] == ["e1", "f1", 'Item, "1"', "10.5", "2024-05-01T00:00:00+00:00", "", ""]
+
+
+def test_ndjson_omits_missing_fields():
+    chunks = _collect(export_stream(FakeDb([_expense(1)]), "expenses", {}, "ndjson", False))
+    lines = b"".join(chunks).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [{
+        "id": "e1", "festival_id": "f1", "name": 'Item, "1"', "amount": 10.5,
+        "date": "2024-05-01T00:00:00+00:00", "created_by": None,
+    }]
+
+
+def test_projection_only_selects_export_columns():
+    db = FakeDb([])
+    _collect(export_stream(db, "users", {"role": "user"}, "csv", False))
+    name, query, projection = db.calls[0]
+    assert "password" not in projection
+    assert projection == {"_id": 0, **{f: 1 for f in exports.EXPORTS["users"]["fields"]}}
+
+
+def test_rows_are_buffered_into_chunks(monkeypatch):
+    monkeypatch.setattr(exports, "CHUNK_BYTES", 200)
+    docs = [_expense(i) for i in range(20)]
+    for fmt in ("csv", "ndjson"):
+        chunks = _collect(export_stream(FakeDb(docs), "expenses", {}, fmt, False))
+        assert 1 < len(chunks) < len(docs)
+        assert all(len(chunk) >= 200 for chunk in chunks[:-1])
+
+
+def test_gzip_stream_decompresses_to_the_plain_export(monkeypatch):
+    monkeypatch.setattr(exports, "CHUNK_BYTES", 200)
+    docs = [_expense(i) for i in range(50)]
+    plain = b"".join(_collect(export_stream(FakeDb(docs), "expenses", {}, "ndjson", False)))
+    zipped = b"".join(_collect(export_stream(FakeDb(docs), "expenses", {}, "ndjson", True)))
+    assert zipped[:2] == b"\x1f\x8b"
+    assert gzip.decompress(zipped) == plain
+
+
+def test_empty_gzip_export_is_still_a_valid_archive():
+    zipped = b"".join(_collect(export_stream(FakeDb([]), "expenses", {}, "ndjson", True)))
+    assert gzip.decompress(zipped) == b""
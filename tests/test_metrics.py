@@ -0,0 +1,35 @@
+from metrics import Registry
+
+
+def test_callback_metrics_are_read_at_render_time():
+    registry = Registry()
+    state = {"rebuilds": 0, "bytes": 10}
+    registry.callback_counter("rebuilds_total", "Rebuilds", lambda: state["rebuilds"])
+    registry.callback_gauge("bundle_bytes", "Bundle size", lambda: state["bytes"])
+    state["rebuilds"] = 3
+    assert registry.render().splitlines() == [
+        "# HELP rebuilds_total Rebuilds",
+        "# TYPE rebuilds_total counter",
+        "rebuilds_total 3",
+        "# HELP bundle_bytes Bundle size",
+        "# TYPE bundle_bytes gauge",
+        "bundle_bytes 10",
+    ]
+
+
+def test_labelled_counter_and_histogram_render():
+    registry = Registry()
+    counter = registry.counter("hits_total", "Hits", ("route",))
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    counter.inc("/a")
+    counter.inc("/a", amount=2)
+    histogram.observe(value=0.5)
+    lines = registry.render().splitlines()
+    assert 'hits_total{route="/a"} 3' in lines
+    assert [line for line in lines if line.startswith("latency_seconds")] == [
+        'latency_seconds_bucket{le="0.1"} 0',
+        'latency_seconds_bucket{le="1.0"} 1',
+        'latency_seconds_bucket{le="+Inf"} 1',
+        "latency_seconds_sum 0.5",
+        "latency_seconds_count 1",
+    ]
@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import migrations
+from migrations import LOCK_ID, acquire_lease, as_datetime, release_lease, run_pending_migrations
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        if field == "$or":
+            if not any(_matches(doc, clause) for clause in cond):
+                return False
+        elif isinstance(cond, dict):
+            if "$lt" in cond and not (doc.get(field) is not None and doc[field] < cond["$lt"]):
+                return False
+        elif doc.get(field) != cond:
+            return False
+    return True
+
+
+class FakeMigrations:
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is not None and _matches(doc, query):
+            doc.update(update["$set"])
+        elif doc is not None and upsert:
+            raise DuplicateKeyError("E11000 duplicate key")
+        elif upsert:
+            self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+
+    async def delete_one(self, query):
+        doc = self.docs.get(query["_id"])
+        if doc is not None and _matches(doc, query):
+            del self.docs[query["_id"]]
+
+    def find(self, query, projection=None):
+        docs = [{"_id": _id} for _id in self.docs]
+
+        class Cursor:
+            async def to_list(self, length):
+                return docs
+        return Cursor()
+
+
+class FakeDb:
+    def __init__(self):
+        self.migrations = FakeMigrations()
+        self.ran = []
+
+
+def _recording(migration_id):
+    async def migrate(db):
+        db.ran.append(migration_id)
+        return {"ok": 1}
+    return migrate
+
+
+def test_lease_is_exclusive_until_released():
+    async def main():
+        db = FakeDb()
+        assert await acquire_lease(db, "w1")
+        assert await acquire_lease(db, "w1")  # renewal
+        assert not await acquire_lease(db, "w2")
+        await release_lease(db, "w2")  # not the holder: no effect
+        assert not await acquire_lease(db, "w2")
+        await release_lease(db, "w1")
+        assert await acquire_lease(db, "w2")
+
+    asyncio.run(main())
+
+
+def test_expired_lease_can_be_taken_over():
+    async def main():
+        db = FakeDb()
+        assert await acquire_lease(db, "w1")
+        db.migrations.docs[LOCK_ID]["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+        return await acquire_lease(db, "w2")
+
+    assert asyncio.run(main())
+
+
+def test_runs_pending_migrations_once_and_releases(monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATIONS", [("a", _recording("a")), ("b", _recording("b"))])
+
+    async def main():
+        db = FakeDb()
+        db.migrations.docs["a"] = {"_id": "a"}
+        first = await run_pending_migrations(db, "w1")
+        second = await run_pending_migrations(db, "w1")
+        return db, first, second
+
+    db, first, second = asyncio.run(main())
+    assert first == ["b"]
+    assert second == []
+    assert db.ran == ["b"]
+    assert LOCK_ID not in db.migrations.docs
+
+
+def test_skips_while_another_worker_holds_the_lease(monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATIONS", [("a", _recording("a"))])
+
+    async def main():
+        db = FakeDb()
+        await acquire_lease(db, "w1")
+        return db, await run_pending_migrations(db, "w2")
+
+    db, applied = asyncio.run(main())
+    assert applied == []
+    assert db.ran == []
+    assert db.migrations.docs[LOCK_ID]["owner"] == "w1"
+
+
+def test_failed_migration_still_releases_the_lease(monkeypatch):
+    async def broken(db):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [("a", broken)])
+    db = FakeDb()
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_pending_migrations(db, "w1"))
+    assert db.migrations.docs == {}
+
+
+def test_as_datetime_accepts_both_representations():
+    stamp = datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc)
+    assert as_datetime(stamp) is stamp
+    assert as_datetime("2024-05-01T10:30:00+00:00") == stamp
+    assert as_datetime("2024-05-01T10:30:00Z") == stamp
+    assert as_datetime("2024-05-01T10:30:00") == stamp
+    assert as_datetime("not a date") is None
+    assert as_datetime(None) is None
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from pagination import (
+    NEXT_CURSOR_HEADER, date_range_filter, decode_cursor, fetch_page, page_response, parse_fields
+)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return [dict(d) for d in self.docs]
+
+
+class FakeCollection:
+    def __init__(self, count):
+        self.docs = [{"_id": ObjectId(), "id": f"u{i}"} for i in range(count)]
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        bound = query.get("_id", {}).get("$gt")
+        return FakeCursor([d for d in self.docs if bound is None or d["_id"] > bound])
+
+
+def _pages(collection, limit):
+    async def walk():
+        pages, after = [], None
+        while True:
+            docs, after = await fetch_page(collection, {}, {"password": 0}, limit, after)
+            pages.append([d["id"] for d in docs])
+            if after is None:
+                return pages
+    return asyncio.run(walk())
+
+
+def test_cursor_round_trip():
+    oid = ObjectId()
+    assert decode_cursor(str(oid)) == oid
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["nope", "123", "zz" * 12])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_pages_cover_every_document_once():
+    collection = FakeCollection(5)
+    assert _pages(collection, 2) == [["u0", "u1"], ["u2", "u3"], ["u4"]]
+
+
+def test_exact_multiple_has_no_empty_trailing_page():
+    assert _pages(FakeCollection(4), 2) == [["u0", "u1"], ["u2", "u3"]]
+
+
+def test_page_drops_internal_id():
+    docs, _ = asyncio.run(fetch_page(FakeCollection(1), {}, {"password": 0}, 10, None))
+    assert docs == [{"id": "u0"}]
+
+
+def test_page_response_sets_next_cursor_header():
+    assert page_response([{"id": "u0"}], "abc").headers[NEXT_CURSOR_HEADER] == "abc"
+    assert NEXT_CURSOR_HEADER not in page_response([], None).headers
+
+
+def test_parse_fields():
+    assert parse_fields("email, full_name", {"id", "email", "full_name"}) == {"id": 1, "email": 1, "full_name": 1}
+    assert parse_fields(None, {"id"}) is None
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("password", {"id", "email"})
+    assert exc.value.status_code == 400
+
+
+def test_date_range_filter_matches_dates_and_unmigrated_iso_strings():
+    start = datetime(2024, 5, 1, 5, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    assert date_range_filter("date", None, None) == {}
+    assert date_range_filter("date", start, None) == {"$or": [
+        {"date": {"$gte": start}},
+        {"date": {"$gte": "2024-05-01T00:00:00+00:00"}},
+    ]}
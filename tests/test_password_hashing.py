@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+from password_hashing import PasswordHasher, PasswordPoolFull
+
+
+def _blocking_hasher(max_queue):
+    """A single-worker hasher plus an event that holds its worker busy."""
+    hasher = PasswordHasher(workers=1, rounds=4, max_queue=max_queue)
+    release = threading.Event()
+    return hasher, release
+
+
+async def _occupy_worker(hasher, release):
+    running = asyncio.create_task(hasher._run(release.wait))
+    while hasher.stats()["active"] == 0:
+        await asyncio.sleep(0.001)
+    return running
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=2, rounds=4)
+
+    async def main():
+        hashed = await hasher.hash("secret")
+        return await hasher.verify("secret", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        assert asyncio.run(main()) == (True, False)
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["active"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_rejects_when_queue_is_full():
+    hasher, release = _blocking_hasher(max_queue=2)
+
+    async def main():
+        running = await _occupy_worker(hasher, release)
+        queued = [asyncio.create_task(hasher._run(lambda: "ok")) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordPoolFull):
+            await hasher._run(lambda: "rejected")
+        assert hasher.stats()["queue_depth"] == 2
+        release.set()
+        return await asyncio.gather(running, *queued)
+
+    try:
+        assert asyncio.run(main()) == [True, "ok", "ok"]
+        stats = hasher.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 3
+        assert stats["max_queue_depth_seen"] == 2
+        assert stats["queue_depth"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_cancelling_queued_jobs_releases_their_slots():
+    hasher, release = _blocking_hasher(max_queue=4)
+    ran = []
+
+    async def main():
+        running = await _occupy_worker(hasher, release)
+        queued = [asyncio.create_task(hasher._run(ran.append, i)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert hasher.stats()["queue_depth"] == 3
+        for task in queued[:2]:
+            task.cancel()
+        await asyncio.gather(*queued[:2], return_exceptions=True)
+        assert hasher.stats()["queue_depth"] == 1
+        release.set()
+        await asyncio.gather(running, queued[2])
+
+    try:
+        asyncio.run(main())
+        stats = hasher.stats()
+        assert stats["queue_depth"] == 0
+        assert stats["active"] == 0
+        assert ran == [2]
+    finally:
+        hasher.shutdown()
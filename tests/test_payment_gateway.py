@@ -0,0 +1,164 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import payment_gateway
+from payment_gateway import CircuitBreaker, GatewayError, GatewayUnavailable, RazorpayGateway
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the module's view of time: asyncio's own clock must keep running
+    monkeypatch.setattr(payment_gateway, "time", SimpleNamespace(monotonic=clock, perf_counter=time.perf_counter))
+    return clock
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(GatewayUnavailable):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_a_single_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(GatewayUnavailable):
+        breaker.before_call()
+
+
+def test_half_open_trial_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_half_open_trial_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 29
+    assert breaker.state == "open"
+
+
+def _gateway(handler):
+    gateway = RazorpayGateway("key", "secret", base_url="http://gateway", max_retries=2, backoff_base=0)
+    gateway._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://gateway")
+    return gateway
+
+
+def _fetch_order(gateway, order_id):
+    # An idempotent GET: the case the retry policy allows after a read timeout
+    return gateway._request("fetch_order", "GET", f"/orders/{order_id}")
+
+
+def test_create_order_is_not_retried_after_read_timeout():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("slow", request=request)
+
+    with pytest.raises(GatewayError):
+        asyncio.run(_gateway(handler).create_order(10000))
+    assert len(calls) == 1
+
+
+def test_create_order_is_retried_after_connect_error():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"id": "order_1"})
+
+    assert asyncio.run(_gateway(handler).create_order(10000)) == {"id": "order_1"}
+    assert len(calls) == 2
+
+
+def test_get_is_retried_after_read_timeout():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            raise httpx.ReadTimeout("slow", request=request)
+        return httpx.Response(200, json={"id": "order_1"})
+
+    assert asyncio.run(_fetch_order(_gateway(handler), "order_1")) == {"id": "order_1"}
+    assert len(calls) == 3
+
+
+def _half_open_gateway(handler, clock):
+    gateway = _gateway(handler)
+    gateway.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    gateway.breaker.record_failure()
+    clock.now += 30
+    return gateway
+
+
+def test_unexpected_error_during_trial_reopens_the_breaker(clock):
+    def handler(request):
+        raise httpx.DecodingError("garbled", request=request)
+
+    gateway = _half_open_gateway(handler, clock)
+    with pytest.raises(httpx.DecodingError):
+        asyncio.run(_fetch_order(gateway, "order_1"))
+    assert gateway.breaker.state == "open"
+    assert not gateway.breaker._trial_in_flight
+
+
+def test_cancelled_trial_releases_the_half_open_slot(clock):
+    async def handler(request):
+        await asyncio.sleep(10)
+
+    gateway = _half_open_gateway(handler, clock)
+
+    async def main():
+        call = asyncio.create_task(_fetch_order(gateway, "order_1"))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    asyncio.run(main())
+    assert gateway.breaker.state == "half_open"
+    gateway.breaker.before_call()  # a new trial is allowed
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from query_log import SlowQueryLog, filter_shape, redact, summarize_plan
+
+
+def test_redact_keeps_fields_and_operators_only():
+    query = {"email": "a@b.c", "created_at": {"$gte": 5}, "$or": [{"role": "admin"}, {"role": "user"}]}
+    assert redact(query) == {"email": "?", "created_at": {"$gte": "?"}, "$or": [{"role": "?"}]}
+    assert redact({"id": {"$in": []}}) == {"id": {"$in": []}}
+
+
+def test_filter_shape_per_command():
+    assert filter_shape("find", {"find": "users", "filter": {"id": "u1"}}) == {"id": "?"}
+    assert filter_shape("count", {"count": "users"}) == {}
+    assert filter_shape("aggregate", {"pipeline": [{"$match": {"year": 2024}}]}) == [{"$match": {"year": "?"}}]
+    assert filter_shape("update", {"updates": [{"q": {"id": "a"}}, {"q": {"x": 1}}]}) == [{"id": "?"}]
+    assert filter_shape("insert", {"documents": [{"password": "secret"}]}) is None
+
+
+def test_summarize_plan_reads_only_the_winning_plan():
+    explain = {
+        "queryPlanner": {
+            "winningPlan": {
+                "stage": "FETCH",
+                "inputStage": {"stage": "IXSCAN", "indexName": "email_1"},
+            },
+            "rejectedPlans": [{"stage": "COLLSCAN"}],
+        }
+    }
+    assert summarize_plan(explain) == {"stages": ["FETCH", "IXSCAN"], "indexes": ["email_1"], "collscan": False}
+
+
+def test_summarize_plan_finds_nested_aggregate_plans():
+    explain = {"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}}, {"$group": {}}]}
+    assert summarize_plan(explain) == {"stages": ["COLLSCAN"], "indexes": [], "collscan": True}
+    assert summarize_plan({}) == {"stages": [], "indexes": [], "collscan": False}
+
+
+def _event(request_id, command_name="find", command=None, micros=0):
+    return SimpleNamespace(
+        request_id=request_id, command_name=command_name,
+        command=command or {"find": "users", "filter": {"email": "a@b.c"}}, duration_micros=micros,
+    )
+
+
+def test_only_commands_over_the_threshold_are_recorded():
+    log = SlowQueryLog(threshold_ms=100)
+    for request_id, micros in ((1, 50_000), (2, 150_000)):
+        log.started(_event(request_id))
+        log.succeeded(_event(request_id, micros=micros))
+    log.started(_event(3, "getMore"))
+    log.succeeded(_event(3, "getMore", micros=500_000))
+    records = log.recent()
+    assert [(r["collection"], r["duration_ms"], r["filter_shape"]) for r in records] == [("users", 150.0, {"email": "?"})]
+    assert not log._pending
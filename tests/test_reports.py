@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+
+from reports import matrix_row
+
+PERIODS = [(2024, 11), (2024, 12), (2025, 1), (2025, 2)]
+
+
+def _paid(*periods, amount=100.0):
+    return [{"_id": {"year": year, "month": month}, "amount": amount} for year, month in periods]
+
+
+def test_paid_and_unpaid_months():
+    member = {
+        "id": "u1",
+        "full_name": "Asha",
+        "created_at": datetime(2024, 1, 5, tzinfo=timezone.utc),
+        "paid": _paid((2024, 11), (2025, 1)),
+    }
+    row = matrix_row(member, PERIODS, 100.0)
+    assert row["months"] == {"2024-11": True, "2024-12": False, "2025-01": True, "2025-02": False}
+    assert row["paid_months"] == 2
+    assert row["arrears_months"] == 2
+    assert row["arrears_amount"] == 200.0
+
+
+def test_months_before_joining_are_none_and_not_arrears():
+    member = {"id": "u1", "created_at": datetime(2024, 12, 20, tzinfo=timezone.utc), "paid": _paid((2025, 1))}
+    row = matrix_row(member, PERIODS, 100.0)
+    assert row["months"] == {"2024-11": None, "2024-12": False, "2025-01": True, "2025-02": False}
+    assert row["arrears_months"] == 2
+
+
+def test_payment_before_joining_still_counts_as_paid():
+    member = {"id": "u1", "created_at": datetime(2025, 2, 1, tzinfo=timezone.utc), "paid": _paid((2024, 11))}
+    row = matrix_row(member, PERIODS, 100.0)
+    assert row["months"]["2024-11"] is True
+    assert row["arrears_months"] == 1
+
+
+def test_unknown_join_date_counts_every_unpaid_month():
+    member = {"id": "u1", "created_at": "unknown"}
+    row = matrix_row(member, PERIODS, 50.0)
+    assert set(row["months"].values()) == {False}
+    assert row["paid_months"] == 0
+    assert row["arrears_amount"] == 200.0
+
+
+def test_join_date_not_yet_migrated_from_iso_string():
+    member = {"id": "u1", "created_at": "2024-12-20T08:00:00+00:00", "paid": []}
+    row = matrix_row(member, PERIODS, 100.0)
+    assert row["months"]["2024-11"] is None
+    assert row["arrears_months"] == 3
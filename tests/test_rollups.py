@@ -0,0 +1,209 @@
+import asyncio
+import itertools
+
+from pymongo import ReplaceOne
+
+import festival_totals
+import rollups
+
+_ids = itertools.count(1)
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        value = doc.get(field)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$nin" in cond and value in cond["$nin"]:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _group_key(spec, doc):
+    if isinstance(spec, dict):
+        return tuple((k, doc.get(v[1:])) for k, v in spec.items())
+    return doc.get(spec[1:])
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = []
+        for doc in docs or []:
+            self._insert(doc)
+
+    def _insert(self, doc):
+        doc = {"_id": next(_ids), **doc}
+        self.docs.append(doc)
+        return doc
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if _matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return
+            doc = self._insert(query)
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        doc.update(update.get("$set", {}))
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            if isinstance(op, ReplaceOne):
+                self.docs = [d for d in self.docs if not _matches(d, op._filter)]
+                self._insert(op._doc)
+            else:
+                await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+    async def delete_many(self, query):
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+        return type("Result", (), {"deleted_count": before - len(self.docs)})()
+
+    async def delete_one(self, query):
+        await self.delete_many(query)
+
+    def find(self, query, projection=None):
+        docs = [dict(d) for d in self.docs if _matches(d, query)]
+        return _Cursor(docs)
+
+    def aggregate(self, pipeline):
+        # Only the $match/$group shapes the rebuild queries use
+        docs = self.docs
+        for stage in pipeline:
+            if "$match" in stage:
+                docs = [d for d in docs if _matches(d, stage["$match"])]
+            elif "$group" in stage:
+                spec = stage["$group"]
+                groups = {}
+                for doc in docs:
+                    key = _group_key(spec["_id"], doc)
+                    row = groups.setdefault(key, {"_id": dict(key) if isinstance(key, tuple) else key})
+                    for field, acc in spec.items():
+                        if field != "_id":
+                            add = 1 if acc["$sum"] == 1 else doc[acc["$sum"][1:]]
+                            row[field] = row.get(field, 0) + add
+                docs = list(groups.values())
+        return _Cursor(docs)
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeDb:
+    def __init__(self, payments=(), expenses=()):
+        self.monthly_payments = FakeCollection(payments)
+        self.savings_rollups = FakeCollection()
+        self.expenses = FakeCollection(expenses)
+        self.festival_totals = FakeCollection()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def _payment(year, month, amount, status="success"):
+    return {"year": year, "month": month, "amount": amount, "status": status}
+
+
+def test_each_payment_increments_its_month_and_the_year_total():
+    db = FakeDb()
+    run(rollups.record_successful_payment(db, 2024, 5, 100.0))
+    run(rollups.record_successful_payment(db, 2024, 5, 50.0))
+    run(rollups.record_successful_payment(db, 2024, 6, 100.0))
+    result = run(rollups.get_rollups(db, 2024, 5))
+    assert (result["month"]["paid_count"], result["month"]["total_amount"]) == (2, 150.0)
+    assert (result["year"]["paid_count"], result["year"]["total_amount"]) == (3, 250.0)
+
+
+def test_batch_increments_match_one_at_a_time():
+    payments = [
+        {"year": 2024, "month": 5, "amount": 100.0},
+        {"year": 2024, "month": 5, "amount": 100.0},
+        {"year": 2025, "month": 1, "amount": 75.0},
+    ]
+    batched, single = FakeDb(), FakeDb()
+    run(rollups.record_successful_payments(batched, payments))
+    for p in payments:
+        run(rollups.record_successful_payment(single, p["year"], p["month"], p["amount"]))
+
+    def state(db):
+        return sorted((d["year"], d["month"], d["paid_count"], d["total_amount"]) for d in db.savings_rollups.docs)
+
+    assert state(batched) == state(single) == [(2024, 0, 2, 200.0), (2024, 5, 2, 200.0), (2025, 0, 1, 75.0), (2025, 1, 1, 75.0)]
+    run(rollups.record_successful_payments(batched, []))  # nothing to write
+
+
+def test_missing_rollups_read_as_zero():
+    assert run(rollups.get_rollups(FakeDb(), 2024, 5)) == {
+        "month": {"paid_count": 0, "total_amount": 0}, "year": {"paid_count": 0, "total_amount": 0},
+    }
+
+
+def test_check_flags_drift_and_rebuild_repairs_it():
+    db = FakeDb([_payment(2024, 5, 100.0), _payment(2024, 6, 100.0), _payment(2024, 6, 100.0, "failed")])
+    run(rollups.record_successful_payment(db, 2024, 5, 100.0))
+    run(rollups.record_successful_payment(db, 2023, 1, 10.0))  # no such payment
+    mismatches = run(rollups.check_rollups(db))
+    assert [(m["year"], m["month"]) for m in mismatches] == [(2023, 0), (2023, 1), (2024, 0), (2024, 6)]
+
+    assert run(rollups.rebuild_rollups(db)) == {"rebuilt": 3, "removed": 2}
+    assert run(rollups.check_rollups(db)) == []
+    assert run(rollups.get_rollups(db, 2024, 6))["year"]["total_amount"] == 200.0
+
+
+def test_rebuild_for_one_year_leaves_other_years_alone():
+    db = FakeDb([_payment(2024, 5, 100.0)])
+    run(rollups.record_successful_payment(db, 2023, 1, 10.0))
+    assert run(rollups.rebuild_rollups(db, 2024)) == {"rebuilt": 2, "removed": 0}
+    assert run(rollups.get_rollups(db, 2023, 1))["month"]["paid_count"] == 1
+
+
+def test_expense_create_and_delete_adjust_festival_totals():
+    db = FakeDb()
+    run(festival_totals.record_expense(db, "f1", 100.0))
+    run(festival_totals.record_expense(db, "f1", 40.5))
+    run(festival_totals.record_expense(db, "f1", 100.0, sign=-1))
+    run(festival_totals.record_expense(db, "f2", 10.0))
+    assert run(festival_totals.get_totals(db)) == {"f1": (40.5, 1), "f2": (10.0, 1)}
+    run(festival_totals.drop_totals(db, "f2"))
+    assert "f2" not in run(festival_totals.get_totals(db))
+
+
+def test_summarize_joins_totals_and_defaults_to_zero():
+    festivals = [{"id": "f1", "name": "Holi", "total_budget": 500.0}, {"id": "f2", "name": "Diwali", "total_budget": 100.0}]
+    rows = festival_totals.summarize(festivals, {"f1": (120.0, 3)})
+    assert [(r["spent"], r["remaining"], r["expense_count"]) for r in rows] == [(120.0, 380.0, 3), (0, 100.0, 0)]
+
+
+def test_festival_totals_check_and_rebuild():
+    db = FakeDb(expenses=[
+        {"festival_id": "f1", "amount": 100.0}, {"festival_id": "f1", "amount": 20.0},
+    ])
+    run(festival_totals.record_expense(db, "f1", 100.0))
+    run(festival_totals.record_expense(db, "gone", 5.0))
+    assert [m["festival_id"] for m in run(festival_totals.check_totals(db))] == ["f1", "gone"]
+    assert run(festival_totals.rebuild_totals(db)) == {"rebuilt": 1, "removed": 1}
+    assert run(festival_totals.get_totals(db)) == {"f1": (120.0, 2)}
+    assert run(festival_totals.check_totals(db)) == []
+
+
+def test_repair_cli_dispatches_to_the_target(capsys):
+    from repair import repair
+
+    db = FakeDb([_payment(2024, 5, 100.0)], [{"festival_id": "f1", "amount": 20.0}])
+    run(repair(db, "savings_rollups", "check", 2024))
+    run(repair(db, "festival_totals", "rebuild"))
+    run(repair(db, "festival_totals", "check"))
+    assert capsys.readouterr().out.splitlines()[2:] == [
+        "2 mismatched bucket(s)",
+        "{'rebuilt': 1, 'removed': 0}",
+        "0 mismatched festival(s)",
+    ]
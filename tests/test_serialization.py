@@ -0,0 +1,57 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import orjson
+import pytest
+from bson import ObjectId
+from pydantic import BaseModel, Field
+
+from serialization import FastJSONResponse, dumps, lean_rows
+
+
+class Item(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    order: int = 0
+    note: Optional[str] = None
+
+
+def test_lean_rows_keeps_only_model_fields():
+    docs = [{"id": "i1", "name": "A", "order": 2, "note": "x", "password": "hash", "_id": ObjectId()}]
+    assert lean_rows(docs, Item) == [{"id": "i1", "name": "A", "order": 2, "note": "x"}]
+
+
+def test_lean_rows_fills_plain_defaults_only():
+    # order/note have plain defaults; id's default_factory is not invoked
+    assert lean_rows([{"name": "A"}], Item) == [{"name": "A", "order": 0, "note": None}]
+
+
+def test_lean_rows_passes_stored_values_through():
+    stamp = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    assert lean_rows([{"name": stamp, "order": "7"}], Item)[0]["name"] is stamp
+    assert lean_rows([{"name": "A", "order": "7"}], Item)[0]["order"] == "7"
+
+
+def test_dumps_matches_pydantic_json_for_datetimes():
+    stamp = datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc)
+    assert dumps({"at": stamp}) == b'{"at":"2024-05-01T10:30:00Z"}'
+    offset = datetime(2024, 5, 1, 16, 0, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    assert orjson.loads(dumps({"at": offset}))["at"] == "2024-05-01T16:00:00+05:30"
+
+
+def test_dumps_handles_object_ids_and_non_string_keys():
+    oid = ObjectId()
+    assert orjson.loads(dumps({"_id": oid, 2024: [1]})) == {"_id": str(oid), "2024": [1]}
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
+
+
+def test_fast_json_response_renders_with_orjson():
+    response = FastJSONResponse([{"id": "i1", "at": datetime(2024, 1, 1, tzinfo=timezone.utc)}], status_code=201)
+    assert response.body == b'[{"id":"i1","at":"2024-01-01T00:00:00Z"}]'
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import logging
+import queue
+
+import pytest
+
+import structured_logging
+from structured_logging import AccessLogMiddleware, JsonFormatter, _DroppingQueueHandler, dropped_records
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def access_log():
+    capture = Capture()
+    logger = structured_logging.access_logger
+    logger.addHandler(capture)
+    logger.setLevel(logging.INFO)
+    yield capture.records
+    logger.removeHandler(capture)
+
+
+def _app(status=200, error=None):
+    async def app(scope, receive, send):
+        if error is not None:
+            raise error
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+def _call(middleware):
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/api/x", "state": {"user_id": "u1"}}
+    asyncio.run(middleware(scope, None, send))
+
+
+def test_unsampled_fast_success_is_skipped(access_log, monkeypatch):
+    monkeypatch.setattr(structured_logging.random, "random", lambda: 0.9)
+    _call(AccessLogMiddleware(_app(200), sample_rate=0.1))
+    assert access_log == []
+
+
+def test_sampled_success_is_logged(access_log, monkeypatch):
+    monkeypatch.setattr(structured_logging.random, "random", lambda: 0.05)
+    _call(AccessLogMiddleware(_app(200), sample_rate=0.1))
+    fields = access_log[0].fields
+    assert (fields["method"], fields["route"], fields["status"], fields["user_id"]) == ("GET", "unmatched", 200, "u1")
+    assert access_log[0].levelno == logging.INFO
+
+
+@pytest.mark.parametrize("status, level", [(404, logging.INFO), (503, logging.ERROR)])
+def test_error_responses_are_always_logged(access_log, monkeypatch, status, level):
+    monkeypatch.setattr(structured_logging.random, "random", lambda: 0.99)
+    _call(AccessLogMiddleware(_app(status), sample_rate=0.0))
+    assert access_log[0].fields["status"] == status
+    assert access_log[0].levelno == level
+
+
+def test_slow_requests_are_always_logged(access_log, monkeypatch):
+    monkeypatch.setattr(structured_logging.random, "random", lambda: 0.99)
+    _call(AccessLogMiddleware(_app(200), sample_rate=0.0, slow_ms=0))
+    assert len(access_log) == 1
+
+
+def test_exceptions_are_logged_and_reraised(access_log):
+    with pytest.raises(RuntimeError):
+        _call(AccessLogMiddleware(_app(error=RuntimeError("boom")), sample_rate=0.0))
+    fields = access_log[0].fields
+    assert fields["status"] == 500
+    assert fields["error"] == "RuntimeError('boom')"
+    assert access_log[0].levelno == logging.ERROR
+
+
+def test_dropping_handler_counts_instead_of_blocking(monkeypatch):
+    monkeypatch.setattr(_DroppingQueueHandler, "dropped", 0)
+    handler = _DroppingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.queue.qsize() == 1
+    assert dropped_records() == 1
+    # Enqueued as-is: the message is formatted later on the listener thread
+    assert handler.queue.get_nowait().args == ("world",)
+
+
+def test_json_formatter_merges_fields():
+    record = logging.LogRecord("access", logging.INFO, __file__, 1, "request", (), None)
+    record.fields = {"status": 200}
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "request"
+    assert entry["status"] == 200
+    assert entry["ts"].endswith("+00:00")
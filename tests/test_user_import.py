@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from user_import import ImportFormatError, csv_row_batches
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def _collect(chunks, batch_size=200):
+    async def collect():
+        return [batch async for batch in csv_row_batches(chunks, batch_size)]
+    return asyncio.run(collect())
+
+
+def test_rows_split_across_chunks():
+    batches = _collect(_chunks(
+        b"full_name,email,phone,password\nAsha,asha@example.com,98",
+        b"76543210,secret\nRavi,ravi@example.com,9123456780,pw\n",
+    ))
+    assert batches == [[
+        (2, {"full_name": "Asha", "email": "asha@example.com", "phone": "9876543210", "password": "secret"}),
+        (3, {"full_name": "Ravi", "email": "ravi@example.com", "phone": "9123456780", "password": "pw"}),
+    ]]
+
+
+def test_batches_respect_batch_size():
+    rows = b"".join(f"U{i},u{i}@example.com,{i},pw\n".encode() for i in range(5))
+    batches = _collect(_chunks(b"full_name,email,phone,password\n" + rows), batch_size=2)
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [line for batch in batches for line, _ in batch] == [2, 3, 4, 5, 6]
+
+
+def test_header_is_case_insensitive_and_extra_columns_are_dropped():
+    batches = _collect(_chunks("﻿Full_Name, Email ,PHONE,Password,notes\nA,a@x.com,1,pw,hi".encode()))
+    assert batches == [[(2, {"full_name": "A", "email": "a@x.com", "phone": "1", "password": "pw"})]]
+
+
+def test_blank_lines_are_skipped_but_counted():
+    batches = _collect(_chunks(b"full_name,email,phone,password\n\nA,a@x.com,1,pw\n"))
+    assert batches == [[(3, {"full_name": "A", "email": "a@x.com", "phone": "1", "password": "pw"})]]
+
+
+def test_multibyte_character_split_across_chunks():
+    body = "full_name,email,phone,password\nAnanyā,a@x.com,1,pw\n".encode()
+    split = body.index("ā".encode()) + 1
+    batches = _collect(_chunks(body[:split], body[split:]))
+    assert batches[0][0][1]["full_name"] == "Ananyā"
+
+
+def test_missing_columns():
+    with pytest.raises(ImportFormatError, match="password"):
+        _collect(_chunks(b"full_name,email,phone\nA,a@x.com,1\n"))
+
+
+def test_empty_file():
+    with pytest.raises(ImportFormatError):
+        _collect(_chunks(b""))
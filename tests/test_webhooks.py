@@ -0,0 +1,38 @@
+from webhooks import plan_transitions
+
+
+def _event(event, order_id, payment_id="pay_1", method="upi"):
+    return {
+        "_id": f"evt_{payment_id}",
+        "event": event,
+        "payload": {"payment": {"entity": {"id": payment_id, "order_id": order_id, "method": method}}},
+    }
+
+
+def test_success_only_matches_rows_not_already_successful():
+    (op,) = plan_transitions([_event("payment.captured", "order_1")], "batch_1")
+    assert op._filter == {"razorpay_order_id": "order_1", "status": {"$ne": "success"}}
+    assert op._doc["$set"]["status"] == "success"
+    assert op._doc["$set"]["settled_by"] == "batch_1"
+
+
+def test_failure_only_matches_pending_rows():
+    (op,) = plan_transitions([_event("payment.failed", "order_1")], "batch_1")
+    assert op._filter == {"razorpay_order_id": "order_1", "status": "pending"}
+    assert op._doc == {"$set": {"status": "failed", "razorpay_payment_id": "pay_1"}}
+
+
+def test_replayed_batch_plans_the_same_conditional_updates():
+    events = [_event("order.paid", "order_1"), _event("payment.failed", "order_2", "pay_2")]
+    first = plan_transitions(events, "batch_1")
+    replay = plan_transitions(events, "batch_2")
+    assert [op._filter for op in first] == [op._filter for op in replay]
+
+
+def test_events_without_order_or_unhandled_are_skipped():
+    events = [
+        _event("payment.captured", None),
+        _event("refund.created", "order_1"),
+        {"_id": "evt_x", "event": "payment.captured"},
+    ]
+    assert plan_transitions(events, "batch_1") == []